@@ -1,13 +1,15 @@
-from datetime import datetime
-
 from django.contrib import admin
-from django.db.models import Count
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.admin import PerformanceModeMixin, performance_mode
 
+from .archive import archive_months
 from .models import Post
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(PerformanceModeMixin, admin.ModelAdmin):
     """
     Creating a sub class of model admin
     to modify the behaviour of Post model
@@ -30,36 +32,69 @@ class PostAdmin(admin.ModelAdmin):
         :return:
         """
         queryset = super().get_queryset(request)
-        if not request.user.has_perms(
-                'view_future_post'
-        ):
-            queryset = queryset.filter(
-                pub_date__lte=datetime.now()
-            )
-        # This is optimisation to reduce
-        # calls to the database.
+        if not request.user.has_perm('blogs.view_future_post'):
+            queryset = queryset.published()
+        # The tags are counted by a subquery run
+        # for the posts of the page only, where
+        # annotate(Count('tags')) would join and
+        # group every post of the table.
+        tag_numbers = Post.tags.through.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            count=Count('*')
+        ).values('count')
         return queryset.annotate(
-            tag_number=Count('tags')
+            tag_number=Coalesce(
+                Subquery(tag_numbers, output_field=IntegerField()), 0
+            )
         )
 
+    def get_date_hierarchy_months(self, request, changelist, year=None):
+        """
+        Overriding the method to read the months
+        of the date hierarchy from the post
+        archive, see blogs.archive, when the
+        posts are not filtered otherwise. The
+        months of future posts are listed too,
+        as the admin manages the posts before
+        they are published.
+        :param request:
+        :param changelist:
+        :param year:
+        :return:
+        """
+        date_params = {
+            'pub_date__year', 'pub_date__month', 'pub_date__day'
+        }
+        if not performance_mode() or changelist.query or (
+                set(changelist.get_filters_params()) - date_params):
+            return None
+        return archive_months(allow_future=True, year=year)
+
     def tag_count(self, post):
         return post.tag_number
 
     tag_count.short_description = 'Number of Tags'
     tag_count.admin_order_field = 'tag_number'
 
-    list_display = ('title', 'pub_date', 'tag_count')
+    def get_author(self, post):
+        return post.author.profile.name
+
+    get_author.short_description = 'Author'
+    get_author.admin_order_field = 'author__profile__name'
+
+    list_display = ('title', 'get_author', 'pub_date', 'tag_count')
     date_hierarchy = 'pub_date'
     list_filter = ('pub_date',)
     search_fields = ('title', 'text')
     """
     Making use of select_related
     under the hood, that loads the
-    profile object when the post
-    object is being loaded from db.
+    author and its profile objects when
+    the post object is being loaded from db.
     This is an optimisation technique
     """
-    list_select_related = ('profile',)
+    list_select_related = ('author__profile',)
     """
     Even though the add and edit pages are different
     many of the admin options configure both pages.
@@ -0,0 +1,116 @@
+"""
+Module maintaining the post archive.
+
+The archive views and the archive sitemap list
+the years and months having posts. Django
+computes them with QuerySet.dates(), a DISTINCT
+over every post, on each request. Instead the
+PostArchive table keeps one row per month with
+posts, updated by the signal handlers when a
+post is saved or deleted, so listing the
+archive reads as many rows as there are months.
+Whether a month is published is decided by the
+date of its first post, so that future posts
+show up on their day without any update.
+"""
+from datetime import date
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.db.models.functions import TruncMonth
+
+from .models import Post, PostArchive
+
+
+def month_of(day):
+    return day.replace(day=1)
+
+
+def update_archive(months=None):
+    """
+    Function to recount the archive rows of
+    the months containing the dates in
+    months, or of every month when months
+    is None, removing the months left
+    without posts.
+    :param months: dates
+    :return: number of months with posts
+    """
+    posts = Post.objects.all()
+    archive = PostArchive.objects.all()
+    if months is not None:
+        months = {month_of(day) for day in months}
+        if not months:
+            return 0
+        posts = posts.filter(reduce(or_, (
+            Q(pub_date__year=month.year, pub_date__month=month.month)
+            for month in months
+        )))
+        archive = archive.filter(month__in=months)
+    rows = posts.annotate(
+        month=TruncMonth('pub_date')
+    ).order_by().values('month').annotate(
+        post_count=Count('pk'),
+        published_count=Count(
+            'pk', filter=Q(pub_date__lte=date.today())
+        ),
+        first_pub_date=Min('pub_date'),
+    )
+    with transaction.atomic():
+        if months is None:
+            archive.delete()
+            return len(PostArchive.objects.bulk_create(
+                PostArchive(**row) for row in rows
+            ))
+        # update_or_create locks the rows of the
+        # months, which concurrent saves may update
+        found = set()
+        for row in rows:
+            month = row.pop('month')
+            PostArchive.objects.update_or_create(month=month, defaults=row)
+            found.add(month)
+        archive.exclude(month__in=found).delete()
+    return len(found)
+
+
+def archive_months(allow_future=False, year=None, ordering='ASC'):
+    """
+    Function to return the first days of
+    the months with posts, of the year if
+    given. Months whose posts are all in
+    the future are left out unless
+    allow_future is True.
+    :param allow_future:
+    :param year:
+    :param ordering: 'ASC' or 'DESC'
+    :return: list of dates
+    """
+    months = PostArchive.objects.all()
+    if not allow_future:
+        months = months.filter(first_pub_date__lte=date.today())
+    if year is not None:
+        months = months.filter(month__year=year)
+    return list(
+        months.order_by(
+            '-month' if ordering == 'DESC' else 'month'
+        ).values_list('month', flat=True)
+    )
+
+
+def archive_years(allow_future=False, ordering='ASC'):
+    """
+    Function to return the first days of
+    the years with posts.
+    :param allow_future:
+    :param ordering: 'ASC' or 'DESC'
+    :return: list of dates
+    """
+    return sorted(
+        {
+            month.replace(month=1)
+            for month in archive_months(allow_future)
+        },
+        reverse=ordering == 'DESC'
+    )
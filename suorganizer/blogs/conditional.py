@@ -0,0 +1,40 @@
+"""
+States of the blogs resources for
+conditional GET, see core.conditional.
+"""
+from core.conditional import latest, latest_subquery
+from core.fragments import get_version
+
+from .models import Post
+
+
+def post_state(year, month, slug):
+    """
+    Function to return the state of the
+    detail page of a post, which shows its
+    tags and startups.
+    :param year:
+    :param month:
+    :param slug:
+    :return: (last_modified, parts) or None
+    """
+    row = Post.objects.filter(
+        pub_date__year=year,
+        pub_date__month=month,
+        slug=slug
+    ).annotate(
+        tags_modified=latest_subquery(
+            Post.tags.through.objects.all(), 'post', 'tag__modified'
+        ),
+        startups_modified=latest_subquery(
+            Post.startups.through.objects.all(), 'post',
+            'startup__modified'
+        ),
+    ).values_list(
+        'pk', 'modified', 'tags_modified', 'startups_modified'
+    ).first()
+    if row is None:
+        return None
+    pk, *dates = row
+    return latest(*dates), [get_version(Post, pk)]
+
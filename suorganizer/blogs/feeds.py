@@ -6,13 +6,17 @@ from django.utils.feedgenerator import (
     Atom1Feed, Rss201rev2Feed
 )
 
+from core.feeds import CachedFeedMixin
+
 from .models import Post
 from .mixins import BasePostFeedMixin
 
 
-class AtomPostFeed(BasePostFeedMixin, Feed):
+class AtomPostFeed(CachedFeedMixin, BasePostFeedMixin, Feed):
     feed_type = Atom1Feed
+    url_name = 'blogs_atom_feed'
 
 
-class Rss2PostFeed(BasePostFeedMixin, Feed):
-    feed_type = Rss201rev2Feed
\ No newline at end of file
+class Rss2PostFeed(CachedFeedMixin, BasePostFeedMixin, Feed):
+    feed_type = Rss201rev2Feed
+    url_name = 'blogs_rss_feed'
\ No newline at end of file
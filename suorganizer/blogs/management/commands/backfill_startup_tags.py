@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from ...models import Post
+from ...tagging import propagate_startup_tags
+
+
+class Command(BaseCommand):
+    """
+    Command class to tag every post with
+    the tags of its startups. New relations
+    are tagged by the assign_extra_tags
+    signal, this is needed for data loaded
+    or changed without signals, or for tags
+    added to a startup after its posts.
+    The posts are processed in ranges of
+    primary keys, one INSERT ... SELECT and
+    one transaction per range.
+    """
+    help = 'Tag every post with the tags of its startups.'
+
+    def add_arguments(self, parser):
+        """
+        Method that will receive the
+        command line arguments passed
+        by the user.
+        :param parser:
+        :return:
+        """
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=10000,
+            help='Number of post primary keys per query.'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        batch_size = options['batch_size']
+        last_pk = Post.objects.aggregate(
+            last_pk=Max('pk')
+        )['last_pk'] or 0
+        added = 0
+        for start in range(0, last_pk, batch_size):
+            post_pks = Post.objects.filter(
+                pk__gt=start, pk__lte=start + batch_size
+            ).values_list('pk', flat=True)
+            with transaction.atomic():
+                added += propagate_startup_tags(post_pks=post_pks)
+        self.stdout.write('Added {} post tags.'.format(added))
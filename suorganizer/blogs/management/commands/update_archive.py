@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from ...archive import update_archive
+
+
+class Command(BaseCommand):
+    """
+    Command class to rebuild the post
+    archive, see blogs.archive.
+    The archive is kept up to date by
+    signals, but the published counts
+    change as posts published in the
+    future become visible, so this
+    command should be run once a day,
+    along with recount.
+    """
+    help = 'Rebuild the archive of the months with posts.'
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        months = update_archive()
+        self.stdout.write('Archived {} months.'.format(months))
@@ -0,0 +1,47 @@
+# Generated by Django 3.1.1 on 2026-10-18 12:39
+
+"""
+Migration lowercasing the stored post slugs
+and adding the UPPER(slug) index serving the
+__iexact lookups on PostgreSQL, see core.fields.
+"""
+import core.fields
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_slugs(apps, schema_editor):
+    """
+    Lowercase the slugs of every post.
+    :param apps:
+    :param schema_editor:
+    :return:
+    """
+    Post = apps.get_model('blogs', 'Post')
+    Post.objects.exclude(
+        slug=Lower('slug')
+    ).update(slug=Lower('slug'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0008_post_modified'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='slug',
+            field=core.fields.LowercaseSlugField(help_text='A label for URL config', max_length=63, unique_for_month='pub_date'),
+        ),
+        migrations.RunPython(
+            lowercase_slugs,
+            migrations.RunPython.noop
+        ),
+        core.fields.FunctionalIndex(
+            model_name='post',
+            name='blogs_post_slug_upper',
+            expressions=['UPPER("slug"::text)'],
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.1.1 on 2026-10-18 12:42
+
+"""
+Migration adding the post archive and
+filling it in, see blogs.archive.
+"""
+from datetime import date
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Q
+from django.db.models.functions import TruncMonth
+
+
+def add_archive(apps, schema_editor):
+    """
+    Count the posts of every month with
+    one grouped query.
+    :param apps:
+    :param schema_editor:
+    :return:
+    """
+    Post = apps.get_model('blogs', 'Post')
+    PostArchive = apps.get_model('blogs', 'PostArchive')
+    rows = Post.objects.annotate(
+        month=TruncMonth('pub_date')
+    ).order_by().values('month').annotate(
+        post_count=Count('pk'),
+        published_count=Count(
+            'pk', filter=Q(pub_date__lte=date.today())
+        ),
+        first_pub_date=Min('pub_date'),
+    )
+    PostArchive.objects.bulk_create(
+        PostArchive(**row) for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0009_slug_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostArchive',
+            fields=[
+                ('month', models.DateField(primary_key=True, serialize=False)),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('published_count', models.PositiveIntegerField(default=0)),
+                ('first_pub_date', models.DateField()),
+            ],
+            options={
+                'ordering': ['month'],
+            },
+        ),
+        migrations.RunPython(
+            add_archive,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.1.1 on 2026-10-18 12:57
+
+"""
+Migration adding the index on the order of
+the posts, see the Meta of Post.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0010_post_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-pub_date', 'title', '-id'], name='blogs_post_pub_date_idx'),
+        ),
+    ]
@@ -1,9 +1,14 @@
+from datetime import date, datetime, time, timedelta
+
 from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.views.generic.dates import (
     YearMixin as BaseYearMixin, MonthMixin as BaseMonthMixin,
     DateMixin, _date_from_string)
 
+from core.objectcache import get_object_or_404
+
+from .archive import archive_months, archive_years, month_of
 from .models import Post
 
 
@@ -23,6 +28,81 @@ class AllowFuturePermissionMixin:
             'blog.view_future_post')
 
 
+class ArchiveMixin:
+    """
+    Mixin for the date based views of posts,
+    reading the years and months with posts
+    from the archive, see blogs.archive,
+    rather than with dates() over the posts.
+    Lists of days, only used by the month
+    archive, are still read from the posts
+    of the month.
+    """
+
+    def get_date_list(self, queryset, date_type=None, ordering='ASC'):
+        """
+        Overriding the method to list the
+        years, or the months of the year
+        shown, from the archive.
+        :param queryset:
+        :param date_type:
+        :param ordering:
+        :return: list of dates
+        """
+        if date_type is None:
+            date_type = self.get_date_list_period()
+        if date_type == 'year':
+            date_list = archive_years(self.get_allow_future(), ordering)
+        elif date_type == 'month' and hasattr(self, 'get_year'):
+            date_list = archive_months(
+                self.get_allow_future(), int(self.get_year()), ordering
+            )
+        else:
+            return super().get_date_list(queryset, date_type, ordering)
+        if not date_list and not self.get_allow_empty():
+            raise Http404('No {} available'.format(
+                queryset.model._meta.verbose_name_plural
+            ))
+        return date_list
+
+    def _adjacent(self, dates, current, is_previous):
+        if is_previous:
+            return next((day for day in reversed(dates) if day < current), None)
+        return next((day for day in dates if day > current), None)
+
+    def _adjacent_month(self, date, is_previous):
+        if self.get_allow_empty():
+            if is_previous:
+                return super().get_previous_month(date)
+            return super().get_next_month(date)
+        return self._adjacent(
+            archive_months(self.get_allow_future()),
+            month_of(date), is_previous
+        )
+
+    def _adjacent_year(self, date, is_previous):
+        if self.get_allow_empty():
+            if is_previous:
+                return super().get_previous_year(date)
+            return super().get_next_year(date)
+        return self._adjacent(
+            archive_years(self.get_allow_future()),
+            date.replace(month=1, day=1), is_previous
+        )
+
+    def get_next_month(self, date):
+        return self._adjacent_month(date, is_previous=False)
+
+    def get_previous_month(self, date):
+        return self._adjacent_month(date, is_previous=True)
+
+    def get_next_year(self, date):
+        return self._adjacent_year(date, is_previous=False)
+
+    def get_previous_year(self, date):
+        return self._adjacent_year(date, is_previous=True)
+
+
 class MonthMixin(BaseMonthMixin):
     """
     This class overrides the django monthmixin to add
@@ -81,8 +161,8 @@ class DateObjectMixin(YearMixin,
         """
         In this method django builds the keyword arguments for
         the query(to find the object in the database)
-        The method creates the date kwargs for queryset and then pass
-        that query set to the super queryset that contains the slug.
+        The method creates the date kwargs for queryset and then
+        gets the post with the slug through the object cache.
         :param queryset:
         :return:
         """
@@ -108,7 +188,13 @@ class DateObjectMixin(YearMixin,
             self._make_single_date_lookup(date)
         )
         queryset = queryset.filter(**filter_dict)
-        return super().get_object(queryset=queryset)
+        # slugs are unique for the month, so the
+        # object is cached by year, month and slug
+        slug = self.kwargs.get(self.slug_url_kwarg)
+        return get_object_or_404(
+            queryset, (date.year, date.month, slug),
+            **{'{}__iexact'.format(self.get_slug_field()): slug}
+        )
 
     def _make_single_date_lookup(self, date):
         """
@@ -178,6 +264,18 @@ class BasePostFeedMixin:
         'hottest startup news.'
     )
 
+    def cache_timeout(self):
+        """
+        Method to return the number of
+        seconds the feed is cached for:
+        until midnight, when posts
+        published today appear.
+        """
+        tomorrow = datetime.combine(
+            date.today() + timedelta(days=1), time.min
+        )
+        return int((tomorrow - datetime.now()).total_seconds()) + 1
+
     def items(self):
         """
         Method to provide the
@@ -3,6 +3,7 @@ from django.db import models
 from django.urls import reverse
 from django.conf import settings
 
+from core.fields import LowercaseSlugField
 from organizers.models import Tag, Startup
 
 
@@ -60,7 +61,7 @@ PostManager = BasePostManager.from_queryset(
 
 class Post(models.Model):
     title = models.CharField(max_length=63)
-    slug = models.SlugField(
+    slug = LowercaseSlugField(
         max_length=63,
         help_text='A label for URL config',
         unique_for_month='pub_date'
@@ -81,6 +82,9 @@ class Post(models.Model):
         related_name='blog_posts',
         on_delete=models.CASCADE
     )
+    # Last time the post was saved, used for
+    # conditional GET, see conditional.py
+    modified = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return 'Post {} published on {}'.format(
@@ -137,6 +141,18 @@ class Post(models.Model):
         index_together = (
             ('slug', 'pub_date'),
         )
+        # The index read in the order of the posts,
+        # and of the admin changelist, which adds
+        # -pk, so that pages of posts, the first and
+        # last dates of the date hierarchy and the
+        # days of a month are found without sorting
+        # or reading the whole table.
+        indexes = [
+            models.Index(
+                fields=['-pub_date', 'title', '-id'],
+                name='blogs_post_pub_date_idx'
+            ),
+        ]
 
     def get_absolute_url(self):
         return reverse('blogs_post_detail',
@@ -200,3 +216,29 @@ class Post(models.Model):
         else:
             short = self.text
         return short
+
+
+class PostArchive(models.Model):
+    """
+    A month with posts, for the archive
+    navigation, maintained from the posts
+    by blogs.archive.
+    """
+    # the first day of the month
+    month = models.DateField(primary_key=True)
+    post_count = models.PositiveIntegerField(default=0)
+    # changes as future posts are published,
+    # recounted by the update_archive command
+    published_count = models.PositiveIntegerField(default=0)
+    # the month is published once its first
+    # post is, whatever the counts say
+    first_pub_date = models.DateField()
+
+    class Meta:
+        ordering = ['month']
+
+    def __str__(self):
+        return 'Archive of {}: {} posts'.format(
+            self.month.strftime('%B %Y'),
+            self.post_count
+        )
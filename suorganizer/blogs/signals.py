@@ -1,17 +1,34 @@
 """
 Signal model for blogs
 """
-from django.db.models.signals import m2m_changed
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
 from django.dispatch import receiver
 
-from organizers.models import Tag
+from core.fragments import (
+    invalidate_fragments, invalidate_m2m_fragments
+)
+from core.feeds import refresh_feeds
+from core.objectcache import forget, object_key
+from core.sitemaps import update_sitemaps
+from core.stored import forget_stored, stored, track_stored
+from organizers.counters import (
+    update_m2m_counts, update_startup_counts, update_tag_counts
+)
+from organizers.models import Startup, Tag
 
+from .archive import update_archive
+from .feeds import AtomPostFeed, Rss2PostFeed
 from .models import Post
+from .tagging import propagate_startup_tags
 
 
 @receiver(m2m_changed,
           sender=Post.startups.through)
-def assign_extra_tags(sender, **kwargs):
+def assign_extra_tags(sender, instance, action, reverse,
+                      pk_set, **kwargs):
     """
     Function to assign extra tags to the
     posts. These tags are associated with
@@ -22,55 +39,245 @@ def assign_extra_tags(sender, **kwargs):
     referencing the table using the relationship
     from Post, but the same table can also be
     accessed from startup as, Startup.blog_posts.through
+    In the event of a forward relation, the post
+    instance is assigned to the instance keyword
+    and the primary keys of the startups added
+    to pk_set. In a reverse relation, it is the
+    startup and the primary keys of the posts.
+    Either way all the missing tags are added
+    with a single query, see blogs.tagging.
     :param sender:
+    :param instance:
+    :param action:
+    :param reverse:
+    :param pk_set:
     :param kwargs:
     :return:
     """
-    action = kwargs.get('action')
-    if action == 'post_add':
-        reverse = kwargs.get('reverse')
-        if not reverse:
-            # In the event of a forward relation, the post
-            # instance is assigned to the instance keyword.
-            # While the list of startup primary keys being
-            # associated to the post object is passed to
-            # pk_set keyword.The Startup is assigned to
-            # the model keyword. I have commented it out
-            # because we are not going to use the startup.
-            post = kwargs.get('instance')
-            # Startup = kwargs.get('model')
-            startup_pk_set = kwargs.get('pk_set')
-            # The in lookup available to managers and
-            # querysets finds all the values in a list.
-            # In our case we are using the in lookup on
-            # our tags to find out all the tags associated
-            # with the startups, that have pk in startup_pk_set keyword.
-            # We then call the values_list method on the queryset
-            # to give us a flat list of primary keys.
-            # We then use the distinct() to make sure the pk are unique.
-            # iterator() method is used to ensure, django doesn't cache
-            # our queryset.
-            tag_pk_set = Tag.objects.filter(startup__in=startup_pk_set) \
-                .values_list('pk', flat=True).distinct() \
-                .iterator()
-            post.tags.add(*tag_pk_set)
-        else:
-            startup = kwargs.get('instance')
-            post = kwargs.get('model')
-            post_pk_set = kwargs.get('pk_set')
-            # We use the relatedManager, that is created
-            # for m2m and foreign key relation to call
-            # the values_list() method to retrieve the
-            # pk of the tags associated with a startup
-            tags_associated_with_startup = startup.tags.values_list(
-                'pk', flat=True
-            ).iterator()
-            # We then use the in_bulk queryset method to load
-            # the post objects in post_pk_set
-            post_dict = post.objects.in_bulk(post_pk_set)
-            # We then get the values of the dict that is
-            # a list of post objects and iterate over them
-            # The tags associated with startup are then
-            # added to the post.
-            for post in post_dict.values:
-                post.tags.add(tags_associated_with_startup)
+    if action != 'post_add' or not pk_set:
+        return
+    if not reverse:
+        propagate_startup_tags(
+            post_pks=[instance.pk], startup_pks=pk_set
+        )
+    else:
+        propagate_startup_tags(
+            post_pks=pk_set, startup_pks=[instance.pk]
+        )
+
+
+def post_key(post):
+    """
+    Function to return the key a post is
+    cached under, see core.objectcache.
+    :param post:
+    :return: key
+    """
+    return object_key(
+        Post, post.pub_date.year, post.pub_date.month, post.slug
+    )
+
+
+# The stored date and slug of the posts being
+# saved, read once per save by the receivers below
+track_stored(Post.objects.only('pub_date', 'slug'))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def cached_post(sender, instance, **kwargs):
+    """
+    Function to forget the cached post when
+    it is saved or deleted, under the keys
+    made of its current and stored date and
+    slug, which may have changed.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    keys = {post_key(instance)}
+    old = stored(instance)
+    if old is not None:
+        keys.add(post_key(old))
+    forget(list(keys))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_archive(sender, instance, **kwargs):
+    """
+    Function to recount the archive of the
+    month of a saved or deleted post, and of
+    the month it was in before being saved.
+    It runs before the sitemap receivers,
+    which render the archive sitemap.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    months = [instance.pub_date]
+    old = stored(instance)
+    if old is not None:
+        months.append(old.pub_date)
+    update_archive(months)
+
+
+@receiver(post_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def post_fragments(sender, instance, **kwargs):
+    """
+    Function to invalidate the fragments
+    displaying a post. Startup and tag
+    detail pages list their posts, so
+    their fragments are invalidated too.
+    On deletion the related objects are
+    found before the m2m rows are removed.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    invalidate_fragments(Post, [instance.pk])
+    invalidate_fragments(
+        Tag, instance.tags.values_list('pk', flat=True)
+    )
+    invalidate_fragments(
+        Startup, instance.startups.values_list('pk', flat=True)
+    )
+
+
+m2m_changed.connect(
+    invalidate_m2m_fragments,
+    sender=Post.tags.through
+)
+m2m_changed.connect(
+    invalidate_m2m_fragments,
+    sender=Post.startups.through
+)
+
+
+@receiver(post_save, sender=Post)
+def post_counts(sender, instance, created, **kwargs):
+    """
+    Function to recount the published posts
+    of the tags and startups of a post, as
+    changing its pub_date may publish or
+    unpublish it. A new post has no tags or
+    startups yet, those are counted by the
+    m2m_changed receivers below.
+    :param sender:
+    :param instance:
+    :param created:
+    :param kwargs:
+    :return:
+    """
+    if created:
+        return
+    update_tag_counts(
+        instance.tags.values_list('pk', flat=True)
+    )
+    update_startup_counts(
+        instance.startups.values_list('pk', flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def deleted_post_counts(sender, instance, **kwargs):
+    """
+    Function to recount the published posts
+    of the tags and startups of a post being
+    deleted. The m2m rows are removed along
+    with the post without sending m2m_changed,
+    so we find them now and recount once the
+    deletion is committed.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    tag_pks = list(instance.tags.values_list('pk', flat=True))
+    startup_pks = list(
+        instance.startups.values_list('pk', flat=True)
+    )
+
+    def recount():
+        update_tag_counts(tag_pks)
+        update_startup_counts(startup_pks)
+
+    transaction.on_commit(recount)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_counts(sender, instance, action,
+                     model, pk_set, **kwargs):
+    """
+    Function to recount the published posts
+    of the tags added to or removed from posts.
+    :param sender:
+    :param instance:
+    :param action:
+    :param model:
+    :param pk_set:
+    :param kwargs:
+    :return:
+    """
+    update_m2m_counts(
+        update_tag_counts, Tag,
+        sender, instance, action, model, pk_set
+    )
+
+
+@receiver(m2m_changed, sender=Post.startups.through)
+def post_startups_counts(sender, instance, action,
+                         model, pk_set, **kwargs):
+    """
+    Function to recount the published posts
+    of the startups added to or removed
+    from posts.
+    :param sender:
+    :param instance:
+    :param action:
+    :param model:
+    :param pk_set:
+    :param kwargs:
+    :return:
+    """
+    update_m2m_counts(
+        update_startup_counts, Startup,
+        sender, instance, action, model, pk_set
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def sitemap_files(sender, instance, **kwargs):
+    """
+    Function to render again the sitemap
+    files listing a saved or deleted post.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    update_sitemaps(Post, [instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_feeds(sender, instance, **kwargs):
+    """
+    Function to render the post feeds again
+    when a post is published, changed or
+    deleted.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    refresh_feeds([AtomPostFeed(), Rss2PostFeed()])
+
+
+# after every receiver using stored()
+post_save.connect(forget_stored, sender=Post)
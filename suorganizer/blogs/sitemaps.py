@@ -6,14 +6,19 @@ from operator import itemgetter
 from django.contrib.sitemaps import Sitemap
 from django.urls import reverse
 
+from core.sitemaps import ShardedSitemap
+
+from .archive import archive_months
 from .models import Post
 
 
-class PostSitemap(Sitemap):
+class PostSitemap(ShardedSitemap):
     """
     Class to provide sitemap
     functionality for Post
-    model
+    model. The sitemap files are
+    pre-rendered and sharded, see
+    core.sitemaps
     """
     # The frequency with which the items
     # will change. In our case we have set
@@ -94,45 +99,23 @@ class PostArchiveSitemap(Sitemap):
     before the year archives (for the
     same year)
     """
+    # rendered again when a post changes
+    model = Post
 
     def items(self):
         """
         overriding items method.
-        We get all the dates for the
-        Post objects, first according
-        to the year and then according
-        to the month.
+        We get the published months from
+        the archive, see blogs.archive, and
+        the years from them.
         We then add each date to a tuple
-        noting which tuple was from
-        year query and which was for month
-        query.
-        dates() method returns a QuerySet that
-        evaluates to a list of datetime.date object
-        representing all available dates of a
-        particular kind within the contents of
-        the queryset.
-        iterator() evaluates the queryset and
-        returns an iterator over the results.
-        A queryset typically caches its results
-        internally so that repeated evaluations
-        do not result in additional queries.
-        In contrast, iterator() will read results
-        directly without doing any caching at the
-        Queryset level. For queryset which returns
-        a large number of objects that you only
-        need to access once, this can result in
-        better performance and a significant
-        reduction in memory.
+        noting which tuple was for a year
+        and which was for a month.
         """
-        year_dates = (
-            Post.objects.published().dates(
-                'pub_date', 'year', order='DESC'
-            ).iterator()
-        )
-        month_dates = (
-            Post.objects.published().dates(
-                'pub_date', 'month', order='DESC'
-            ).iterator()
+        month_dates = archive_months(ordering='DESC')
+        year_dates = sorted(
+            {month.replace(month=1) for month in month_dates},
+            reverse=True
         )
         year_tuples = map(
             lambda d: (d, 'y'),
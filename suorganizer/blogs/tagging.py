@@ -0,0 +1,103 @@
+"""
+Module propagating the tags of startups to
+the posts written about them.
+
+When a startup is attached to a post, the
+post is tagged with every tag of the startup.
+Instead of adding the tags post by post, all
+the missing (post, tag) pairs are inserted
+with a single INSERT ... SELECT, joining the
+post startups and startup tags tables and
+skipping the pairs already in the post tags
+table. The database does all the work, in one
+round trip, however many posts and tags are
+involved.
+"""
+from django.db import connections, router
+from django.db.models import Exists, OuterRef
+from django.dispatch import Signal
+
+from core.fragments import invalidate_fragments
+from organizers.counters import update_tag_counts
+from organizers.models import Startup, Tag
+
+from .models import Post
+
+# Sent when tags are added to posts from their
+# startups, with the pks of the tags, as the
+# rows are inserted without m2m_changed.
+startup_tags_propagated = Signal()
+
+
+def missing_post_tags(post_pks=None, startup_pks=None):
+    """
+    Function to build the queryset of the
+    (post_id, tag_id) pairs a post should
+    have through its startups but doesn't.
+    :param post_pks: only these posts, all if None
+    :param startup_pks: only through these startups,
+    all if None
+    :return: values_list queryset
+    """
+    post_tags = Post.tags.through.objects.filter(
+        post_id=OuterRef('post_id'),
+        tag_id=OuterRef('startup__tags'),
+    )
+    pairs = Post.startups.through.objects.filter(
+        startup__tags__isnull=False
+    )
+    if post_pks is not None:
+        pairs = pairs.filter(post_id__in=post_pks)
+    if startup_pks is not None:
+        pairs = pairs.filter(startup_id__in=startup_pks)
+    return pairs.exclude(
+        Exists(post_tags)
+    ).order_by().values_list(
+        'post_id', 'startup__tags'
+    ).distinct()
+
+
+def propagate_startup_tags(post_pks=None, startup_pks=None):
+    """
+    Function to tag posts with the tags of
+    their startups, restricted to the posts
+    in post_pks and the startups in
+    startup_pks when given.
+    The rows are inserted directly, so no
+    m2m_changed signal is sent: the tag
+    counters and the fragments of the posts
+    and tags involved are updated here, and
+    startup_tags_propagated is sent.
+    :param post_pks:
+    :param startup_pks:
+    :return: number of (post, tag) pairs added
+    """
+    through = Post.tags.through
+    using = router.db_for_write(through)
+    pairs = missing_post_tags(post_pks, startup_pks).using(using)
+    select, params = pairs.query.sql_with_params()
+    opts = through._meta
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {table} ({post}, {tag}) {select}'.format(
+        table=quote(opts.db_table),
+        post=quote(opts.get_field('post').column),
+        tag=quote(opts.get_field('tag').column),
+        select=select,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        added = cursor.rowcount
+    if added:
+        tags = Startup.tags.through.objects.using(using)
+        if startup_pks is not None:
+            tags = tags.filter(startup_id__in=startup_pks)
+        if post_pks is not None:
+            tags = tags.filter(startup__blog_posts__in=post_pks)
+        tag_pks = set(tags.values_list('tag_id', flat=True))
+        update_tag_counts(tag_pks)
+        invalidate_fragments(Tag, tag_pks)
+        if post_pks is not None:
+            invalidate_fragments(Post, post_pks)
+        startup_tags_propagated.send(sender=Post, tag_pks=tag_pks)
+    return added
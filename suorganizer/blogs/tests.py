@@ -1,3 +1,284 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+
+from core.objectcache import local_cache
+from core.testing import QueryBudgetMixin
+from organizers.models import Startup, Tag
+from users.models import Profile, User
+
+from .archive import archive_months, archive_years, update_archive
+from .models import Post, PostArchive
+from .tagging import propagate_startup_tags
+
+
+class StartupTagsTest(TestCase):
+    """
+    Tests of the propagation of startup
+    tags to posts, see tagging.py
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='tagging@example.com', password='s3cret-Pa55word'
+        )
+        cls.web = Tag.objects.create(name='Web', slug='web-tagging')
+        cls.mobile = Tag.objects.create(name='Mobile', slug='mobile-tagging')
+        cls.startup = Startup.objects.create(
+            name='Tagged Startup',
+            slug='tagged-startup',
+            description='A startup with tags.',
+            founded_date=date(2020, 1, 1),
+            contact='tagging@example.com',
+            website='https://example.com/',
+        )
+        cls.startup.tags.add(cls.web, cls.mobile)
+        cls.posts = [
+            Post.objects.create(
+                title='Tagging {}'.format(n),
+                slug='tagging-{}'.format(n),
+                text='A post about a startup.',
+                author=cls.author,
+            )
+            for n in range(2)
+        ]
+        # published before today, see update_tag_counts
+        Post.objects.filter(slug__startswith='tagging-').update(
+            pub_date=date(2019, 1, 1)
+        )
+
+    def post_tags(self, post):
+        return set(post.tags.values_list('slug', flat=True))
+
+    def test_adding_a_startup_tags_the_post(self):
+        post = self.posts[0]
+        post.tags.add(self.web)
+        post.startups.add(self.startup)
+        self.assertEqual(
+            self.post_tags(post), {'web-tagging', 'mobile-tagging'}
+        )
+
+    def test_adding_posts_to_a_startup_tags_them(self):
+        self.startup.blog_posts.add(*self.posts)
+        for post in self.posts:
+            self.assertEqual(
+                self.post_tags(post), {'web-tagging', 'mobile-tagging'}
+            )
+
+    def test_missing_pairs_are_inserted_once(self):
+        Post.startups.through.objects.bulk_create(
+            Post.startups.through(post=post, startup=self.startup)
+            for post in self.posts
+        )
+        # whatever the posts, a single INSERT ... SELECT
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                propagate_startup_tags(
+                    post_pks=[self.posts[0].pk], startup_pks=[0]
+                ), 0
+            )
+        startup_pks = [self.startup.pk]
+        self.assertEqual(propagate_startup_tags(startup_pks=startup_pks), 4)
+        self.assertEqual(propagate_startup_tags(startup_pks=startup_pks), 0)
+        self.web.refresh_from_db()
+        self.assertEqual(self.web.published_post_count, 2)
+
+    def test_backfill_command(self):
+        self.startup.blog_posts.add(*self.posts)
+        design = Tag.objects.create(name='Design', slug='design-tagging')
+        # tags added to the startup after its
+        # posts are only added by the command
+        self.startup.tags.add(design)
+        call_command(
+            'backfill_startup_tags', batch_size=1, stdout=StringIO()
+        )
+        for post in self.posts:
+            self.assertIn('design-tagging', self.post_tags(post))
+        self.assertEqual(propagate_startup_tags(), 0)
+
+
+class PostQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    Tests of the query budgets of the post
+    pages and feeds, see QUERY_BUDGETS.
+    The pages list several posts, each with
+    several tags and startups, so queries
+    repeated per row show up.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='reader@example.com', password='s3cret-Pa55word'
+        )
+        Profile.objects.create(
+            user=cls.user, slug='reader', name='Reader', about='Reads.'
+        )
+        tags = [
+            Tag.objects.create(name='Tag {}'.format(n), slug='tag-{}'.format(n))
+            for n in range(3)
+        ]
+        startups = [
+            Startup.objects.create(
+                name='Startup {}'.format(n), slug='startup-{}'.format(n),
+                description='A startup.', founded_date=date(2015, 1, 1),
+                contact='hi@example.com', website='https://example.com/',
+            )
+            for n in range(3)
+        ]
+        for n in range(5):
+            post = Post.objects.create(
+                title='Post {}'.format(n), slug='post-{}'.format(n),
+                text='Text of the post.', author=cls.user,
+            )
+            post.tags.set(tags)
+            post.startups.set(startups)
+        cls.post = post
+
+    def setUp(self):
+        # the budgets are for a cold cache
+        for cache in caches.all():
+            cache.clear()
+        local_cache.clear()
+        self.client.force_login(self.user)
+
+    def test_post_list(self):
+        self.assertWithinBudget(
+            reverse('blogs_posts_list'), allow_n_plus_one=False
+        )
+
+    def test_post_detail(self):
+        self.assertWithinBudget(
+            self.post.get_absolute_url(), allow_n_plus_one=False
+        )
+
+    def test_cached_post_has_no_author(self):
+        response = self.client.get(self.post.get_absolute_url())
+        # the author and profile would not be
+        # forgotten with the post when they change
+        self.assertFalse(
+            Post._meta.get_field('author').is_cached(
+                response.context['post']
+            )
+        )
+
+    def test_atom_feed(self):
+        self.assertWithinBudget(
+            reverse('blogs_atom_feed'), allow_n_plus_one=False
+        )
+
+    def test_rss_feed(self):
+        self.assertWithinBudget(
+            reverse('blogs_rss_feed'), allow_n_plus_one=False
+        )
+
+
+class PostArchiveTest(TestCase):
+    """
+    Tests of the archive of the months
+    with posts, see archive.py
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='archive@example.com', password='s3cret-Pa55word'
+        )
+
+    def post(self, pub_date, slug):
+        post = Post.objects.create(
+            title='Archived', slug=slug, text='An archived post.',
+            author=self.author,
+        )
+        # pub_date is only set to today on creation
+        post.pub_date = pub_date
+        post.save()
+        return post
+
+    def month(self, day):
+        return PostArchive.objects.filter(month=day).values_list(
+            'post_count', 'published_count', 'first_pub_date'
+        ).first()
+
+    def test_saves_and_deletes_update_the_month(self):
+        first = self.post(date(2001, 3, 20), 'first')
+        self.post(date(2001, 3, 5), 'second')
+        self.assertEqual(
+            self.month(date(2001, 3, 1)), (2, 2, date(2001, 3, 5))
+        )
+        first.delete()
+        self.assertEqual(
+            self.month(date(2001, 3, 1)), (1, 1, date(2001, 3, 5))
+        )
+        Post.objects.get(slug='second').delete()
+        self.assertIsNone(self.month(date(2001, 3, 1)))
+
+    def test_future_months_are_hidden(self):
+        future = date.today().replace(day=1) + timedelta(days=400)
+        self.post(future, 'future')
+        month = future.replace(day=1)
+        self.assertEqual(self.month(month), (1, 0, future))
+        self.assertNotIn(month, archive_months())
+        self.assertIn(month, archive_months(allow_future=True))
+        self.assertNotIn(
+            month.replace(month=1), archive_years()
+        )
+
+    def test_rebuild_matches_the_maintained_rows(self):
+        self.post(date(2001, 3, 20), 'first')
+        self.post(date(2002, 7, 1), 'second')
+        maintained = list(PostArchive.objects.order_by('month').values())
+        self.assertEqual(update_archive(), len(maintained))
+        self.assertEqual(
+            [dict(row, id=None) for row in
+             PostArchive.objects.order_by('month').values()],
+            [dict(row, id=None) for row in maintained]
+        )
+
+    def test_year_archive_lists_its_months(self):
+        self.post(date(2001, 3, 20), 'first')
+        self.post(date(2001, 7, 1), 'second')
+        response = self.client.get(
+            reverse('blogs_post_archive_year', kwargs={'year': 2001})
+        )
+        self.assertEqual(
+            list(response.context['date_list']),
+            [date(2001, 3, 1), date(2001, 7, 1)]
+        )
+
+
+class StoredPostTest(TestCase):
+    """
+    Tests of the receivers of saved posts,
+    which share the stored date and slug,
+    see core.stored.
+    """
 
-# Create your tests here.
+    def test_moved_post_leaves_its_month(self):
+        author = User.objects.create_user(
+            email='author@example.com', password='s3cret-Pa55word'
+        )
+        post = Post.objects.create(
+            title='Moving', slug='moving', text='Text.', author=author
+        )
+        old_month = post.pub_date.replace(day=1)
+        post.pub_date = date(2015, 6, 15)
+        post.save()
+        self.assertEqual(
+            PostArchive.objects.get(month=date(2015, 6, 1)).post_count, 1
+        )
+        # the month the post left is recounted
+        left = Post.objects.filter(
+            pub_date__year=old_month.year, pub_date__month=old_month.month
+        ).count()
+        self.assertEqual(
+            PostArchive.objects.filter(month=old_month).values_list(
+                'post_count', flat=True
+            ).first() or 0,
+            left
+        )
@@ -1,4 +1,6 @@
 from django.urls import path
+
+from core.asyncviews import async_view
 from .views import (
     PostList,
     PostDetail,
@@ -10,11 +12,11 @@ from .views import (
 )
 
 urlpatterns = [
-    path('', PostList.as_view(), name='blogs_posts_list'),
-    path('<int:year>/<int:month>/<slug:slug>/', PostDetail.as_view(), name='blogs_post_detail'),
+    path('', async_view(PostList.as_view()), name='blogs_posts_list'),
+    path('<int:year>/<int:month>/<slug:slug>/', async_view(PostDetail.as_view()), name='blogs_post_detail'),
     path('create/', PostCreate.as_view(), name='blogs_post_create'),
     path('<int:year>/<int:month>/<slug:slug>/update/', PostUpdate.as_view(), name='blogs_post_update'),
     path('<int:year>/<int:month>/<slug:slug>/delete/', PostDelete.as_view(), name='blogs_post_delete'),
-    path('<int:year>/', PostArchiveYear.as_view(), name='blogs_post_archive_year'),
-    path('<int:year>/<int:month>/', PostArchiveMonth.as_view(), name='blogs_post_archive_month'),
+    path('<int:year>/', async_view(PostArchiveYear.as_view()), name='blogs_post_archive_year'),
+    path('<int:year>/<int:month>/', async_view(PostArchiveMonth.as_view()), name='blogs_post_archive_month'),
 ]
@@ -14,13 +14,23 @@ from django.views.generic import (
 
 )
 
+from core.conditional import ConditionalGetMixin
+from organizers.mixins import PageLinksMixin
+
+from .conditional import post_state
+
 from .forms import PostForm
-from .mixins import DateObjectMixin, AllowFuturePermissionMixin, PostFormValidMixin
+from .mixins import (
+    ArchiveMixin, DateObjectMixin, AllowFuturePermissionMixin,
+    PostFormValidMixin
+)
 from .models import Post
 
 
 class PostList(
     AllowFuturePermissionMixin,
+    ArchiveMixin,
+    PageLinksMixin,
     ArchiveIndexView):
     """List View"""
     allow_empty = True
@@ -28,18 +38,34 @@ class PostList(
     date_field = 'pub_date'
     make_object_list = True
     paginate_by = 5
+    # ArchiveIndexView orders by date_field only,
+    # we page on the full Post.Meta.ordering
+    keyset_pagination = True
+    keyset_ordering = Post._meta.ordering
     model = Post
     template_name = 'post/post_list.html'
 
 
-class PostDetail(LoginRequiredMixin,DateObjectMixin, DetailView):
+class PostDetail(LoginRequiredMixin, ConditionalGetMixin,
+                 DateObjectMixin, DetailView):
     """Detail view"""
     template_name = 'post/post_detail.html'
     date_field = 'pub_date'
-    queryset = Post.objects. \
-        select_related('author__profile') \
-        .prefetch_related('startups') \
-        .prefetch_related('tags')
+    # The post is kept in the object cache, see
+    # core.objectcache, so it is loaded without
+    # its author and profile, which are not shown
+    # and would not be forgotten when they change.
+    # The startups and tags are rendered inside
+    # a cached fragment, so they are loaded lazily
+    # and only on a cache miss.
+    model = Post
+
+    def get_conditional_state(self, request, *args, **kwargs):
+        return post_state(
+            kwargs.get(self.year_url_kwarg),
+            kwargs.get(self.month_url_kwarg),
+            kwargs.get(self.slug_url_kwarg)
+        )
 
 
 class PostCreate(LoginRequiredMixin, PostFormValidMixin, CreateView):
@@ -65,7 +91,8 @@ class PostDelete(LoginRequiredMixin, DateObjectMixin, DeleteView):
     date_field = 'pub_date'
 
 
-class PostArchiveYear(AllowFuturePermissionMixin, YearArchiveView):
+class PostArchiveYear(AllowFuturePermissionMixin, ArchiveMixin,
+                      YearArchiveView):
     """View showing posts in a given year"""
     model = Post
     date_field = 'pub_date'
@@ -73,7 +100,8 @@ class PostArchiveYear(AllowFuturePermissionMixin, YearArchiveView):
     make_object_list = True
 
 
-class PostArchiveMonth(AllowFuturePermissionMixin, MonthArchiveView):
+class PostArchiveMonth(AllowFuturePermissionMixin, ArchiveMixin,
+                       MonthArchiveView):
     """View showing posts in a given month"""
     model = Post
     date_field = 'pub_date'
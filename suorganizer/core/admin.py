@@ -1,3 +1,125 @@
-from django.contrib import admin
+"""
+Performance mode of the admin changelists.
 
-# Register your models here.
+On every load a changelist counts the rows of
+its queryset, to paginate them, and counts the
+rows of the whole table again, to show the
+"x of y selected" total. On PostgreSQL COUNT(*)
+reads every row, which takes seconds on tables
+of millions of rows.
+
+When ADMIN_PERFORMANCE_MODE is True, the model
+admins using PerformanceModeMixin paginate
+with EstimatedCountPaginator, which counts the
+rows only when the planner estimates there are
+fewer than ADMIN_EXACT_COUNT_LIMIT of them, and
+leave out the total of the table. The estimate
+of a whole table is the pg_class.reltuples the
+planner maintains, that of a filtered queryset
+the rows of its EXPLAIN. The last pages of an
+estimate may be short or missing, the admin
+then goes back to the first page.
+"""
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+RELTUPLES_SQL = (
+    'SELECT reltuples FROM pg_class WHERE oid = %s::regclass'
+)
+
+
+def performance_mode():
+    return getattr(settings, 'ADMIN_PERFORMANCE_MODE', False)
+
+
+def estimate_count(queryset):
+    """
+    Function to return the number of rows
+    of queryset estimated by the planner,
+    or None when the database cannot tell.
+    :param queryset:
+    :return: int or None
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    query = queryset.order_by().query
+    try:
+        with connection.cursor() as cursor:
+            if not query.where:
+                cursor.execute(
+                    RELTUPLES_SQL, [queryset.model._meta.db_table]
+                )
+                estimate = cursor.fetchone()[0]
+            else:
+                sql, params = query.sql_with_params()
+                cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                estimate = plan[0]['Plan']['Plan Rows']
+    except DatabaseError:
+        return None
+    # -1 until the table is first analyzed
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting the objects only when
+    they are few, see estimate_count.
+    """
+
+    @cached_property
+    def count(self):
+        limit = getattr(settings, 'ADMIN_EXACT_COUNT_LIMIT', 10000)
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < limit:
+            return super().count
+        return estimate
+
+
+class PerformanceModeMixin:
+    """
+    Mixin for model admins, paginating with
+    estimated counts and leaving out the
+    total count of the table when
+    ADMIN_PERFORMANCE_MODE is True.
+    The date hierarchy of the changelist
+    is drawn with the months given by
+    get_date_hierarchy_months(), see
+    core.templatetags.admin_dates.
+    """
+    change_list_template = 'core/admin/change_list.html'
+
+    @property
+    def show_full_result_count(self):
+        return not performance_mode()
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        paginator = self.paginator
+        if performance_mode():
+            paginator = EstimatedCountPaginator
+        return paginator(
+            queryset, per_page, orphans, allow_empty_first_page
+        )
+
+    def get_date_hierarchy_months(self, request, changelist, year=None):
+        """
+        Method to return the first days of the
+        months of the rows of changelist, of the
+        year if given, or None to let Django
+        compute them from its queryset.
+        :param request:
+        :param changelist:
+        :param year:
+        :return: list of dates or None
+        """
+        return None
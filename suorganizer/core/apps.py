@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        # the deployment checks, see core.checks
+        from . import checks
+        # queries are passed on to the active
+        # recorders, see core.querycount
+        from .querycount import add_dispatch
+        connection_created.connect(add_dispatch)
+        # compile the templates before the
+        # first request, see core.loaders
+        if getattr(settings, 'TEMPLATE_WARMUP', False):
+            from .loaders import warm_templates
+            warm_templates()
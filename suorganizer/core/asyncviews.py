@@ -0,0 +1,90 @@
+"""
+Async variants of the read only views.
+
+Under ASGI, django 3.1 with asgiref 3.2 runs
+every sync view on one single thread, so the
+requests of a process are served one at a time.
+Django 3.1 has neither an async ORM nor async
+template rendering, so the async variants run
+the view, its queries and the rendering of its
+template in one call of database_sync_to_async,
+in the thread pool. Responses served from the
+cache, such as the feeds, never leave the event
+loop, see core.feeds.async_feed.
+
+Requests are only served concurrently if every
+middleware is async capable. Otherwise django
+runs the whole middleware chain on the one
+thread of the sync views, see core.middleware.
+
+The variants are selected per url pattern with
+async_view(), and only used when the
+ASYNC_VIEWS setting is True, since under WSGI
+an async view costs an event loop per request.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import SyncToAsync
+from django.conf import settings
+from django.db import close_old_connections
+
+from .profiling import profiled
+
+
+class DatabaseSyncToAsync(SyncToAsync):
+    """
+    SyncToAsync running in the thread pool
+    rather than the main thread, closing the
+    database connections which are too old or
+    broken, as the request_started and
+    request_finished signals do for a request.
+    """
+
+    def thread_handler(self, loop, *args, **kwargs):
+        close_old_connections()
+        try:
+            return super().thread_handler(loop, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+
+def database_sync_to_async(func):
+    """
+    Function to turn func, which queries the
+    database, into a coroutine function.
+    :param func:
+    :return:
+    """
+    return DatabaseSyncToAsync(profiled(func), thread_sensitive=False)
+
+
+def _render(view, request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    # TemplateResponse is rendered by the handler,
+    # on the main thread, unless rendered here
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    return response
+
+
+def async_view(view):
+    """
+    Function to return the async variant of
+    view, a view function or the result of
+    as_view(), when the ASYNC_VIEWS setting
+    is True, or view itself.
+    :param view:
+    :return: view
+    """
+    if not getattr(settings, 'ASYNC_VIEWS', False):
+        return view
+    if asyncio.iscoroutinefunction(view):
+        return view
+    render = database_sync_to_async(functools.partial(_render, view))
+
+    @functools.wraps(view)
+    async def wrapped_view(request, *args, **kwargs):
+        return await render(request, *args, **kwargs)
+
+    return wrapped_view
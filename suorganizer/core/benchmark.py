@@ -0,0 +1,174 @@
+"""
+Benchmark tools: a synthetic dataset and an
+HTTP load generator.
+
+The dataset is generated from a seed, so two
+runs with the same sizes and seed produce the
+same rows, and is written by the organizers
+importer, which resolves the relations by
+natural key.
+
+Each worker thread of the load generator sends
+its requests over one keep-alive connection,
+like a browser or a reverse proxy would, and
+records the latency of every response.
+"""
+import http.client
+import random
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+BENCHMARK_USER = 'bench@example.com'
+
+WORDS = (
+    'cloud data robot market green health social mobile open '
+    'fast smart network energy travel food money learning '
+    'search video music secure quantum space city home'
+).split()
+
+
+def _words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def synthetic_records(tags=1000, startups=10000, newslinks=500000,
+                      posts=100000, seed=0, author=BENCHMARK_USER):
+    """
+    Generator of the (model label, fields)
+    records of a synthetic dataset, in the
+    format of organizers.importer, parents
+    first.
+    :param tags:
+    :param startups:
+    :param newslinks:
+    :param posts:
+    :param seed:
+    :param author: email of the author of the posts
+    :return:
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    tag_slugs = ['bench-tag-{}'.format(number) for number in range(tags)]
+    startup_slugs = [
+        'bench-startup-{}'.format(number) for number in range(startups)
+    ]
+    for number, slug in enumerate(tag_slugs):
+        yield 'organizers.tag', {
+            'name': 'bench tag {}'.format(number),
+            'slug': slug,
+        }
+    for number, slug in enumerate(startup_slugs):
+        yield 'organizers.startup', {
+            'name': 'Bench Startup {}'.format(number),
+            'slug': slug,
+            'description': _words(rng, 60),
+            'founded_date': today - timedelta(days=rng.randint(30, 7000)),
+            'contact': 'contact@{}.example.com'.format(slug),
+            'website': 'https://{}.example.com/'.format(slug),
+            'tags': rng.sample(tag_slugs, min(len(tag_slugs), 3)),
+        }
+    for number in range(newslinks if startup_slugs else 0):
+        yield 'organizers.newslink', {
+            'title': _words(rng, 6)[:63],
+            'slug': 'bench-news-{}'.format(number),
+            'pub_date': today - timedelta(days=rng.randint(0, 3000)),
+            'link': 'https://news.example.com/{}/'.format(number),
+            'startup': rng.choice(startup_slugs),
+        }
+    for number in range(posts):
+        yield 'blogs.post', {
+            'title': _words(rng, 5)[:63],
+            'slug': 'bench-post-{}'.format(number),
+            'text': _words(rng, 300),
+            'pub_date': today - timedelta(days=rng.randint(0, 3000)),
+            'author': author,
+            'tags': rng.sample(tag_slugs, min(len(tag_slugs), 2)),
+            'startups': rng.sample(
+                startup_slugs, min(len(startup_slugs), 1)
+            ),
+        }
+
+
+def percentile(values, fraction):
+    """
+    Function to return the value below which
+    fraction of the sorted values fall.
+    :param values: sorted list
+    :param fraction: between 0 and 1
+    :return:
+    """
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def load(base_url, paths, concurrency=8, total=1000, headers=None,
+         timeout=30):
+    """
+    Function to request the paths, in turn,
+    total times from concurrency threads.
+    :param base_url: e.g. http://127.0.0.1:8000
+    :param paths: list of paths, with the query
+    :param concurrency:
+    :param total:
+    :param headers:
+    :param timeout:
+    :return: dict
+    """
+    url = urlsplit(base_url)
+    latencies = []
+    statuses = {}
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        connection = http.client.HTTPConnection(
+            url.hostname, url.port, timeout=timeout
+        )
+        for number in counter:
+            path = paths[number % len(paths)]
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as error:
+                connection.close()
+                with lock:
+                    errors.append('{}: {}'.format(path, error))
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status] = (
+                    statuses.get(response.status, 0) + 1
+                )
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+        connection.close()
+
+    threads = [
+        threading.Thread(target=worker) for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+        'statuses': statuses,
+        'seconds': seconds,
+        'requests_per_second': len(latencies) / seconds,
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+    }
@@ -0,0 +1,52 @@
+"""
+Deployment checks of the core app, run by
+manage.py check --deploy.
+
+The feeds are rendered again by a background
+worker of the process that saved the change,
+see core.feeds, and the objects looked up by
+slug are forgotten by it, see core.objectcache.
+Every process reads them, so a cache kept in
+each process, or none at all, would serve the
+old feeds and objects elsewhere.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_CACHES = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+def shared_caches():
+    """
+    Function to return the aliases of the
+    caches which must be shared by the
+    processes, with what they hold.
+    :return: list of (alias, use)
+    """
+    return [
+        ('default', 'the feeds'),
+        (getattr(settings, 'OBJECT_CACHE_ALIAS', 'default'),
+         'the objects looked up by slug'),
+    ]
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    uses = {}
+    for alias, use in shared_caches():
+        uses.setdefault(alias, []).append(use)
+    errors = []
+    for alias, alias_uses in uses.items():
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend in PROCESS_CACHES:
+            errors.append(Error(
+                'The {!r} cache holds {} and is not shared by '
+                'the processes.'.format(alias, ' and '.join(alias_uses)),
+                hint='Use Memcached or Redis, see the prod settings.',
+                obj=alias,
+                id='core.E001',
+            ))
+    return errors
@@ -0,0 +1,175 @@
+"""
+Conditional GET support.
+
+Detail pages are polled by
+feed readers and crawlers far more often than
+they change. Each of them can compute a cheap
+state for the resource: its last modification
+time, from the modified timestamps and the
+publication dates of what it displays, and a
+few more parts, such as fragment versions or
+counts, which change when related objects are
+removed. The state is computed with a single
+query before the view runs, and django's
+condition() answers 304 Not Modified when the
+client already has the current version, so no
+object is loaded and no template rendered.
+
+These responses are sent with a max-age of 0,
+see revalidate, which keeps them out of the
+site-wide page cache of UpdateCacheMiddleware:
+it would serve them as 200s, whatever the
+client has, and hide changes until it expires.
+"""
+from datetime import datetime, time
+from hashlib import md5
+
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.http import http_date
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+# Decorator for the views answering conditional
+# GETs: clients and caches keep their responses
+# but ask again, with their etag, every time
+revalidate = cache_control(max_age=0)
+
+
+def as_datetime(value):
+    """
+    Function to turn a date into an aware
+    datetime at midnight, so that dates and
+    timestamps can be compared.
+    :param value: date or datetime
+    :return: datetime
+    """
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.utc)
+    return value
+
+
+def latest(*values):
+    """
+    Function to return the latest of the
+    dates and datetimes given, ignoring None.
+    :param values:
+    :return: datetime or None
+    """
+    values = [as_datetime(value) for value in values if value is not None]
+    return max(values) if values else None
+
+
+def latest_subquery(queryset, field_name, latest_field):
+    """
+    Function to build a subquery returning
+    the latest latest_field of the rows of
+    queryset that reference the outer object
+    through field_name.
+    :param queryset:
+    :param field_name:
+    :param latest_field:
+    :return:
+    """
+    return Subquery(
+        queryset.filter(
+            **{field_name: OuterRef('pk')}
+        ).order_by().values(field_name).annotate(
+            latest=Max(latest_field)
+        ).values('latest')
+    )
+
+
+def make_etag(*parts):
+    """
+    Function to hash the parts of a
+    resource state into an entity tag.
+    :param parts:
+    :return: string
+    """
+    return md5(
+        '|'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+
+def user_parts(request):
+    """
+    Function to return the parts of the
+    state depending on the user, since
+    pages show links according to the
+    user's permissions.
+    :param request:
+    :return: list
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return [None]
+    return [user.pk] + sorted(user.get_all_permissions())
+
+
+def conditional_view(view, get_state, per_user=False):
+    """
+    Function to wrap view with django's
+    condition(). get_state is called with
+    the view arguments and returns a
+    (last_modified, parts) tuple, or None
+    when the resource doesn't exist, in
+    which case the view runs as usual.
+    The state is computed once per request
+    and shared by the etag and last modified
+    functions, see revalidate.
+    :param view:
+    :param get_state:
+    :param per_user: vary the etag on the user
+    :return: view
+    """
+    @revalidate
+    def wrapped_view(request, *args, **kwargs):
+        state = get_state(request, *args, **kwargs)
+        if state is None:
+            return view(request, *args, **kwargs)
+        last_modified, parts = state
+        if per_user:
+            parts = list(parts) + user_parts(request)
+        etag = make_etag(last_modified, *parts)
+        response = condition(
+            etag_func=lambda request, *args, **kwargs: etag,
+            last_modified_func=(
+                lambda request, *args, **kwargs: last_modified
+            ),
+        )(view)(request, *args, **kwargs)
+        # views such as the sitemaps set their own
+        # Last-Modified, which must match ours for
+        # If-Modified-Since to work
+        if last_modified is not None and response.status_code == 200:
+            response['Last-Modified'] = http_date(
+                last_modified.timestamp()
+            )
+        return response
+
+    return wrapped_view
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for class based views, answering
+    GET requests with 304 Not Modified when
+    the resource hasn't changed. Subclasses
+    implement get_conditional_state(), taking
+    the view arguments, see conditional_view.
+    The etag varies on the user.
+    """
+
+    def get_conditional_state(self, request, *args, **kwargs):
+        raise NotImplementedError(
+            'Subclasses of ConditionalGetMixin must '
+            'implement get_conditional_state()'
+        )
+
+    def get(self, request, *args, **kwargs):
+        return conditional_view(
+            super().get, self.get_conditional_state, per_user=True
+        )(request, *args, **kwargs)
+
@@ -0,0 +1,307 @@
+"""
+Database connection pool.
+
+Django opens a connection for each request and
+closes it at the end, with CONN_MAX_AGE 0, and
+opening a PostgreSQL connection costs more than
+most of our queries: a TCP and TLS handshake,
+authentication and a backend process forked by
+the server. With CONN_MAX_AGE set, a connection
+is kept per thread, for ever, whether the thread
+serves requests or not, and is never checked
+before use.
+
+The pool keeps the connections of a database
+alias open in each process, to be shared by its
+threads, see core.db.postgresql. Django still
+closes its connection at the end of a request,
+which gives it back to the pool. The POOL entry
+of the database settings configures it:
+
+SIZE      connections open at most, in use or idle,
+          0 to open and close them as django does
+TIMEOUT   seconds to wait for a connection when
+          SIZE are in use
+IDLE      seconds after which an idle connection
+          is closed
+CHECK     seconds of idleness after which a
+          connection is checked with SELECT 1
+          before reuse, 0 to check every checkout
+MAX_AGE   seconds after which a connection is
+          closed rather than reused
+"""
+import os
+import threading
+import time
+from collections import Counter
+
+DEFAULTS = {
+    'SIZE': 10,
+    'TIMEOUT': 10,
+    'IDLE': 300,
+    'CHECK': 0,
+    'MAX_AGE': 3600,
+}
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def _close(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """
+    Pool of open DB-API connections. At most
+    size connections are open at once, idle
+    or in use. Each connection has an info
+    dict, for the backend to keep what it
+    learnt when opening it.
+    """
+
+    def __init__(self, name, size, timeout=10, idle=300, check=0,
+                 max_age=3600):
+        self.name = name
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle
+        self.check = check
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        # (connection, released), the last released at the end
+        self._idle = []
+        self._info = {}
+        self.stats = Counter()
+        self.wait_seconds = 0.0
+        self.connect_seconds = 0.0
+
+    def info(self, connection):
+        return self._info[id(connection)]
+
+    def _expired(self, connection, released):
+        now = time.monotonic()
+        if now - self.info(connection)['created'] > self.max_age:
+            self.stats['retired'] += 1
+            return True
+        if now - released > self.idle_timeout:
+            self.stats['expired'] += 1
+            return True
+        return False
+
+    def _valid(self, connection, released):
+        if time.monotonic() - released < self.check:
+            return True
+        self.stats['checked'] += 1
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            # ends the transaction SELECT 1 began
+            # outside autocommit mode
+            connection.rollback()
+        except Exception:
+            self.stats['failed_checks'] += 1
+            return False
+        return True
+
+    def _forget(self, connection):
+        with self._lock:
+            self._info.pop(id(connection), None)
+        _close(connection)
+
+    def _wait(self):
+        if self._slots.acquire(blocking=False):
+            return
+        self.stats['waits'] += 1
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self.timeout)
+        self.wait_seconds += time.perf_counter() - start
+        if not acquired:
+            self.stats['timeouts'] += 1
+            raise PoolTimeout(
+                'No connection to {} available after {} seconds, '
+                'the {} of the pool are in use.'.format(
+                    self.name, self.timeout, self.size
+                )
+            )
+
+    def acquire(self, connect):
+        """
+        Method to take a connection, the idle
+        one released last if any is still
+        valid, or a new one opened by connect.
+        Raises PoolTimeout when none is free
+        after timeout seconds.
+        :param connect: function returning a connection
+        :return: connection
+        """
+        self._prune()
+        self._wait()
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, released = self._idle.pop()
+                if (self._expired(connection, released)
+                        or not self._valid(connection, released)):
+                    self._forget(connection)
+                    continue
+                self.stats['reused'] += 1
+                return connection
+            start = time.perf_counter()
+            connection = connect()
+            self.connect_seconds += time.perf_counter() - start
+            with self._lock:
+                self._info[id(connection)] = {'created': time.monotonic()}
+            self.stats['created'] += 1
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection):
+        """
+        Method to give a connection back to
+        the pool, rolling back the transaction
+        left open, if any. A connection which
+        cannot be rolled back is closed.
+        :param connection:
+        :return:
+        """
+        try:
+            try:
+                connection.rollback()
+            except Exception:
+                self.stats['discarded'] += 1
+                self._forget(connection)
+                return
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+        self._prune()
+
+    def _prune(self):
+        # the idle connections are in the order
+        # they were released, the oldest first
+        now = time.monotonic()
+        with self._lock:
+            count = 0
+            for connection, released in self._idle:
+                if now - released <= self.idle_timeout:
+                    break
+                count += 1
+            expired, self._idle[:count] = self._idle[:count], []
+        for connection, released in expired:
+            self.stats['expired'] += 1
+            self._forget(connection)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, released in idle:
+            self._forget(connection)
+
+    def as_dict(self):
+        """
+        Method to return the metrics of the pool:
+        the connections open, idle and in use,
+        the counters of the connections created,
+        reused, checked, expired, retired or
+        discarded, of the waits and timeouts, and
+        the seconds spent waiting and connecting.
+        :return: dict
+        """
+        with self._lock:
+            open_count = len(self._info)
+            idle_count = len(self._idle)
+        stats = {
+            key: self.stats[key] for key in (
+                'created', 'reused', 'checked', 'failed_checks',
+                'expired', 'retired', 'discarded', 'waits', 'timeouts',
+            )
+        }
+        stats.update(
+            size=self.size,
+            open=open_count,
+            idle=idle_count,
+            in_use=open_count - idle_count,
+            wait_seconds=round(self.wait_seconds, 6),
+            connect_seconds=round(self.connect_seconds, 6),
+        )
+        return stats
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def get_pool(alias, settings_dict):
+    """
+    Function to return the pool of the
+    database alias in this process, made
+    from the POOL of its settings, or None
+    when its SIZE is 0.
+    :param alias:
+    :param settings_dict: the database settings
+    :return: ConnectionPool
+    """
+    global _pid
+    with _pools_lock:
+        if _pid != os.getpid():
+            # the connections opened before a fork
+            # belong to the parent, closing them
+            # would close its sockets
+            _pools.clear()
+            _pid = os.getpid()
+        pool = _pools.get(alias)
+        if pool is None:
+            options = dict(DEFAULTS, **settings_dict.get('POOL') or {})
+            if not options['SIZE']:
+                return None
+            pool = _pools[alias] = ConnectionPool(
+                alias,
+                size=options['SIZE'],
+                timeout=options['TIMEOUT'],
+                idle=options['IDLE'],
+                check=options['CHECK'],
+                max_age=options['MAX_AGE'],
+            )
+        return pool
+
+
+def reset_pool(alias):
+    """
+    Function to close the connections of the
+    pool of alias and drop it, so that the
+    next connection builds it again from the
+    settings.
+    :param alias:
+    :return:
+    """
+    with _pools_lock:
+        pool = _pools.pop(alias, None)
+    if pool is not None:
+        pool.close_all()
+
+
+def pool_stats():
+    """
+    Function to return the metrics of the
+    pools of this process, by alias.
+    :return: dict
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.as_dict() for alias, pool in pools.items()}
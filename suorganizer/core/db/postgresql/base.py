@@ -0,0 +1,43 @@
+"""
+PostgreSQL backend taking its connections from
+the pool of core.db.pool, set as the ENGINE:
+
+    'ENGINE': 'core.db.postgresql',
+    'POOL': {'SIZE': 10, ...},
+
+Keep CONN_MAX_AGE at 0: django then gives the
+connection back to the pool at the end of each
+request rather than keeping it in its thread.
+"""
+import functools
+
+from django.db.backends.postgresql import base
+
+from ..pool import PoolTimeout, get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.settings_dict)
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            connection = pool.acquire(functools.partial(
+                super().get_new_connection, conn_params
+            ))
+        except PoolTimeout as error:
+            raise base.Database.OperationalError(str(error)) from error
+        info = pool.info(connection)
+        # get_new_connection() records the isolation
+        # level of a new connection on the wrapper,
+        # kept for the wrappers reusing it
+        info.setdefault('isolation_level', self.isolation_level)
+        self.isolation_level = info['isolation_level']
+        return connection
+
+    def _close(self):
+        pool = get_pool(self.alias, self.settings_dict)
+        if pool is None or self.connection is None:
+            return super()._close()
+        pool.release(self.connection)
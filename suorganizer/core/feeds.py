@@ -0,0 +1,223 @@
+"""
+Cached syndication feeds.
+
+Feed readers and aggregators poll the feeds
+constantly, while their content only changes
+when a post is published or a newslink added.
+Feeds using CachedFeedMixin are served from
+the cache, as the serialised document along
+with its etag and last modified time, so a hit
+costs no database query at all, even for a
+conditional GET.
+
+The apps push changes: their signal handlers
+call refresh_feeds(), which renders the
+affected feeds again in a background thread
+once the transaction commits, so the cache
+is already warm when the next reader comes.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.http import Http404, HttpRequest, HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .asyncviews import database_sync_to_async
+from .conditional import revalidate
+
+logger = logging.getLogger(__name__)
+
+FEED_KEY = 'feed.{name}.{args}'
+
+# A single worker renders the feeds one after
+# the other, off the request path.
+_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def feed_cache():
+    return caches['default']
+
+
+class FeedRequest(HttpRequest):
+    """
+    Request used to render a feed outside of
+    a request, for the current site, with the
+    protocol of the SITEMAP_PROTOCOL setting.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.method = 'GET'
+        self.path = self.path_info = path
+        self.META['SERVER_NAME'] = Site.objects.get_current().domain
+        self.META['SERVER_PORT'] = '443' if self._is_https() else '80'
+
+    @staticmethod
+    def _is_https():
+        return getattr(settings, 'SITEMAP_PROTOCOL', 'https') == 'https'
+
+    def _get_scheme(self):
+        return 'https' if self._is_https() else 'http'
+
+
+class CachedFeedMixin:
+    """
+    Mixin for syndication feeds, serving the
+    feed from the cache. url_name is the name
+    of the url of the feed, used to render it
+    outside of a request. The cached document
+    is replaced by refresh_feeds(), or when
+    it expires after cache_timeout() seconds.
+    """
+    url_name = None
+
+    def cache_key(self, **kwargs):
+        args = '.'.join(
+            str(value).lower() for name, value in sorted(kwargs.items())
+        )
+        return FEED_KEY.format(name=self.url_name, args=args)
+
+    def cache_timeout(self):
+        """
+        Method to return the number of seconds
+        the feed is cached for, so that a missed
+        refresh is not served forever.
+        :return:
+        """
+        return getattr(settings, 'FEED_CACHE_TIMEOUT', 3600)
+
+    def render(self, request, **kwargs):
+        """
+        Method to render the feed and cache the
+        document with its etag and last
+        modified time.
+        :param request:
+        :param kwargs:
+        :return: dict
+        """
+        response = super().__call__(request, **kwargs)
+        entry = {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'etag': md5(response.content).hexdigest(),
+            'last_modified': timezone.now(),
+        }
+        feed_cache().set(
+            self.cache_key(**kwargs), entry, self.cache_timeout()
+        )
+        return entry
+
+    def __call__(self, request, *args, **kwargs):
+        entry = feed_cache().get(self.cache_key(**kwargs))
+        if entry is None:
+            entry = self.render(request, **kwargs)
+        return self.serve(request, entry)
+
+    @staticmethod
+    def serve(request, entry):
+        """
+        Method to answer request with a cached
+        entry, without any database query.
+        :param request:
+        :param entry:
+        :return:
+        """
+        @revalidate
+        @condition(
+            etag_func=lambda request: entry['etag'],
+            last_modified_func=lambda request: entry['last_modified'],
+        )
+        def respond(request):
+            return HttpResponse(
+                entry['content'], content_type=entry['content_type']
+            )
+
+        return respond(request)
+
+    def refresh(self, **kwargs):
+        """
+        Method to render the feed again outside
+        of a request. The cached document is
+        removed if the feed no longer exists.
+        :param kwargs:
+        :return:
+        """
+        request = FeedRequest(reverse(self.url_name, kwargs=kwargs))
+        try:
+            self.render(request, **kwargs)
+        except Http404:
+            self.forget(**kwargs)
+
+    def forget(self, **kwargs):
+        feed_cache().delete(self.cache_key(**kwargs))
+
+
+def async_feed(feed):
+    """
+    Function to return the async variant of
+    a CachedFeedMixin feed, see
+    core.asyncviews. A cached feed is served
+    without leaving the event loop, a miss
+    is rendered in the thread pool.
+    :param feed:
+    :return: view
+    """
+    if not getattr(settings, 'ASYNC_VIEWS', False):
+        return feed
+    render = database_sync_to_async(feed)
+
+    async def view(request, *args, **kwargs):
+        entry = feed_cache().get(feed.cache_key(**kwargs))
+        if entry is None:
+            return await render(request, *args, **kwargs)
+        return feed.serve(request, entry)
+
+    return view
+
+
+def _refresh(feeds, kwargs):
+    try:
+        for feed in feeds:
+            feed.refresh(**kwargs)
+    except Exception:
+        logger.exception('Could not refresh feeds %s', feeds)
+    finally:
+        # the worker thread has its own connections
+        connections.close_all()
+
+
+def refresh_feeds(feeds, **kwargs):
+    """
+    Function to render the feeds again in the
+    background once the current transaction
+    commits.
+    :param feeds: CachedFeedMixin instances
+    :param kwargs: the url arguments of the feeds
+    :return:
+    """
+    transaction.on_commit(
+        lambda: _executor.submit(_refresh, feeds, kwargs)
+    )
+
+
+def forget_feeds(feeds, **kwargs):
+    """
+    Function to remove the cached documents
+    of feeds which no longer exist, once the
+    current transaction commits.
+    :param feeds: CachedFeedMixin instances
+    :param kwargs: the url arguments of the feeds
+    :return:
+    """
+    def forget():
+        for feed in feeds:
+            feed.forget(**kwargs)
+
+    transaction.on_commit(forget)
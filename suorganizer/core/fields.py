@@ -0,0 +1,113 @@
+"""
+Slug fields and lookups.
+
+Slugs are stored lowercased, whatever wrote
+them: forms, the admin, fixtures or the
+importer. A case-insensitive lookup is then
+answered with an exact match on the lowercased
+value, served by the unique index on the slug,
+see get_by_slug(). Django compiles slug__iexact
+to UPPER(slug) = UPPER(%s) on PostgreSQL, which
+a plain index cannot serve. The fallback to
+__iexact, for rows written around the model,
+e.g. with raw SQL, is served by the functional
+indexes of FunctionalIndex.
+"""
+from django.db import models
+from django.db.migrations.operations.base import Operation
+
+
+class LowercaseSlugField(models.SlugField):
+    """
+    SlugField lowercasing its value when the
+    model instance is saved.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if value:
+            value = value.lower()
+            setattr(model_instance, self.attname, value)
+        return value
+
+
+def get_by_slug(queryset, **lookup):
+    """
+    Function like queryset.get(**lookup),
+    trying the __iexact lookups as exact
+    matches on the lowercased values first.
+    :param queryset:
+    :param lookup:
+    :return: model instance
+    """
+    exact = {}
+    for name, value in lookup.items():
+        if name.endswith('__iexact') and isinstance(value, str):
+            exact[name[:-len('__iexact')]] = value.lower()
+        else:
+            exact[name] = value
+    if exact == lookup:
+        return queryset.get(**lookup)
+    try:
+        return queryset.get(**exact)
+    except queryset.model.DoesNotExist:
+        return queryset.get(**lookup)
+
+
+class FunctionalIndex(Operation):
+    """
+    Migration operation creating an index on
+    SQL expressions, such as UPPER("slug"::text),
+    which django 3.1 indexes cannot express.
+    The index is only created on the database
+    vendors listed, by default PostgreSQL, as
+    the other backends compile __iexact to
+    lookups no index can serve.
+    """
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, name, expressions,
+                 vendors=('postgresql',)):
+        self.model_name = model_name
+        self.name = name
+        self.expressions = expressions
+        self.vendors = vendors
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def _allowed(self, schema_editor, model):
+        return (
+            schema_editor.connection.vendor in self.vendors
+            and self.allow_migrate_model(
+                schema_editor.connection.alias, model
+            )
+        )
+
+    def database_forwards(self, app_label, schema_editor,
+                          from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self._allowed(schema_editor, model):
+            return
+        schema_editor.execute(
+            'CREATE INDEX {name} ON {table} ({expressions})'.format(
+                name=schema_editor.quote_name(self.name),
+                table=schema_editor.quote_name(model._meta.db_table),
+                expressions=', '.join(self.expressions)
+            )
+        )
+
+    def database_backwards(self, app_label, schema_editor,
+                           from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self._allowed(schema_editor, model):
+            return
+        schema_editor.execute(
+            'DROP INDEX {}'.format(schema_editor.quote_name(self.name))
+        )
+
+    def describe(self):
+        return 'Create index {} on {}({})'.format(
+            self.name, self.model_name, ', '.join(self.expressions)
+        )
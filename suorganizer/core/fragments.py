@@ -0,0 +1,156 @@
+"""
+Versioned template fragment cache.
+
+The expensive parts of the detail templates are
+wrapped in django's {% cache %} tag, varying on
+the version of the object they display:
+
+    {% load cache fragment_cache %}
+    {% cache 3600 startup_detail startup|fragment_version %}
+
+Each object has a version token stored in the
+cache. Changing the object, or anything that is
+displayed along with it, replaces the token, so
+the next render uses a new key and the stale
+fragment is simply never read again.
+The tokens are random rather than counters, so
+an evicted token can never bring back an old
+fragment.
+"""
+from uuid import uuid4
+
+from django.core.cache import InvalidCacheBackendError, caches
+from django.db import transaction
+
+VERSION_KEY = 'fragment.version.{label}.{pk}'
+
+
+def fragment_cache():
+    """
+    Function to return the cache used by
+    the {% cache %} template tag, so that
+    versions live next to the fragments.
+    :return:
+    """
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def _version_key(model, pk):
+    return VERSION_KEY.format(
+        label=model._meta.label_lower,
+        pk=pk
+    )
+
+
+def get_fragment_version(obj):
+    """
+    Function to return the current version
+    token of obj, creating one if the object
+    has none yet.
+    :param obj:
+    :return: version(string)
+    """
+    return get_version(type(obj), obj.pk)
+
+
+def get_version(model, pk):
+    """
+    Function to return the current version
+    token of the model instance with primary
+    key pk, without loading the instance.
+    :param model:
+    :param pk:
+    :return: version(string)
+    """
+    cache = fragment_cache()
+    key = _version_key(model, pk)
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        # add() will not overwrite a token set
+        # by a concurrent request in between
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate_fragments(model, pks):
+    """
+    Function to replace the version token of
+    every model instance in pks. The change
+    is only made once the current transaction
+    commits, so no request can cache the old
+    data under the new version.
+    :param model:
+    :param pks:
+    :return:
+    """
+    keys = [_version_key(model, pk) for pk in set(pks)]
+    if not keys:
+        return
+
+    def bump():
+        fragment_cache().set_many(
+            {key: uuid4().hex for key in keys},
+            timeout=None
+        )
+
+    transaction.on_commit(bump)
+
+
+def m2m_changed_pks(sender, instance, model, action, pk_set):
+    """
+    Function to find the primary keys of the
+    objects on the other side of an m2m_changed
+    signal. For clear actions django doesn't
+    send a pk_set, so it has to be read from
+    the through table before it is emptied.
+    :param sender:
+    :param instance:
+    :param model:
+    :param action:
+    :param pk_set:
+    :return: set of primary keys
+    """
+    if action != 'pre_clear':
+        return pk_set or set()
+    source = target = None
+    for field in sender._meta.fields:
+        if not field.is_relation:
+            continue
+        if field.related_model == type(instance) and source is None:
+            source = field
+        elif field.related_model == model:
+            target = field
+    return set(
+        sender.objects.filter(
+            **{source.attname: instance.pk}
+        ).values_list(target.attname, flat=True)
+    )
+
+
+def invalidate_m2m_fragments(sender, instance, action,
+                             model, pk_set, **kwargs):
+    """
+    Receiver for m2m_changed, invalidating
+    the fragments of the objects on both
+    sides of the relation. Connected by
+    the apps for each of their m2m fields.
+    :param sender:
+    :param instance:
+    :param action:
+    :param model:
+    :param pk_set:
+    :param kwargs:
+    :return:
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    invalidate_fragments(type(instance), [instance.pk])
+    invalidate_fragments(
+        model,
+        m2m_changed_pks(sender, instance, model, action, pk_set)
+    )
@@ -0,0 +1,115 @@
+"""
+Template loading.
+
+Templates are compiled once per process by the
+cached Loader below and kept in memory, instead
+of being read and parsed from disk for every
+request. warm_templates() compiles all of them
+ahead of the first request, when a server
+process starts with the TEMPLATE_WARMUP
+setting, see CoreConfig.ready() and the wsgi
+and asgi modules.
+
+With template debugging on, as in development,
+the Loader checks the modification time of a
+template file before using its compiled copy,
+and compiles it again when the file changed.
+"""
+import logging
+import os
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders import cached
+from django.template.utils import get_app_template_dirs
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except (OSError, TypeError):
+        return None
+
+
+class Loader(cached.Loader):
+    """
+    Cached loader compiling a template again
+    when its file changed, if the engine
+    debugs templates.
+    """
+
+    def __init__(self, engine, loaders):
+        super().__init__(engine, loaders)
+        self.mtimes = {}
+
+    def get_template(self, template_name, skip=None):
+        if not self.engine.debug:
+            return super().get_template(template_name, skip)
+        key = self.cache_key(template_name, skip)
+        cached_template = self.get_template_cache.get(key)
+        if isinstance(cached_template, TemplateDoesNotExist) or (
+                key in self.mtimes
+                and _mtime(cached_template.origin.name) != self.mtimes[key]):
+            # the template may have been added or changed
+            del self.get_template_cache[key]
+            self.mtimes.pop(key, None)
+        template = super().get_template(template_name, skip)
+        if key not in self.mtimes:
+            self.mtimes[key] = _mtime(template.origin.name)
+        return template
+
+    def reset(self):
+        super().reset()
+        self.mtimes.clear()
+
+
+def template_names(engine):
+    """
+    Generator returning the name of every
+    template file in the directories of
+    engine and of the installed apps.
+    :param engine:
+    :return:
+    """
+    seen = set()
+    directories = list(engine.dirs) + list(get_app_template_dirs('templates'))
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            for filename in sorted(files):
+                if not filename.endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                name = os.path.relpath(
+                    os.path.join(root, filename), directory
+                ).replace(os.sep, '/')
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def warm_templates():
+    """
+    Function to compile every template of
+    the django template engines, so they
+    are in the cache of their loader. A
+    template failing to compile is logged
+    and will fail again when used.
+    :return: (number compiled, number failed)
+    """
+    compiled = failed = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as error:
+                failed += 1
+                logger.warning('Could not compile %s: %s', name, error)
+            else:
+                compiled += 1
+    return compiled, failed
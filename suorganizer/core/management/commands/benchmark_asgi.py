@@ -0,0 +1,162 @@
+import json
+import os
+import shlex
+import socket
+import subprocess
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from organizers.models import Startup, Tag
+
+from ...benchmark import load
+
+ASGI_COMMAND = (
+    'uvicorn suorganizer.asgi:application --host 127.0.0.1 '
+    '--port {port} --workers 1 --no-access-log'
+)
+WSGI_COMMAND = (
+    'uwsgi --http-socket 127.0.0.1:{port} -w suorganizer.wsgi '
+    '-p 1 --threads {concurrency} --disable-logging'
+)
+
+
+class Command(BaseCommand):
+    """
+    Command class to compare the throughput of
+    the site served by one ASGI process, with
+    the async views of core.asyncviews, and by
+    one WSGI process, with the sync views and
+    as many threads as concurrent clients.
+    Both servers are started in turn with the
+    current settings and database, and get
+    the same requests from the same number of
+    concurrent clients.
+    """
+    help = (
+        'Benchmark the public read only pages under '
+        'ASGI with async views against WSGI.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Path to request, by default the lists, '
+                 'a tag, a startup and the feeds.'
+        )
+        parser.add_argument('--asgi-command', default=ASGI_COMMAND)
+        parser.add_argument('--wsgi-command', default=WSGI_COMMAND)
+        parser.add_argument(
+            '--json', help='File to write the results to.'
+        )
+
+    @staticmethod
+    def default_paths():
+        tag = Tag.objects.order_by('pk').first()
+        startup = Startup.objects.order_by('pk').first()
+        paths = [
+            reverse('blogs_posts_list'),
+            reverse('organizers_tag_list'),
+            reverse('organizers_startup_list'),
+            reverse('blogs_rss_feed'),
+        ]
+        if tag is not None:
+            paths.append(tag.get_absolute_url())
+        if startup is not None:
+            paths.append(startup.get_absolute_url())
+            paths.append(reverse(
+                'organizers_startup_rss_feed',
+                kwargs={'startup_slug': startup.slug}
+            ))
+        return paths
+
+    @staticmethod
+    def wait_for(port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return False
+            try:
+                socket.create_connection(('127.0.0.1', port), 1).close()
+                return True
+            except OSError:
+                time.sleep(0.2)
+        return False
+
+    def run_server(self, name, command, async_views, paths, options):
+        """
+        Method to start a server with command,
+        load it with the paths and stop it.
+        :return: the results of load()
+        """
+        env = dict(os.environ, ASYNC_VIEWS=str(async_views).lower())
+        args = shlex.split(command.format(
+            port=options['port'], concurrency=options['concurrency']
+        ))
+        base_url = 'http://127.0.0.1:{}'.format(options['port'])
+        with tempfile.TemporaryFile() as log:
+            try:
+                process = subprocess.Popen(
+                    args, cwd=settings.BASE_DIR, env=env,
+                    stdout=log, stderr=subprocess.STDOUT
+                )
+            except FileNotFoundError:
+                raise CommandError(
+                    '{} is not installed, see --{}-command.'.format(
+                        args[0], name.lower()
+                    )
+                )
+            try:
+                if not self.wait_for(options['port'], process):
+                    log.seek(0)
+                    raise CommandError('{} did not start:\n{}'.format(
+                        name, log.read().decode(errors='replace')
+                    ))
+                load(base_url, paths, options['concurrency'],
+                     options['warmup'])
+                return load(base_url, paths, options['concurrency'],
+                            options['requests'])
+            finally:
+                process.terminate()
+                process.wait(10)
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        paths = options['paths'] or self.default_paths()
+        results = {
+            'paths': paths,
+            'concurrency': options['concurrency'],
+            'ASGI': self.run_server(
+                'ASGI', options['asgi_command'], True, paths, options
+            ),
+            'WSGI': self.run_server(
+                'WSGI', options['wsgi_command'], False, paths, options
+            ),
+        }
+        for name in ('ASGI', 'WSGI'):
+            result = results[name]
+            self.stdout.write(
+                '{}: {:.1f} requests/s, p50 {:.1f} ms, p95 {:.1f} ms, '
+                'p99 {:.1f} ms, {} errors, statuses {}'.format(
+                    name, result['requests_per_second'],
+                    (result['p50'] or 0) * 1000,
+                    (result['p95'] or 0) * 1000,
+                    (result['p99'] or 0) * 1000,
+                    result['errors'], result['statuses']
+                )
+            )
+        if options['json']:
+            with open(options['json'], 'w') as output:
+                json.dump(results, output, indent=2)
@@ -0,0 +1,160 @@
+import json
+import time
+from statistics import mean
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import reverse
+
+from ...benchmark import BENCHMARK_USER, percentile
+from ...db.pool import DEFAULTS, pool_stats, reset_pool
+
+ENGINE = 'core.db.postgresql'
+
+
+class Command(BaseCommand):
+    """
+    Command class measuring a page, the post
+    list by default, with the connections of
+    the database opened and closed for each
+    request, as django does, then taken from
+    the pool of core.db.pool. The requests are
+    served in this process by a test client,
+    which closes the connection at the end of
+    each request like the server would, so the
+    difference is the connection overhead.
+    """
+    help = 'Benchmark a page with and without the database connection pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--route', default='blogs_posts_list')
+        parser.add_argument(
+            '--database', default='default',
+            help='Alias of the database, using the {} engine.'.format(ENGINE)
+        )
+        parser.add_argument(
+            '--user', default=BENCHMARK_USER,
+            help='Email of the user logged in.'
+        )
+        parser.add_argument(
+            '--json', help='File to write the results to.'
+        )
+
+    def get_client(self, email):
+        user_model = get_user_model()
+        try:
+            user = user_model.objects.get_by_natural_key(email)
+        except user_model.DoesNotExist:
+            raise CommandError(
+                'No user {}, run seed_benchmark or use --user.'.format(email)
+            )
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def measure(self, client, path, alias, size, requests, warmup):
+        """
+        Method to request path with a pool of
+        size connections, 0 for none.
+        :param client:
+        :param path:
+        :param alias:
+        :param size:
+        :param requests:
+        :param warmup:
+        :return: dict
+        """
+        connection = connections[alias]
+        connection.close()
+        reset_pool(alias)
+        connection.settings_dict['POOL'] = dict(
+            DEFAULTS, **connection.settings_dict.get('POOL') or {},
+        )
+        connection.settings_dict['POOL']['SIZE'] = size
+        opened = []
+
+        def count(sender, connection, **kwargs):
+            if connection.alias == alias:
+                opened.append(connection)
+
+        for _ in range(warmup):
+            client.get(path)
+        connection_created.connect(count)
+        times = []
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = client.get(path)
+                times.append(time.perf_counter() - start)
+        finally:
+            connection_created.disconnect(count)
+        times.sort()
+        return {
+            'pool_size': size,
+            'status': response.status_code,
+            'requests': requests,
+            # every connection, new or taken from the pool
+            'connections': len(opened),
+            'mean_ms': mean(times) * 1000,
+            'p50_ms': percentile(times, 0.5) * 1000,
+            'p95_ms': percentile(times, 0.95) * 1000,
+            'pool': pool_stats().get(alias),
+        }
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        alias = options['database']
+        settings_dict = connections[alias].settings_dict
+        if settings_dict['ENGINE'] != ENGINE:
+            raise CommandError(
+                'The database {} does not use the {} engine.'.format(
+                    alias, ENGINE
+                )
+            )
+        if settings_dict['CONN_MAX_AGE']:
+            raise CommandError(
+                'Set CONN_MAX_AGE to 0, connections are kept '
+                'open by django, not the pool.'
+            )
+        pool = dict(settings_dict.get('POOL') or {})
+        size = pool.get('SIZE', DEFAULTS['SIZE']) or DEFAULTS['SIZE']
+        client = self.get_client(options['user'])
+        path = reverse(options['route'])
+        results = {'route': options['route'], 'path': path}
+        try:
+            for mode, pool_size in (('unpooled', 0), ('pooled', size)):
+                result = self.measure(
+                    client, path, alias, pool_size,
+                    options['requests'], options['warmup']
+                )
+                results[mode] = result
+                self.stdout.write(
+                    '{}: mean {:.2f} ms, p50 {:.2f} ms, p95 {:.2f} ms, '
+                    'status {}, pool {}'.format(
+                        mode, result['mean_ms'], result['p50_ms'],
+                        result['p95_ms'], result['status'], result['pool']
+                    )
+                )
+        finally:
+            connections[alias].close()
+            reset_pool(alias)
+            settings_dict['POOL'] = pool
+        results['saved_ms_per_request'] = (
+            results['unpooled']['mean_ms'] - results['pooled']['mean_ms']
+        )
+        self.stdout.write('Saved {:.2f} ms per request'.format(
+            results['saved_ms_per_request']
+        ))
+        if options['json']:
+            with open(options['json'], 'w') as output:
+                json.dump(results, output, indent=2)
@@ -0,0 +1,166 @@
+import json
+import random
+from statistics import median
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ...benchmark import percentile
+
+TABLE = 'benchmark_slugs'
+
+# The lookups measured, in the order they run,
+# with the index created before each of them.
+# iexact is the SQL of slug__iexact on PostgreSQL.
+CASES = [
+    ('exact', None, 'slug = LOWER(%s)'),
+    ('iexact, no functional index', None,
+     'UPPER(slug::text) = UPPER(%s)'),
+    ('iexact', 'UPPER(slug::text)',
+     'UPPER(slug::text) = UPPER(%s)'),
+    ('newslink iexact', 'startup_id, UPPER(slug::text)',
+     'startup_id = %s AND UPPER(slug::text) = UPPER(%s)'),
+]
+
+
+def plan_nodes(plan):
+    """
+    Function to list the nodes of an EXPLAIN
+    plan, with the index they scan.
+    :param plan:
+    :return: list of strings
+    """
+    node = plan['Node Type']
+    if 'Index Name' in plan:
+        node = '{} on {}'.format(node, plan['Index Name'])
+    nodes = [node]
+    for child in plan.get('Plans', []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+class Command(BaseCommand):
+    """
+    Command class measuring the slug lookups
+    on PostgreSQL against a temporary table of
+    --rows slugs: an exact match on the unique
+    index, and __iexact without and with the
+    UPPER(slug) functional indexes of
+    core.fields.FunctionalIndex. Each lookup is
+    run with EXPLAIN ANALYZE, reporting the
+    execution time of the server and the plan,
+    e.g. an Index Scan rather than a Seq Scan.
+    """
+    help = 'Benchmark the slug lookups with and without functional indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument(
+            '--lookups', type=int, default=200,
+            help='Number of lookups per case.'
+        )
+        parser.add_argument(
+            '--json', help='File to write the results to.'
+        )
+
+    def create_table(self, cursor, rows):
+        cursor.execute(
+            'CREATE TEMPORARY TABLE {} ('
+            'id serial PRIMARY KEY, '
+            'slug varchar(63) NOT NULL UNIQUE, '
+            'startup_id integer NOT NULL)'.format(TABLE)
+        )
+        cursor.execute(
+            "INSERT INTO {} (slug, startup_id) "
+            "SELECT 'slug-' || md5(n::text), n %% 1000 "
+            "FROM generate_series(1, %s) AS n".format(TABLE),
+            [rows]
+        )
+        self.analyze(cursor)
+
+    @staticmethod
+    def analyze(cursor):
+        # VACUUM sets the visibility map,
+        # needed for index only scans
+        cursor.execute('VACUUM ANALYZE {}'.format(TABLE))
+
+    def measure(self, cursor, where, rows, lookups):
+        """
+        Method to run a lookup for random rows
+        with EXPLAIN ANALYZE.
+        :param cursor:
+        :param where:
+        :param rows:
+        :param lookups:
+        :return: dict
+        """
+        times = []
+        plans = set()
+        for row in random.sample(range(1, rows + 1), lookups):
+            cursor.execute(
+                'SELECT slug, startup_id FROM {} WHERE id = %s'.format(
+                    TABLE
+                ),
+                [row]
+            )
+            slug, startup_id = cursor.fetchone()
+            params = [slug.upper()]
+            if where.startswith('startup_id'):
+                params.insert(0, startup_id)
+            cursor.execute(
+                'EXPLAIN (ANALYZE, FORMAT JSON) '
+                'SELECT * FROM {} WHERE {}'.format(TABLE, where),
+                params
+            )
+            explain = cursor.fetchone()[0]
+            if isinstance(explain, str):
+                explain = json.loads(explain)
+            times.append(explain[0]['Execution Time'])
+            plans.add(' > '.join(plan_nodes(explain[0]['Plan'])))
+        return {
+            'median_ms': median(times),
+            'p95_ms': percentile(sorted(times), 0.95),
+            'plans': sorted(plans),
+        }
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        if connection.vendor != 'postgresql':
+            raise CommandError(
+                'The slug benchmark needs PostgreSQL, '
+                'the database is {}.'.format(connection.vendor)
+            )
+        rows = options['rows']
+        lookups = min(options['lookups'], rows)
+        results = []
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS {}'.format(TABLE))
+            self.create_table(cursor, rows)
+            for number, (name, index, where) in enumerate(CASES):
+                if index is not None:
+                    cursor.execute(
+                        'CREATE INDEX {table}_{number} '
+                        'ON {table} ({index})'.format(
+                            table=TABLE, number=number, index=index
+                        )
+                    )
+                    self.analyze(cursor)
+                result = self.measure(cursor, where, rows, lookups)
+                result.update(case=name, where=where, index=index)
+                results.append(result)
+                self.stdout.write(
+                    '{case:<30} median {median_ms:8.3f} ms  '
+                    'p95 {p95_ms:8.3f} ms  {plans}'.format(**result)
+                )
+            cursor.execute('DROP TABLE {}'.format(TABLE))
+        if options['json']:
+            with open(options['json'], 'w') as json_file:
+                json.dump(
+                    {'rows': rows, 'lookups': lookups, 'results': results},
+                    json_file, indent=2
+                )
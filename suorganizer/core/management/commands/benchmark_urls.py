@@ -0,0 +1,306 @@
+import json
+import subprocess
+from statistics import mean
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from blogs.models import Post
+from export.resources import RESOURCES
+from organizers.models import NewsLink, Startup, Tag
+from users.models import Profile
+
+from ...benchmark import BENCHMARK_USER, load
+from ...querycount import QueryRecorder
+from ...sitemaps import get_sitemaps
+
+
+def spread(queryset, count):
+    """
+    Function to pick count objects spread
+    evenly over queryset, ordered by pk.
+    :param queryset:
+    :param count:
+    :return: list
+    """
+    queryset = queryset.order_by('pk')
+    total = queryset.count()
+    if not total:
+        return []
+    offsets = sorted({
+        number * total // count for number in range(min(count, total))
+    })
+    return [queryset[offset] for offset in offsets]
+
+
+def _post_kwargs(post):
+    return {
+        'year': post.pub_date.year,
+        'month': post.pub_date.month,
+        'slug': post.slug,
+    }
+
+
+# The routes driven, by url name, with a function
+# returning the url kwargs for the sampled objects
+ROUTES = {
+    'blogs_posts_list': lambda samples: [{}],
+    'blogs_post_detail': lambda samples: [
+        _post_kwargs(post) for post in samples['posts']
+    ],
+    'blogs_post_archive_year': lambda samples: [
+        {'year': year} for year in sorted({
+            post.pub_date.year for post in samples['posts']
+        })
+    ],
+    'blogs_post_archive_month': lambda samples: [
+        {'year': year, 'month': month} for year, month in sorted({
+            (post.pub_date.year, post.pub_date.month)
+            for post in samples['posts']
+        })
+    ],
+    'organizers_tag_list': lambda samples: [{}],
+    'organizers_tag_detail': lambda samples: [
+        {'slug': tag.slug} for tag in samples['tags']
+    ],
+    'organizers_startup_list': lambda samples: [{}],
+    'organizers_startup_detail': lambda samples: [
+        {'slug': startup.slug} for startup in samples['startups']
+    ],
+    'blogs_atom_feed': lambda samples: [{}],
+    'blogs_rss_feed': lambda samples: [{}],
+    'organizers_startup_atom_feed': lambda samples: [
+        {'startup_slug': startup.slug} for startup in samples['startups']
+    ],
+    'organizers_startup_rss_feed': lambda samples: [
+        {'startup_slug': startup.slug} for startup in samples['startups']
+    ],
+    'sitemaps': lambda samples: [{}],
+    'django.contrib.sitemaps.views.sitemap': lambda samples: [
+        {'section': section} for section in get_sitemaps()
+    ],
+    'site_search': lambda samples: [{}],
+    'export': lambda samples: [
+        {'resource': resource} for resource in RESOURCES
+    ],
+    'contact': lambda samples: [{}],
+    'about_site': lambda samples: [{}],
+    'site_mission': lambda samples: [{}],
+    'site_work': lambda samples: [{}],
+    'dj-auth:login': lambda samples: [{}],
+    'dj-auth:create': lambda samples: [{}],
+    'dj-auth:create_done': lambda samples: [{}],
+    'dj-auth:resend_activation': lambda samples: [{}],
+    'dj-auth:pw_reset_start': lambda samples: [{}],
+    'dj-auth:pw_reset_sent': lambda samples: [{}],
+    'dj-auth:pw_reset_complete': lambda samples: [{}],
+    'dj-auth:pw_change': lambda samples: [{}],
+    'dj-auth:pw_change_done': lambda samples: [{}],
+    'dj-auth:profile': lambda samples: [{}],
+    'dj-auth:public_profile': lambda samples: [
+        {'slug': profile.slug} for profile in samples['profiles']
+    ],
+}
+# Query strings added to the paths of a route
+QUERIES = {
+    'site_search': '?q=cloud',
+}
+# Routes not driven: forms changing data, links
+# holding tokens, and the admin and debug pages
+SKIPPED_PREFIXES = ('admin:', 'djdt:')
+SKIPPED = {
+    'blogs_post_create', 'blogs_post_update', 'blogs_post_delete',
+    'organizers_startup_create', 'organizers_startup_update',
+    'organizers_startup_delete', 'organizers_newslink_create',
+    'organizers_newslink_update', 'organizers_newslink_delete',
+    'organizers_tag_create', 'organizers_tag_update',
+    'organizers_tag_delete', 'dj-auth:logout', 'dj-auth:disable',
+    'dj-auth:activate', 'dj-auth:pw_reset_confirm', 'dj-auth:profile_update',
+    'profile_list', 'profile_detail', 'query_report', 'db_pool_report',
+}
+
+
+def url_names(patterns, namespace=None):
+    """
+    Generator returning the names of every
+    url pattern, with their namespace.
+    :param patterns:
+    :param namespace:
+    :return:
+    """
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from url_names(pattern.url_patterns, ':'.join(
+                filter(None, (namespace, pattern.namespace))
+            ) or None)
+        elif pattern.name:
+            yield ':'.join(filter(None, (namespace, pattern.name)))
+
+
+class Command(BaseCommand):
+    """
+    Command class to load a running server
+    with every route of suorganizer.urls
+    serving pages, one route after the
+    other, and report the latency
+    percentiles, the throughput and the
+    number of queries per request of each.
+    The queries are counted in this process,
+    with a test client, as the server may
+    not run the QueryCountMiddleware.
+    Pages requiring a login are requested as
+    the benchmark user of seed_benchmark.
+    The results are written as JSON, with
+    the commit and the size of the dataset,
+    to compare runs.
+    """
+    help = 'Benchmark every page of the site against a running server.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://127.0.0.1:8000',
+            help='Url of the server to benchmark.'
+        )
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Number of requests per route.'
+        )
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument(
+            '--samples', type=int, default=20,
+            help='Number of objects requested per detail route.'
+        )
+        parser.add_argument(
+            '--route', action='append', dest='routes',
+            help='Url name of a route to run, all by default.'
+        )
+        parser.add_argument(
+            '--user', default=BENCHMARK_USER,
+            help='Email of the user logged in.'
+        )
+        parser.add_argument(
+            '--json', help='File to write the results to.'
+        )
+
+    @staticmethod
+    def commit():
+        try:
+            return subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL
+            ).decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    @staticmethod
+    def dataset():
+        return {
+            model._meta.label_lower: model.objects.count()
+            for model in (Tag, Startup, NewsLink, Post)
+        }
+
+    def get_client(self, email):
+        user_model = get_user_model()
+        try:
+            user = user_model.objects.get_by_natural_key(email)
+        except user_model.DoesNotExist:
+            raise CommandError(
+                'No user {}, run seed_benchmark or use --user.'.format(email)
+            )
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def count_queries(self, client, paths):
+        """
+        Method to return the mean number of
+        queries per request for paths.
+        :param client:
+        :param paths:
+        :return:
+        """
+        counts = []
+        for path in paths:
+            with QueryRecorder() as recorder:
+                client.get(path)
+            counts.append(len(recorder))
+        return mean(counts)
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        names = list(dict.fromkeys(url_names(get_resolver().url_patterns)))
+        uncovered = [
+            name for name in names
+            if name not in ROUTES and name not in SKIPPED
+            and not name.startswith(SKIPPED_PREFIXES)
+        ]
+        if uncovered:
+            self.stderr.write(
+                'Routes neither benchmarked nor skipped: {}'.format(
+                    ', '.join(uncovered)
+                )
+            )
+        count = options['samples']
+        samples = {
+            'posts': spread(Post.objects.published(), count),
+            'tags': spread(Tag.objects.all(), count),
+            'startups': spread(Startup.objects.all(), count),
+            'profiles': spread(Profile.objects.all(), count),
+        }
+        client = self.get_client(options['user'])
+        headers = {
+            'Cookie': '; '.join(
+                '{}={}'.format(name, morsel.value)
+                for name, morsel in client.cookies.items()
+            ),
+            'Accept-Encoding': 'gzip',
+        }
+        results = {
+            'commit': self.commit(),
+            'started': timezone.now().isoformat(),
+            'base_url': options['base_url'],
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'dataset': self.dataset(),
+            'routes': {},
+        }
+        for name in options['routes'] or ROUTES:
+            if name not in ROUTES:
+                raise CommandError('Unknown route {}'.format(name))
+            paths = [
+                reverse(name, kwargs=kwargs) + QUERIES.get(name, '')
+                for kwargs in ROUTES[name](samples)
+            ]
+            if not paths:
+                self.stderr.write('{}: no object to request'.format(name))
+                continue
+            queries = self.count_queries(client, paths)
+            load(options['base_url'], paths, options['concurrency'],
+                 options['warmup'], headers)
+            result = load(options['base_url'], paths,
+                          options['concurrency'], options['requests'],
+                          headers)
+            result['paths'] = len(paths)
+            result['queries_per_request'] = queries
+            results['routes'][name] = result
+            self.stdout.write(
+                '{}: {:.1f} requests/s, p50 {:.1f} ms, p95 {:.1f} ms, '
+                'p99 {:.1f} ms, {:.1f} queries, statuses {}'.format(
+                    name, result['requests_per_second'],
+                    (result['p50'] or 0) * 1000,
+                    (result['p95'] or 0) * 1000,
+                    (result['p99'] or 0) * 1000,
+                    queries, result['statuses']
+                )
+            )
+        if options['json']:
+            with open(options['json'], 'w') as output:
+                json.dump(results, output, indent=2)
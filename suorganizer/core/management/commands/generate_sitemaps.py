@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ...sitemaps import write_sitemaps
+
+
+class Command(BaseCommand):
+    """
+    Command class to render every sitemap
+    file again. The files of changed objects
+    are rendered by signals, but posts get
+    published and priorities change with
+    the date, so this command should be run
+    once a day, and after loading data
+    without signals.
+    """
+    help = 'Render the sitemap files to the sitemap storage.'
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        written = write_sitemaps()
+        self.stdout.write('Wrote {} sitemap files.'.format(written))
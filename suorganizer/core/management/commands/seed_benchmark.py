@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from organizers.importer import Importer
+from users.models import Profile
+
+from ...benchmark import BENCHMARK_USER, synthetic_records
+
+
+class Command(BaseCommand):
+    """
+    Command class to fill the database with
+    the synthetic dataset of core.benchmark,
+    through the bulk importer. The rows are
+    identified by natural key, so running it
+    again with the same sizes and seed
+    updates them rather than adding more.
+    It also creates the user the posts are
+    written by, which benchmark_urls logs
+    in as.
+    """
+    help = 'Seed the database with a synthetic benchmark dataset.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tags', type=int, default=1000)
+        parser.add_argument('--startups', type=int, default=10000)
+        parser.add_argument('--newslinks', type=int, default=500000)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of records imported per transaction.'
+        )
+        parser.add_argument(
+            '--password', default='benchmark',
+            help='Password of the benchmark user.'
+        )
+
+    def get_user(self, password):
+        """
+        Method to return the benchmark user,
+        created if it doesn't exist yet.
+        :param password:
+        :return:
+        """
+        user_model = get_user_model()
+        try:
+            user = user_model.objects.get_by_natural_key(BENCHMARK_USER)
+        except user_model.DoesNotExist:
+            user = user_model.objects.create_user(
+                BENCHMARK_USER, password
+            )
+        Profile.objects.get_or_create(user=user, defaults={
+            'name': 'Benchmark',
+            'slug': 'benchmark',
+            'about': 'Author of the benchmark dataset.',
+        })
+        return user
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        self.get_user(options['password'])
+        importer = Importer(
+            batch_size=options['batch_size'], stderr=self.stderr
+        )
+        importer.run(synthetic_records(
+            tags=options['tags'],
+            startups=options['startups'],
+            newslinks=options['newslinks'],
+            posts=options['posts'],
+            seed=options['seed'],
+        ))
+        for label in importer.specs:
+            self.stdout.write(
+                '{}: {} created, {} updated, {} skipped.'.format(
+                    label, importer.created[label],
+                    importer.updated[label], importer.skipped[label]
+                )
+            )
+        self.stdout.write(
+            'Run rebuild_search_index and generate_sitemaps '
+            'before benchmarking.'
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ...loaders import warm_templates
+
+
+class Command(BaseCommand):
+    """
+    Command class to compile every template,
+    to check that they all compile, or to
+    measure how long it takes. Server
+    processes compile them when they start
+    if the TEMPLATE_WARMUP setting is True.
+    """
+    help = 'Compile every template of the site and the apps.'
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        compiled, failed = warm_templates()
+        self.stdout.write(
+            'Compiled {} templates, {} failed.'.format(compiled, failed)
+        )
@@ -0,0 +1,233 @@
+"""
+Middleware module for core app
+"""
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+
+from .objectcache import request_scope
+from .profiling import (
+    Profile, add_root, current_profile, get_sampler, save_profile,
+    should_profile
+)
+from .querycount import QueryRecorder, get_budget, report
+from .routers import replica_scope
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCapableMiddleware:
+    """
+    Base class of the middleware below, which
+    can be called both ways. Django 3.1 runs
+    the sync only middleware, and everything
+    below it, on the one thread of the sync
+    views under ASGI. When the next handler is
+    a coroutine function, the middleware is
+    one too and __call__ returns the coroutine
+    of __acall__, as django's MiddlewareMixin
+    does.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # tells the handler __call__ returns a coroutine
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.call(request)
+
+    def call(self, request):
+        raise NotImplementedError(
+            'Subclasses of AsyncCapableMiddleware must '
+            'implement call() and __acall__()'
+        )
+
+    async def __acall__(self, request):
+        raise NotImplementedError(
+            'Subclasses of AsyncCapableMiddleware must '
+            'implement call() and __acall__()'
+        )
+
+
+class QueryCountMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware recording the queries run by
+    each request into the query report. It
+    adds the number of queries to the
+    response in the X-Query-Count header and
+    logs a warning when a request goes over
+    the budget of its url name or repeats a
+    query, with the template tag or line of
+    code that triggered it.
+    It is meant for development, put it first
+    in MIDDLEWARE to count the queries of the
+    other middleware as well.
+    """
+
+    def call(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        return self.process_response(request, response, recorder)
+
+    async def __acall__(self, request):
+        with QueryRecorder() as recorder:
+            response = await self.get_response(request)
+        return self.process_response(request, response, recorder)
+
+    def process_response(self, request, response, recorder):
+        match = request.resolver_match
+        url_name = match.view_name if match is not None else None
+        report.add(url_name, recorder)
+        response['X-Query-Count'] = len(recorder)
+        budget = get_budget(url_name)
+        if budget is not None and len(recorder) > budget:
+            logger.warning(
+                '%s ran %s queries, over its budget of %s',
+                request.path, len(recorder), budget
+            )
+        for group in recorder.n_plus_one():
+            logger.warning(
+                'Possible N+1 on %s, %s times: %s, from %s',
+                request.path, group['count'], group['fingerprint'],
+                group['origins']
+            )
+        return response
+
+
+class ProfilingMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware profiling the requests chosen
+    by core.profiling.should_profile, which
+    get the id of their profile in the
+    X-Profile-Id header. It comes after the
+    AuthenticationMiddleware, which it needs
+    to let staff users profile a request.
+    Under ASGI only the threads running the
+    async views are sampled, the event loop
+    thread serves other requests too.
+    """
+
+    @add_root
+    def call(self, request):
+        if not should_profile(request):
+            return self.get_response(request)
+        profile = Profile(request)
+        token = current_profile.set(profile)
+        sampler = get_sampler()
+        sampler.add(profile)
+        start = time.perf_counter()
+        try:
+            with QueryRecorder() as recorder:
+                response = self.get_response(request)
+        finally:
+            sampler.remove(profile)
+            current_profile.reset(token)
+        return self.process_response(
+            request, response, profile, recorder,
+            time.perf_counter() - start
+        )
+
+    async def __acall__(self, request):
+        if not should_profile(request):
+            return await self.get_response(request)
+        profile = Profile(request)
+        profile.threads.clear()
+        token = current_profile.set(profile)
+        sampler = get_sampler()
+        sampler.add(profile)
+        start = time.perf_counter()
+        try:
+            with QueryRecorder() as recorder:
+                response = await self.get_response(request)
+        finally:
+            sampler.remove(profile)
+            current_profile.reset(token)
+        return self.process_response(
+            request, response, profile, recorder,
+            time.perf_counter() - start
+        )
+
+    def process_response(self, request, response, profile, recorder,
+                         duration):
+        match = request.resolver_match
+        save_profile(profile.as_dict(
+            match.view_name if match is not None else None,
+            duration,
+            [
+                {key: group[key] for key in ('fingerprint', 'count', 'time')}
+                for group in recorder.groups()
+            ]
+        ))
+        response['X-Profile-Id'] = profile.id
+        return response
+
+
+class ObjectCacheMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware giving each request an identity
+    map of its own in the object cache, see
+    core.objectcache. Requests with an unsafe
+    method, which may change the objects they
+    look up, bypass the shared tiers.
+    """
+
+    @staticmethod
+    def scope(request):
+        return request_scope(
+            shared=request.method in ('GET', 'HEAD', 'OPTIONS')
+        )
+
+    def call(self, request):
+        with self.scope(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with self.scope(request):
+            return await self.get_response(request)
+
+
+class ReplicaMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware letting the reads of safe
+    requests go to a replica, see
+    core.routers. A request which wrote sets
+    the REPLICA_COOKIE, and the requests
+    sending it back read the primary.
+    """
+
+    @staticmethod
+    def cookie():
+        return getattr(settings, 'REPLICA_COOKIE', 'use_primary')
+
+    def scope(self, request):
+        return replica_scope(primary=(
+            request.method not in ('GET', 'HEAD', 'OPTIONS')
+            or self.cookie() in request.COOKIES
+        ))
+
+    def call(self, request):
+        with self.scope(request) as state:
+            response = self.get_response(request)
+        return self.process_response(response, state)
+
+    async def __acall__(self, request):
+        with self.scope(request) as state:
+            response = await self.get_response(request)
+        return self.process_response(response, state)
+
+    def process_response(self, response, state):
+        if state['wrote']:
+            response.set_cookie(
+                self.cookie(), '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 10),
+                httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,21 @@
+"""
+Migration ordering core after the sites app.
+
+0001_sites_data reads the Site model but was
+written without a dependency on the sites
+migrations, so a new database could run it
+before the Site table exists. Depending on both
+makes migrate plan the sites migrations first,
+without rewriting the applied 0001 migration.
+"""
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0001_sites_data'),
+        ('sites', '0002_alter_domain_unique'),
+    ]
+
+    operations = [
+    ]
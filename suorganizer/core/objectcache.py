@@ -0,0 +1,270 @@
+"""
+Read-through cache of the objects looked up by slug.
+
+Startups, tags, newslinks and posts are found
+by their slugs in nearly every view, and a
+single request often looks up the same
+startup two or three times: in get_object(),
+in the context mixin and in the form initial.
+get_object_or_404() below looks in three
+tiers before querying the database:
+
+1. the identity map of the current request,
+   set up by the ObjectCacheMiddleware, so an
+   object is loaded once per request and every
+   lookup returns the same instance;
+2. a small LRU kept in the process, whose
+   entries expire after OBJECT_CACHE_LOCAL_TTL
+   seconds;
+3. the OBJECT_CACHE_ALIAS cache, shared by
+   every process, for OBJECT_CACHE_TIMEOUT
+   seconds.
+
+Objects are keyed on the model and the
+lowercased parts of their url, e.g. the slug
+of a startup or the year, month and slug of a
+post. The apps forget the keys of an object
+when it is saved or deleted, see their signals.
+The shared cache and the LRU of the process
+saving the object are cleared at once, the LRU
+of other processes may serve the old object
+for up to OBJECT_CACHE_LOCAL_TTL seconds.
+
+Objects are read from the primary database,
+not a replica, see core.routers, so that a
+lagging replica cannot put an object back in
+the shared cache once it was forgotten.
+
+Requests which change data, e.g. a POST to an
+update view, skip the LRU and the shared
+cache: the object they change is always read
+from the database.
+"""
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import Http404
+
+from .fields import get_by_slug
+from .routers import use_primary
+
+OBJECT_KEY = 'object.{label}.{parts}'
+
+_identity_map = ContextVar('object_identity_map', default=None)
+_shared = ContextVar('object_cache_shared', default=True)
+
+# lookups answered by each tier, see
+# ObjectCacheMiddleware
+stats = Counter()
+
+
+def object_cache():
+    return caches[getattr(settings, 'OBJECT_CACHE_ALIAS', 'default')]
+
+
+def object_key(model, *parts):
+    """
+    Function to return the key of the model
+    instance found by the url parts.
+    :param model:
+    :param parts: e.g. the slug
+    :return: key(string)
+    """
+    return OBJECT_KEY.format(
+        label=model._meta.label_lower,
+        parts='.'.join(str(part).lower() for part in parts)
+    )
+
+
+class LocalCache:
+    """
+    LRU of the objects cached in the process.
+    The objects are stored pickled, so that
+    every lookup gets its own copy to change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return pickle.loads(data)
+
+    def set(self, key, obj):
+        data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        expires = time.monotonic() + getattr(
+            settings, 'OBJECT_CACHE_LOCAL_TTL', 5
+        )
+        size = getattr(settings, 'OBJECT_CACHE_LOCAL_SIZE', 1000)
+        with self._lock:
+            self._entries[key] = (expires, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalCache()
+
+
+@contextmanager
+def request_scope(shared=True):
+    """
+    Context manager giving the code run inside
+    it an identity map of its own. With shared
+    False, the LRU and the shared cache are
+    neither read nor filled.
+    :param shared:
+    :return:
+    """
+    identity_token = _identity_map.set({})
+    shared_token = _shared.set(shared)
+    try:
+        yield
+    finally:
+        _shared.reset(shared_token)
+        _identity_map.reset(identity_token)
+
+
+def get_object(queryset, parts, **lookup):
+    """
+    Function to return the object of queryset
+    matching lookup, from the first cache tier
+    holding the key made of parts, else from
+    the database, see core.fields.get_by_slug.
+    The caller makes sure that parts identify
+    the same object as lookup.
+    Raises DoesNotExist like QuerySet.get().
+    :param queryset: a queryset or a model
+    :param parts:
+    :param lookup:
+    :return: model instance
+    """
+    if not hasattr(queryset, '_default_manager'):
+        model = queryset.model
+    else:
+        model, queryset = queryset, queryset._default_manager.all()
+    key = object_key(model, *parts)
+    identity_map = _identity_map.get()
+    if identity_map is not None and key in identity_map:
+        stats['identity'] += 1
+        return identity_map[key]
+    obj = None
+    shared = _shared.get()
+    if shared:
+        obj = local_cache.get(key)
+        if obj is not None:
+            stats['local'] += 1
+        else:
+            obj = object_cache().get(key)
+            if obj is not None:
+                stats['shared'] += 1
+                local_cache.set(key, obj)
+    if obj is None:
+        # a lagging replica would put an old
+        # object in the shared tiers
+        with use_primary():
+            obj = get_by_slug(queryset, **lookup)
+        stats['database'] += 1
+        if shared:
+            object_cache().set(
+                key, obj,
+                getattr(settings, 'OBJECT_CACHE_TIMEOUT', 300)
+            )
+            local_cache.set(key, obj)
+    if identity_map is not None:
+        identity_map[key] = obj
+    return obj
+
+
+def get_object_or_404(queryset, parts, **lookup):
+    """
+    Function like django's get_object_or_404,
+    going through the object cache, see
+    get_object().
+    :param queryset: a queryset or a model
+    :param parts:
+    :param lookup:
+    :return: model instance
+    """
+    model = getattr(queryset, 'model', queryset)
+    try:
+        return get_object(queryset, parts, **lookup)
+    except model.DoesNotExist:
+        raise Http404(
+            'No {} matches the given query.'.format(
+                model._meta.object_name
+            )
+        )
+
+
+def forget(keys):
+    """
+    Function to remove keys from every tier,
+    now and again once the current transaction
+    commits, as a concurrent request may cache
+    the old object in between.
+    :param keys:
+    :return:
+    """
+    keys = set(keys)
+    if not keys:
+        return
+
+    def delete():
+        local_cache.delete_many(keys)
+        object_cache().delete_many(keys)
+
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        for key in keys:
+            identity_map.pop(key, None)
+    delete()
+    transaction.on_commit(delete)
+
+
+class CachedObjectMixin:
+    """
+    Mixin for single object views looking
+    their object up by slug, getting it
+    through the object cache.
+    """
+
+    def get_object(self, queryset=None):
+        """
+        Overriding the method to find the
+        object with get_object_or_404 above.
+        :param queryset:
+        :return:
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        slug = self.kwargs.get(self.slug_url_kwarg)
+        return get_object_or_404(
+            queryset, (slug,),
+            **{'{}__iexact'.format(self.get_slug_field()): slug}
+        )
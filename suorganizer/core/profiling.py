@@ -0,0 +1,364 @@
+"""
+Sampling profiler for requests.
+
+A profiled request has its thread sampled every
+PROFILING_INTERVAL seconds by a background
+thread, and each sample is stored as a collapsed
+stack, the frames from the view down joined by
+semicolons, as flamegraph tools expect. Frames
+are labelled so that time is attributed to what
+we can act on:
+
+    template:post/post_list.html  rendering a template
+    tag:get_latest_posts          a custom template tag
+    sql:SELECT ... WHERE ... = ?  a query, by fingerprint
+    blogs.views:get               any other function
+
+The internals of the template engine are left
+out. The queries of the request are recorded as
+well, with their count and time per fingerprint.
+
+A request is profiled when it carries a signed
+X-Profile header, see make_token(), when a staff
+user adds ?profile to the url, or at random for
+PROFILING_SAMPLE_RATE of the requests. Profiles
+are kept in the cache, for the staff only
+profile views of core.views.
+"""
+import functools
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from uuid import uuid4
+
+import django.template
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.db.backends.utils import CursorWrapper
+from django.template.base import Node, Template
+from django.template.library import TagHelperNode
+from django.utils import timezone
+
+from .querycount import fingerprint
+
+PROFILE_KEY = 'profile.{}'
+INDEX_KEY = 'profile.index'
+TOKEN_SALT = 'core.profiling'
+
+_TEMPLATE_DIR = django.template.__path__[0]
+# render() for included templates, _render()
+# for the parents of extending templates
+_TEMPLATE_RENDER = {Template.render.__code__, Template._render.__code__}
+_NODE_RENDER = Node.render_annotated.__code__
+_EXECUTE = {
+    CursorWrapper._execute.__code__,
+    CursorWrapper._executemany.__code__,
+}
+# codes of the functions the stacks start below
+_ROOTS = set()
+
+current_profile = ContextVar('current_profile', default=None)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def profile_cache():
+    return caches['default']
+
+
+def add_root(function):
+    """
+    Decorator marking function as the root of
+    the profiled stacks, the frames calling it
+    are left out.
+    :param function:
+    :return: function
+    """
+    _ROOTS.add(function.__code__)
+    return function
+
+
+def profiled(function):
+    """
+    Decorator for functions run in another
+    thread on behalf of the current request,
+    sampling that thread too when the request
+    is profiled.
+    :param function:
+    :return: function
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return function(*args, **kwargs)
+        ident = threading.get_ident()
+        profile.threads.add(ident)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.threads.discard(ident)
+
+    _ROOTS.add(wrapper.__code__)
+    return wrapper
+
+
+def _clean(label):
+    # semicolons separate the frames
+    return label.replace(';', ',')
+
+
+def frame_label(frame):
+    """
+    Function to return the label of frame
+    in a stack, or None to leave it out.
+    :param frame:
+    :return:
+    """
+    code = frame.f_code
+    if code in _TEMPLATE_RENDER:
+        template = frame.f_locals.get('self')
+        return 'template:{}'.format(
+            template.origin.template_name or template.name
+        )
+    if code is _NODE_RENDER:
+        node = frame.f_locals.get('self')
+        token = getattr(node, 'token', None)
+        custom = (
+            isinstance(node, TagHelperNode)
+            or not type(node).__module__.startswith('django.')
+        )
+        if custom and token is not None:
+            return 'tag:{}'.format(token.contents.split()[0])
+        return None
+    if code in _EXECUTE:
+        return _clean('sql:{}'.format(
+            fingerprint(frame.f_locals.get('sql') or '')[:200]
+        ))
+    if code.co_filename.startswith(_TEMPLATE_DIR):
+        return None
+    return '{}:{}'.format(
+        frame.f_globals.get('__name__', '?'), code.co_name
+    )
+
+
+def collapse(frame):
+    """
+    Function to return the collapsed stack
+    of frame, from the root down.
+    :param frame:
+    :return: string
+    """
+    labels = []
+    while frame is not None:
+        if frame.f_code in _ROOTS:
+            break
+        label = frame_label(frame)
+        if label is not None and (not labels or labels[-1] != label):
+            labels.append(label)
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class Profile:
+    """
+    The samples taken during a request, by
+    stack, in the threads running it.
+    """
+
+    def __init__(self, request):
+        self.id = uuid4().hex[:12]
+        self.method = request.method
+        self.path = request.get_full_path()
+        self.started = timezone.now()
+        self.threads = {threading.get_ident()}
+        self.stacks = Counter()
+        self.samples = 0
+
+    def sample(self, frames):
+        for ident in list(self.threads):
+            frame = frames.get(ident)
+            if frame is not None:
+                self.samples += 1
+                self.stacks[collapse(frame)] += 1
+
+    def as_dict(self, url_name, duration, queries):
+        view = _clean('view:{}'.format(url_name))
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'url_name': url_name,
+            'started': self.started.isoformat(),
+            'duration': duration,
+            'interval': _setting('PROFILING_INTERVAL', 0.005),
+            'samples': self.samples,
+            'stacks': {
+                ';'.join(filter(None, (view, stack))): count
+                for stack, count in self.stacks.items()
+            },
+            'queries': queries,
+        }
+
+
+class Sampler(threading.Thread):
+    """
+    Thread sampling the stacks of the threads
+    of the running profiles.
+    """
+
+    def __init__(self):
+        super().__init__(name='profiling-sampler', daemon=True)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.profiles = set()
+
+    def add(self, profile):
+        with self._lock:
+            self.profiles.add(profile)
+        self._wake.set()
+
+    def remove(self, profile):
+        with self._lock:
+            self.profiles.discard(profile)
+
+    def run(self):
+        interval = _setting('PROFILING_INTERVAL', 0.005)
+        while True:
+            with self._lock:
+                profiles = list(self.profiles)
+                if not profiles:
+                    self._wake.clear()
+            if not profiles:
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames)
+            del frames
+            time.sleep(interval)
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None or not _sampler.is_alive():
+            _sampler = Sampler()
+            _sampler.start()
+        return _sampler
+
+
+def make_token():
+    """
+    Function to return a value for the
+    X-Profile header, valid for
+    PROFILING_TOKEN_MAX_AGE seconds.
+    :return: string
+    """
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(uuid4().hex)
+
+
+def should_profile(request):
+    """
+    Function to tell whether to profile
+    request.
+    :param request:
+    :return: bool
+    """
+    token = request.META.get('HTTP_X_PROFILE')
+    if token:
+        try:
+            signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+                token, max_age=_setting('PROFILING_TOKEN_MAX_AGE', 3600)
+            )
+            return True
+        except signing.BadSignature:
+            pass
+    if 'profile' in request.GET:
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            return True
+    rate = _setting('PROFILING_SAMPLE_RATE', 0)
+    return rate > 0 and random.random() < rate
+
+
+def save_profile(data):
+    """
+    Function to store a profile in the cache,
+    keeping the last PROFILING_KEEP.
+    :param data: dict
+    :return:
+    """
+    cache = profile_cache()
+    timeout = _setting('PROFILING_TIMEOUT', 24 * 3600)
+    cache.set(PROFILE_KEY.format(data['id']), data, timeout)
+    index = cache.get(INDEX_KEY, [])
+    index.insert(0, {
+        key: data[key] for key in (
+            'id', 'method', 'path', 'url_name', 'started',
+            'duration', 'samples'
+        )
+    })
+    cache.set(INDEX_KEY, index[:_setting('PROFILING_KEEP', 100)], timeout)
+
+
+def get_profiles():
+    return profile_cache().get(INDEX_KEY, [])
+
+
+def get_profile(profile_id):
+    return profile_cache().get(PROFILE_KEY.format(profile_id))
+
+
+def flame_rects(stacks, min_width=0.001):
+    """
+    Function to lay out the collapsed stacks
+    as the rectangles of a flame graph, with
+    their depth, left and width as fractions
+    of the total, leaving out those narrower
+    than min_width.
+    :param stacks: dict of stack to count
+    :param min_width:
+    :return: (list of dict, depth)
+    """
+    root = {'name': 'all', 'value': 0, 'children': {}}
+    for stack, count in stacks.items():
+        node = root
+        node['value'] += count
+        for name in filter(None, stack.split(';')):
+            node = node['children'].setdefault(
+                name, {'name': name, 'value': 0, 'children': {}}
+            )
+            node['value'] += count
+    total = root['value'] or 1
+    rects = []
+    pending = [(root, 0, 0)]
+    while pending:
+        node, depth, left = pending.pop()
+        width = node['value'] / total
+        if width < min_width:
+            continue
+        rects.append({
+            'name': node['name'],
+            'depth': depth,
+            'left': left / total,
+            'width': width,
+            'samples': node['value'],
+        })
+        for child in sorted(
+                node['children'].values(),
+                key=lambda child: -child['value']):
+            pending.append((child, depth + 1, left))
+            left += child['value']
+    depth = max((rect['depth'] for rect in rects), default=0) + 1
+    return rects, depth
@@ -0,0 +1,307 @@
+"""
+Query recording and N+1 detection.
+
+A QueryRecorder wraps the database connections
+and records every query run while it is active,
+along with the template tag or the line of our
+own code that triggered it. Queries are grouped
+by fingerprint, the SQL with its literals
+replaced by placeholders, so that the same
+query run for each row of a list, the N+1
+pattern, shows up as one fingerprint repeated
+many times.
+
+Every connection gets one execute wrapper,
+when it is opened, passing the queries on to
+the recorders active in the current context.
+asgiref copies the context into the threads
+it runs sync code in, so under ASGI a recorder
+entered in a middleware also records the
+queries of the views run in other threads.
+
+The QueryCountMiddleware records every request
+into the report below, served as JSON by the
+query_report view, and the QueryBudgetMixin
+enforces the QUERY_BUDGETS setting in tests.
+"""
+import functools
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.template.base import Node
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+_DJANGO_DIR = os.path.dirname(django.__file__)
+_THIS_FILE = os.path.splitext(os.path.abspath(__file__))[0]
+
+_recorders = ContextVar('query_recorders', default=())
+
+
+def fingerprint(sql):
+    """
+    Function to normalise sql, replacing
+    literals and IN lists with placeholders,
+    so that queries differing only by their
+    parameters have the same fingerprint.
+    :param sql:
+    :return: string
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def _is_our_code(filename):
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in filename
+        and not filename.startswith(_DJANGO_DIR)
+        and os.path.splitext(filename)[0] != _THIS_FILE
+    )
+
+
+def query_origin():
+    """
+    Function to find what triggered the query
+    being run: the innermost template node
+    being rendered and the innermost frame of
+    our own code.
+    :return: dict
+    """
+    template = code = None
+    frame = sys._getframe(2)
+    while frame is not None and (template is None or code is None):
+        node = frame.f_locals.get('self')
+        # type() rather than isinstance(), which would
+        # evaluate lazy objects such as request.user
+        if template is None and issubclass(type(node), Node):
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                template = '{}:{} {}'.format(
+                    origin.template_name or origin.name, token.lineno,
+                    token.contents[:60]
+                )
+        if code is None and _is_our_code(frame.f_code.co_filename):
+            code = '{}:{} in {}'.format(
+                os.path.relpath(
+                    frame.f_code.co_filename, str(settings.BASE_DIR)
+                ),
+                frame.f_lineno,
+                frame.f_code.co_name
+            )
+        frame = frame.f_back
+    return {'template': template, 'code': code}
+
+
+def dispatch(execute, sql, params, many, context):
+    """
+    Execute wrapper passing the query on to
+    the recorders active in the context.
+    """
+    for recorder in reversed(_recorders.get()):
+        execute = functools.partial(recorder, execute)
+    return execute(sql, params, many, context)
+
+
+def add_dispatch(connection, **kwargs):
+    """
+    Receiver of connection_created, adding the
+    dispatch wrapper to the connection. The
+    wrappers are kept when it is opened again.
+    It goes first, as execute_wrapper() blocks
+    remove the last wrapper when they exit.
+    :param connection:
+    :param kwargs:
+    :return:
+    """
+    if dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, dispatch)
+
+
+class QueryRecorder:
+    """
+    Context manager recording the queries run
+    on every database connection, in the
+    current context.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._token = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'fingerprint': fingerprint(sql),
+                'time': time.perf_counter() - start,
+                'alias': context['connection'].alias,
+                **query_origin(),
+            })
+
+    def __enter__(self):
+        # connections of the thread opened before
+        # the receiver was connected
+        for connection in connections.all():
+            add_dispatch(connection)
+        self._token = _recorders.set(_recorders.get() + (self,))
+        return self
+
+    def __exit__(self, *exc_info):
+        _recorders.reset(self._token)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def groups(self):
+        """
+        Method to group the queries by
+        fingerprint, most repeated first.
+        :return: list of dict
+        """
+        groups = OrderedDict()
+        for query in self.queries:
+            group = groups.setdefault(query['fingerprint'], {
+                'fingerprint': query['fingerprint'],
+                'count': 0,
+                'time': 0.0,
+                'origins': [],
+            })
+            group['count'] += 1
+            group['time'] += query['time']
+            origin = {
+                'template': query['template'],
+                'code': query['code'],
+            }
+            if origin not in group['origins']:
+                group['origins'].append(origin)
+        return sorted(
+            groups.values(), key=lambda group: -group['count']
+        )
+
+    def n_plus_one(self, threshold=None):
+        """
+        Method to return the groups of queries
+        repeated at least threshold times, by
+        default the QUERY_N_PLUS_ONE_THRESHOLD
+        setting.
+        :param threshold:
+        :return: list of dict
+        """
+        if threshold is None:
+            threshold = getattr(
+                settings, 'QUERY_N_PLUS_ONE_THRESHOLD', 3
+            )
+        return [
+            group for group in self.groups()
+            if group['count'] >= threshold
+        ]
+
+    def summary(self):
+        return {
+            'count': len(self.queries),
+            'time': sum(query['time'] for query in self.queries),
+            'n_plus_one': self.n_plus_one(),
+        }
+
+
+class QueryReport:
+    """
+    Statistics of the queries run per url
+    name, aggregated over every request
+    recorded since the process started.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._urls = {}
+
+    def add(self, url_name, recorder):
+        """
+        Method to add the queries of a
+        request to the statistics.
+        :param url_name:
+        :param recorder: QueryRecorder
+        :return:
+        """
+        summary = recorder.summary()
+        with self._lock:
+            stats = self._urls.setdefault(url_name, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'time': 0.0,
+                'budget': get_budget(url_name),
+                'over_budget': 0,
+                'n_plus_one': {},
+            })
+            stats['requests'] += 1
+            stats['queries'] += summary['count']
+            stats['max_queries'] = max(
+                stats['max_queries'], summary['count']
+            )
+            stats['time'] += summary['time']
+            budget = stats['budget']
+            if budget is not None and summary['count'] > budget:
+                stats['over_budget'] += 1
+            for group in summary['n_plus_one']:
+                seen = stats['n_plus_one'].setdefault(
+                    group['fingerprint'], {
+                        'requests': 0,
+                        'max_count': 0,
+                        'origins': [],
+                    }
+                )
+                seen['requests'] += 1
+                seen['max_count'] = max(seen['max_count'], group['count'])
+                for origin in group['origins']:
+                    if origin not in seen['origins']:
+                        seen['origins'].append(origin)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                url_name: dict(
+                    stats,
+                    mean_queries=stats['queries'] / stats['requests'],
+                )
+                for url_name, stats in sorted(
+                    self._urls.items(), key=lambda item: str(item[0])
+                )
+            }
+
+    def clear(self):
+        with self._lock:
+            self._urls.clear()
+
+
+report = QueryReport()
+
+
+def get_budget(url_name):
+    """
+    Function to return the maximum number of
+    queries a request to url_name may run,
+    from the QUERY_BUDGETS setting, or None
+    if it has no budget.
+    :param url_name:
+    :return:
+    """
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(url_name)
@@ -0,0 +1,194 @@
+"""
+Database router sending reads to the replicas.
+
+The reads of safe requests, GET, HEAD and
+OPTIONS, go to one of the DATABASE_REPLICAS,
+chosen once per request so that a page is read
+from a single snapshot. Everything else reads
+the primary, the default database: requests
+which change data, management commands and the
+background workers of core.feeds and
+related.engine, which read what was just
+committed.
+
+Writes always go to the primary. A request
+that wrote gets the REPLICA_COOKIE, and the
+reads of the user stick to the primary for
+REPLICA_STICKY_SECONDS, so they see their own
+changes while the replicas catch up.
+
+Each process checks how far behind the
+primary each replica is, at most every
+REPLICA_CHECK_INTERVAL seconds, and skips the
+replicas more than REPLICA_MAX_LAG seconds
+behind or failing the check. When none is
+left, the primary serves the reads.
+REPLICA_MAX_LAG should stay below
+REPLICA_STICKY_SECONDS.
+
+With no DATABASE_REPLICAS every query goes to
+the primary. Two local databases are enough to
+try the router, e.g. a copy of a SQLite file,
+whose lag is taken as 0.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last transaction replayed,
+# 0 when the replica has replayed all it got
+LAG_SQL = (
+    'SELECT CASE '
+    'WHEN NOT pg_is_in_recovery() THEN 0 '
+    'WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE COALESCE(EXTRACT(EPOCH FROM '
+    'now() - pg_last_xact_replay_timestamp()), 0) END'
+)
+
+# The routing state of the current request, set
+# by ReplicaMiddleware, None outside requests
+_state = ContextVar('replica_state', default=None)
+_forced_primary = ContextVar('replica_forced_primary', default=False)
+
+# alias: (time of the check, usable)
+_checks = {}
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def replica_lag(alias):
+    """
+    Function to return how many seconds the
+    replica alias is behind the primary.
+    :param alias:
+    :return: seconds(float)
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0] or 0)
+
+
+def is_usable(alias):
+    """
+    Function to tell whether the replica alias
+    may serve reads, checking its lag again
+    once the last check is too old.
+    :param alias:
+    :return: bool
+    """
+    now = time.monotonic()
+    checked, usable = _checks.get(alias, (None, False))
+    if checked is not None and now - checked < getattr(
+            settings, 'REPLICA_CHECK_INTERVAL', 5):
+        return usable
+    max_lag = getattr(settings, 'REPLICA_MAX_LAG', 5)
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError:
+        logger.warning('Replica %s failed its check', alias, exc_info=True)
+        usable = False
+    else:
+        usable = lag <= max_lag
+        if not usable:
+            logger.warning(
+                'Replica %s is %.1f seconds behind, skipped', alias, lag
+            )
+    _checks[alias] = (now, usable)
+    return usable
+
+
+def choose_replica():
+    """
+    Function to pick one of the usable
+    replicas at random, or the primary.
+    :return: alias
+    """
+    usable = [alias for alias in get_replicas() if is_usable(alias)]
+    if not usable:
+        return DEFAULT_DB_ALIAS
+    return random.choice(usable)
+
+
+@contextmanager
+def replica_scope(primary=False):
+    """
+    Context manager letting the reads of the
+    code run inside it go to a replica, unless
+    primary is True. It yields the state of
+    the scope, whose 'wrote' is True once
+    anything was written.
+    :param primary:
+    :return:
+    """
+    # a dict, so the writes made in threads
+    # running a copy of the context are seen
+    state = {'primary': primary, 'alias': None, 'wrote': False}
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Context manager sending the reads of the
+    code run inside it to the primary, e.g.
+    to fill a cache shared by every process.
+    :return:
+    """
+    token = _forced_primary.set(True)
+    try:
+        yield
+    finally:
+        _forced_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Router sending the reads of safe requests
+    to a replica and everything else to the
+    primary, see the module docstring.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state['primary'] or _forced_primary.get():
+            return DEFAULT_DB_ALIAS
+        if state['alias'] is None:
+            state['alias'] = choose_replica()
+        return state['alias']
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # read what was written for the
+            # rest of the request too
+            state['primary'] = state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replicas get the tables of the
+        # primary by replication
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,326 @@
+"""
+Pre-rendered sitemap files.
+
+Instead of building every section of the
+sitemap on each request, the sections are
+rendered to gzip compressed files in the
+default storage and served from there.
+
+Large sections subclass ShardedSitemap and are
+split into shards of at most 50,000 urls, the
+limit of the sitemap protocol. A shard holds
+the objects of a range of primary keys, so the
+shard of an object never changes: when an
+object is saved or deleted, the apps call
+update_sitemaps() and only its shard, and the
+index, are rendered again in a background
+thread once the transaction commits. Other
+sections are small and are rendered as a
+single file.
+
+Posts are published and priorities change with
+the date, run the generate_sitemaps command
+once a day to render every file again.
+
+The files are kept in the storage named by the
+SITEMAP_STORAGE setting, or the default storage.
+A file is replaced in one step, so it is never
+missing while it is written again, and its
+modified time is kept in the default cache for
+SITEMAP_MODIFIED_TIMEOUT seconds, so requests
+answered with 304 Not Modified do not reach the
+storage at all.
+"""
+import gzip
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.sitemaps import Sitemap
+from django.contrib.sites.models import Site
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage, get_storage_class
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_DIR = 'sitemaps'
+INDEX_NAME = '{}/sitemap.xml.gz'.format(SITEMAP_DIR)
+SHARD_NAME = '{dir}/sitemap-{section}-{shard}.xml.gz'
+SECTION_URL_NAME = 'django.contrib.sitemaps.views.sitemap'
+MODIFIED_KEY = 'sitemap.modified.{name}'
+
+# (section, shard) pairs waiting for the
+# current transaction to commit
+_pending = threading.local()
+
+# A single worker renders the files one after
+# the other, off the request path.
+_executor = ThreadPoolExecutor(max_workers=1)
+
+
+class ShardedSitemap(Sitemap):
+    """
+    Sitemap over a model whose items are split
+    in shards by primary key: shard n holds
+    the items with n * limit < pk <= (n + 1) * limit.
+    Subclasses set model and implement items()
+    as usual, returning a queryset.
+    """
+    model = None
+
+    def __init__(self, shard=None):
+        self.shard = shard
+
+    @property
+    def paginator(self):
+        items = self.items()
+        if self.shard is not None:
+            low = self.shard * self.limit
+            items = items.filter(pk__gt=low, pk__lte=low + self.limit)
+        return Paginator(items, self.limit)
+
+    def shard_count(self):
+        last_pk = self.model.objects.aggregate(
+            last_pk=Max('pk')
+        )['last_pk'] or 0
+        return max(1, -(-last_pk // self.limit))
+
+    def shard_of(self, pk):
+        return (pk - 1) // self.limit
+
+
+def get_sitemaps():
+    """
+    Function to return the sitemaps dict
+    named by the SITEMAPS setting.
+    :return: dict
+    """
+    return import_string(settings.SITEMAPS)
+
+
+def get_sitemap(section, shard=0):
+    """
+    Function to return the sitemap instance
+    rendering a shard of section.
+    :param section:
+    :param shard:
+    :return:
+    """
+    sitemap = get_sitemaps()[section]
+    if isinstance(sitemap, type):
+        if issubclass(sitemap, ShardedSitemap):
+            return sitemap(shard=shard)
+        return sitemap()
+    sitemap = copy(sitemap)
+    if isinstance(sitemap, ShardedSitemap):
+        sitemap.shard = shard
+    return sitemap
+
+
+def shard_count(section):
+    sitemap = get_sitemap(section)
+    if isinstance(sitemap, ShardedSitemap):
+        return sitemap.shard_count()
+    return 1
+
+
+def shard_name(section, shard):
+    return SHARD_NAME.format(dir=SITEMAP_DIR, section=section, shard=shard)
+
+
+def _protocol():
+    return getattr(settings, 'SITEMAP_PROTOCOL', 'https')
+
+
+def sitemap_cache():
+    return caches['default']
+
+
+@lru_cache(maxsize=None)
+def _storage(import_path, options):
+    return get_storage_class(import_path)(**dict(options))
+
+
+def sitemap_storage():
+    """
+    Function to return the storage of the
+    files, built from the SITEMAP_STORAGE
+    and SITEMAP_STORAGE_OPTIONS settings,
+    or the default storage.
+    :return: Storage
+    """
+    import_path = getattr(settings, 'SITEMAP_STORAGE', None)
+    if import_path is None:
+        return default_storage
+    options = getattr(settings, 'SITEMAP_STORAGE_OPTIONS', {})
+    return _storage(import_path, tuple(sorted(options.items())))
+
+
+def _cache_modified_time(name, modified):
+    sitemap_cache().set(
+        MODIFIED_KEY.format(name=name), modified,
+        getattr(settings, 'SITEMAP_MODIFIED_TIMEOUT', 60)
+    )
+
+
+def modified_time(name):
+    """
+    Function to return when the file name
+    was last written, from the cache when
+    known, or None if there is no such file.
+    :param name:
+    :return: datetime or None
+    """
+    storage = sitemap_storage()
+    modified = sitemap_cache().get(MODIFIED_KEY.format(name=name))
+    if modified is None and storage.exists(name):
+        modified = storage.get_modified_time(name)
+        _cache_modified_time(name, modified)
+    return modified
+
+
+def _write(name, content):
+    """
+    Function to save content gzipped under
+    name, replacing the old file at once.
+    A local file is saved under a temporary
+    name and renamed over the old one. A
+    remote file is sent under its name, which
+    replaces the old object in one request
+    when the storage overwrites files, see
+    SITEMAP_STORAGE_OPTIONS. Other storages
+    would save a new name, so the old file is
+    deleted first and missing meanwhile.
+    :param name:
+    :param content:
+    :return:
+    """
+    storage = sitemap_storage()
+    data = ContentFile(gzip.compress(content.encode('utf-8')))
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        if not getattr(storage, 'file_overwrite', False):
+            storage.delete(name)
+        storage.save(name, data)
+    else:
+        temporary = storage.save('{}.tmp'.format(name), data)
+        os.replace(storage.path(temporary), path)
+    _cache_modified_time(name, storage.get_modified_time(name))
+
+
+def write_shard(section, shard):
+    """
+    Function to render one shard of a
+    section to its file.
+    :param section:
+    :param shard:
+    :return:
+    """
+    urls = get_sitemap(section, shard).get_urls(
+        site=Site.objects.get_current(), protocol=_protocol()
+    )
+    _write(
+        shard_name(section, shard),
+        render_to_string('sitemap.xml', {'urlset': urls})
+    )
+
+
+def write_index():
+    """
+    Function to render the sitemap index,
+    listing every shard of every section.
+    Shard n is served as page n + 1.
+    :return:
+    """
+    domain = Site.objects.get_current().domain
+    locations = []
+    for section in get_sitemaps():
+        url = '{}://{}{}'.format(
+            _protocol(), domain,
+            reverse(SECTION_URL_NAME, kwargs={'section': section})
+        )
+        locations.append(url)
+        for page in range(2, shard_count(section) + 1):
+            locations.append('{}?p={}'.format(url, page))
+    _write(
+        INDEX_NAME,
+        render_to_string('sitemap_index.xml', {'sitemaps': locations})
+    )
+
+
+def write_sitemaps():
+    """
+    Function to render every file.
+    :return: number of files written
+    """
+    written = 0
+    for section in get_sitemaps():
+        for shard in range(shard_count(section)):
+            write_shard(section, shard)
+            written += 1
+    write_index()
+    return written + 1
+
+
+def _write_shards(shards):
+    try:
+        for section, shard in sorted(shards):
+            write_shard(section, shard)
+        write_index()
+    except Exception:
+        logger.exception('Could not write sitemaps %s', shards)
+    finally:
+        # the worker thread has its own connections
+        connections.close_all()
+
+
+def _write_pending():
+    shards = getattr(_pending, 'shards', None)
+    _pending.shards = None
+    if shards:
+        _executor.submit(_write_shards, shards)
+
+
+def update_sitemaps(model, pks):
+    """
+    Function to render again the files
+    listing the objects of model in pks.
+    Sections over model are found through
+    their model attribute. The files are
+    written in the background once the
+    transaction commits, each at most once
+    however many objects of a shard changed.
+    :param model:
+    :param pks:
+    :return:
+    """
+    pks = list(pks)
+    shards = set()
+    for section in get_sitemaps():
+        sitemap = get_sitemap(section)
+        if getattr(sitemap, 'model', None) is not model:
+            continue
+        if isinstance(sitemap, ShardedSitemap):
+            shards.update(
+                (section, sitemap.shard_of(pk)) for pk in pks
+            )
+        else:
+            shards.add((section, 0))
+    if not shards:
+        return
+    if getattr(_pending, 'shards', None) is None:
+        _pending.shards = set()
+    _pending.shards.update(shards)
+    transaction.on_commit(_write_pending)
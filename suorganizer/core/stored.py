@@ -0,0 +1,81 @@
+"""
+The stored version of objects being saved.
+
+Several post_save receivers of an object need
+what it was before the save, e.g. its old slug,
+to forget what is cached under it. Instead of
+each of them reading the row again, track_stored()
+connects a pre_save receiver loading the stored
+row once, with the fields of a queryset only,
+and keeping it on the instance, where stored()
+finds it, until forget_stored() drops it after
+the post_save receivers ran.
+
+    track_stored(Tag.objects.only('slug'))
+    ...
+    post_save.connect(forget_stored, sender=Tag)
+
+forget_stored must be connected after every
+receiver using stored(), as receivers are
+called in the order they were connected.
+"""
+from django.db.models.signals import pre_save
+
+STORED_ATTR = '_stored'
+
+
+def load_stored(queryset):
+    """
+    Function to return the pre_save receiver
+    keeping the row of queryset with the pk
+    of the instance about to be saved on the
+    instance, or None for new instances and
+    fixtures.
+    :param queryset:
+    :return: receiver
+    """
+    def receiver(sender, instance, raw=False, **kwargs):
+        old = None
+        if not raw and instance.pk is not None:
+            old = queryset.filter(pk=instance.pk).first()
+        setattr(instance, STORED_ATTR, old)
+
+    return receiver
+
+
+def track_stored(queryset):
+    """
+    Function to load the stored version of
+    the objects of the model of queryset
+    before they are saved, see the module
+    docstring.
+    :param queryset:
+    :return: the receiver connected
+    """
+    receiver = load_stored(queryset)
+    pre_save.connect(receiver, sender=queryset.model, weak=False)
+    return receiver
+
+
+def stored(instance):
+    """
+    Function to return the stored version of
+    an instance being saved, None if it is
+    new or was not tracked.
+    :param instance:
+    :return: model instance or None
+    """
+    return vars(instance).get(STORED_ATTR)
+
+
+def forget_stored(sender, instance, **kwargs):
+    """
+    Function to drop the stored version of
+    a saved instance, so it is not cached
+    or pickled along with it.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    vars(instance).pop(STORED_ATTR, None)
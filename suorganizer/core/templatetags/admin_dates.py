@@ -0,0 +1,89 @@
+"""
+Template tag drawing the date hierarchy of the
+changelists of PerformanceModeMixin admins,
+see core.admin.
+The years and months of the hierarchy are
+computed by Django with a DISTINCT over the
+dates of every row of the changelist. The tag
+asks the get_date_hierarchy_months() of the
+model admin for them instead, e.g. read from a
+table of the months, and falls back to the
+Django date_hierarchy tag when it returns None:
+{% indexed_date_hierarchy cl %}
+"""
+from datetime import date
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.utils import formats
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = template.Library()
+
+
+def indexed_date_hierarchy(context, cl):
+    """
+    Returns the context of the
+    date_hierarchy.html template.
+    """
+    field_name = cl.date_hierarchy
+    year_field = '{}__year'.format(field_name)
+    month_field = '{}__month'.format(field_name)
+    day_field = '{}__day'.format(field_name)
+    if not field_name or cl.params.get(month_field) \
+            or cl.params.get(day_field):
+        return date_hierarchy(cl)
+    year = cl.params.get(year_field)
+    try:
+        year = int(year) if year else None
+    except ValueError:
+        return date_hierarchy(cl)
+    months = cl.model_admin.get_date_hierarchy_months(
+        context['request'], cl, year
+    )
+    if months is None:
+        return date_hierarchy(cl)
+
+    def link(filters):
+        return cl.get_query_string(filters, ['{}__'.format(field_name)])
+
+    if year is None:
+        years = sorted({month.year for month in months})
+        if len(years) != 1:
+            return {
+                'show': True,
+                'back': None,
+                'choices': [{
+                    'link': link({year_field: str(year)}),
+                    'title': str(year),
+                } for year in years]
+            }
+        if len(months) == 1:
+            # Django shows the days of the only month
+            return date_hierarchy(cl)
+        # and the months of the only year
+        year = years[0]
+    return {
+        'show': True,
+        'back': {
+            'link': link({}),
+            'title': _('All dates')
+        },
+        'choices': [{
+            'link': link({year_field: year, month_field: month.month}),
+            'title': capfirst(formats.date_format(
+                date(month.year, month.month, 1), 'YEAR_MONTH_FORMAT'
+            ))
+        } for month in months if month.year == year]
+    }
+
+
+@register.tag(name='indexed_date_hierarchy')
+def indexed_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser, token,
+        func=indexed_date_hierarchy,
+        template_name='date_hierarchy.html',
+    )
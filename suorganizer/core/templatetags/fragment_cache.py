@@ -0,0 +1,28 @@
+"""
+Template filter used to key cached fragments
+on the version of the object they display.
+The filter is passed to the cache tag as one
+of its vary_on arguments:
+{% cache 3600 tag_detail tag|fragment_version %}
+When the tag, or anything shown with it,
+changes, the signal handlers replace its
+version and the fragment is rendered again.
+"""
+from django import template
+
+from ..fragments import get_fragment_version
+
+register = template.Library()
+
+
+@register.filter('fragment_version')
+def fragment_version(obj):
+    """
+    Returns a string unique to the
+    current version of obj.
+    """
+    return '{}.{}.{}'.format(
+        obj._meta.label_lower,
+        obj.pk,
+        get_fragment_version(obj)
+    )
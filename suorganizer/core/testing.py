@@ -0,0 +1,61 @@
+"""
+Test helpers for core app
+"""
+from django.urls import resolve
+
+from .querycount import QueryRecorder, get_budget
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for test cases, to check the number
+    of queries of a request against the budget
+    of its url name, in the QUERY_BUDGETS
+    setting, and that no query is repeated
+    for each row of a list.
+
+        class TagTests(QueryBudgetMixin, TestCase):
+            def test_detail(self):
+                self.assertWithinBudget(
+                    '/tag/django/', allow_n_plus_one=False
+                )
+    """
+
+    def assertWithinBudget(self, path, budget=None, method='get',
+                           allow_n_plus_one=True, **kwargs):
+        """
+        Method to request path with the test
+        client and fail if it ran more queries
+        than budget, by default the budget of
+        its url name, or if allow_n_plus_one
+        is False and a query was repeated.
+        :param path:
+        :param budget:
+        :param method:
+        :param allow_n_plus_one:
+        :param kwargs: passed to the test client
+        :return: the response
+        """
+        if budget is None:
+            url_name = resolve(path.split('?')[0]).view_name
+            budget = get_budget(url_name)
+            if budget is None:
+                self.fail('{} has no query budget'.format(url_name))
+        with QueryRecorder() as recorder:
+            response = getattr(self.client, method)(path, **kwargs)
+        details = '\n'.join(
+            '{count} x {fingerprint}\n    from {origins}'.format(**group)
+            for group in recorder.groups()
+        )
+        if len(recorder) > budget:
+            self.fail('{} ran {} queries, over its budget of {}:\n{}'.format(
+                path, len(recorder), budget, details
+            ))
+        n_plus_one = recorder.n_plus_one()
+        if n_plus_one and not allow_n_plus_one:
+            self.fail('{} repeated queries:\n{}'.format(path, '\n'.join(
+                '{count} x {fingerprint}\n    from {origins}'.format(
+                    **group
+                ) for group in n_plus_one
+            )))
+        return response
@@ -1,3 +1,1001 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.contrib.sites.models import Site
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections, transaction
+from django.http import HttpResponse
+from django.template import Context, Engine, TemplateDoesNotExist, engines
+from django.template.response import SimpleTemplateResponse
+from django.test import (
+    LiveServerTestCase, RequestFactory, SimpleTestCase, TestCase,
+    TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+
+from blogs import admin as blogs_admin
+from blogs.feeds import AtomPostFeed
+from blogs.models import Post
+from organizers.feeds import AtomStartupFeed
+from organizers.importer import NaturalKeyMap
+from organizers.models import NewsLink, Startup, Tag
+from users.models import Profile, User
+
+from . import routers, sitemaps
+from .admin import EstimatedCountPaginator
+from .asyncviews import async_view
+from .benchmark import BENCHMARK_USER, synthetic_records
+from .checks import check_shared_caches
+from .db.pool import ConnectionPool, PoolTimeout, get_pool, reset_pool
+from .feeds import FeedRequest, async_feed, feed_cache
+from .fields import get_by_slug
+from .fragments import fragment_cache, get_fragment_version
+from .loaders import warm_templates
+from .management.commands.benchmark_urls import (
+    ROUTES, SKIPPED, SKIPPED_PREFIXES, url_names
+)
+from .middleware import ReplicaMiddleware
+from .objectcache import local_cache
+from .profiling import (
+    flame_rects, get_profile, make_token, should_profile
+)
+from .sitemaps import (
+    INDEX_NAME, SITEMAP_DIR, shard_name, sitemap_storage, write_index,
+    write_sitemaps
+)
+from .testing import QueryBudgetMixin
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+LOCAL_SITEMAP_STORAGE = {
+    'SITEMAP_STORAGE': 'django.core.files.storage.FileSystemStorage',
+    'SITEMAP_STORAGE_OPTIONS': {'location': MEDIA_ROOT},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FragmentVersionTest(TransactionTestCase):
+    """
+    Tests of the versioned fragment cache,
+    see fragments.py. The versions are only
+    replaced on commit, so the tests run
+    outside of a test transaction.
+    """
+
+    def setUp(self):
+        fragment_cache().clear()
+        # the sitemaps are not under test, and their
+        # worker would read the tables being written
+        executor = mock.patch.object(sitemaps, '_executor')
+        executor.start()
+        self.addCleanup(executor.stop)
+        self.tag = Tag.objects.create(name='Fragments', slug='fragments')
+        self.startup = Startup.objects.create(
+            name='Fragment Startup',
+            slug='fragment-startup',
+            description='Cached startup.',
+            founded_date=date(2020, 1, 1),
+            contact='fragments@example.com',
+            website='https://example.com/',
+        )
+
+    def test_save_replaces_the_version_on_commit(self):
+        version = get_fragment_version(self.startup)
+        self.assertEqual(get_fragment_version(self.startup), version)
+        with transaction.atomic():
+            self.startup.save()
+            self.assertEqual(
+                get_fragment_version(self.startup), version
+            )
+        self.assertNotEqual(get_fragment_version(self.startup), version)
+
+    def test_rollback_keeps_the_version(self):
+        version = get_fragment_version(self.startup)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.startup.save()
+                raise RuntimeError
+        self.assertEqual(get_fragment_version(self.startup), version)
+
+    def test_m2m_changes_replace_both_versions(self):
+        for change in (
+                lambda: self.startup.tags.add(self.tag),
+                lambda: self.tag.startup_set.clear()):
+            versions = (get_fragment_version(self.startup),
+                        get_fragment_version(self.tag))
+            change()
+            self.assertNotEqual(
+                get_fragment_version(self.startup), versions[0]
+            )
+            self.assertNotEqual(
+                get_fragment_version(self.tag), versions[1]
+            )
+
+    def test_tag_page_shows_a_renamed_startup(self):
+        self.startup.tags.add(self.tag)
+        url = reverse('organizers_tag_detail', args=[self.tag.slug])
+        self.assertContains(self.client.get(url), 'Fragment Startup')
+        self.startup.name = 'Renamed Startup'
+        self.startup.save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Renamed Startup')
+        self.assertNotContains(response, 'Fragment Startup')
+
+
+@override_settings(**LOCAL_SITEMAP_STORAGE)
+class SitemapQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    Tests of the query budgets of the
+    pre-rendered sitemaps, see sitemaps.py.
+    The files are written to a temporary
+    directory before each test.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='author@example.com', password='s3cret-Pa55word'
+        )
+        tag = Tag.objects.create(name='Budget', slug='budget')
+        startup = Startup.objects.create(
+            name='Startup', slug='startup', description='A startup.',
+            founded_date=date(2015, 1, 1), contact='hi@example.com',
+            website='https://example.com/',
+        )
+        startup.tags.add(tag)
+        for n in range(3):
+            Post.objects.create(
+                title='Post {}'.format(n), slug='post-{}'.format(n),
+                text='Text of the post.', author=author,
+            ).tags.add(tag)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        local_cache.clear()
+        write_sitemaps()
+
+    def test_sitemap_index(self):
+        self.assertWithinBudget(
+            reverse('sitemaps'), allow_n_plus_one=False
+        )
+
+    def test_sitemap_sections(self):
+        for section in ('posts', 'tags', 'startups'):
+            with self.subTest(section=section):
+                self.assertWithinBudget(
+                    reverse('django.contrib.sitemaps.views.sitemap',
+                            kwargs={'section': section}),
+                    allow_n_plus_one=False
+                )
+
+
+@override_settings(**LOCAL_SITEMAP_STORAGE)
+class SitemapFileTest(TestCase):
+    """
+    Tests of the replacement of the
+    sitemap files and of the requests
+    answered from the cache, see
+    sitemaps.py.
+    """
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_file_is_replaced_in_one_step(self):
+        write_index()
+        with mock.patch.object(
+                FileSystemStorage, 'delete', side_effect=AssertionError):
+            write_index()
+        self.assertTrue(sitemap_storage().exists(INDEX_NAME))
+        # no copy or temporary file is left
+        self.assertEqual([
+            name for name in sitemap_storage().listdir(SITEMAP_DIR)[1]
+            if name.startswith('sitemap.xml')
+        ], ['sitemap.xml.gz'])
+
+    def test_not_modified_without_reading_the_storage(self):
+        response = self.client.get(reverse('sitemaps'))
+        self.assertEqual(response.status_code, 200)
+        with mock.patch.object(
+                FileSystemStorage, 'exists', side_effect=AssertionError), \
+                mock.patch.object(
+                    FileSystemStorage, 'open', side_effect=AssertionError):
+            response = self.client.get(
+                reverse('sitemaps'),
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_remote_file_is_replaced(self):
+        self.addCleanup(sitemaps._storage.cache_clear)
+        with self.settings(
+                SITEMAP_STORAGE='core.tests.MemoryStorage',
+                SITEMAP_STORAGE_OPTIONS={'file_overwrite': True}):
+            write_index()
+            storage = sitemap_storage()
+            # the object is sent again under its name
+            with mock.patch.object(
+                    storage, 'delete', side_effect=AssertionError):
+                write_index()
+            self.assertEqual(list(storage.files), [INDEX_NAME])
+        with self.settings(
+                SITEMAP_STORAGE='core.tests.MemoryStorage',
+                SITEMAP_STORAGE_OPTIONS={'file_overwrite': False}):
+            write_index()
+            write_index()
+            self.assertEqual(list(sitemap_storage().files), [INDEX_NAME])
+
+
+class MemoryStorage(Storage):
+    """
+    Storage keeping the files in memory,
+    without local paths, and overwriting
+    them with file_overwrite, as the S3
+    storage of django-storages does.
+    """
+
+    def __init__(self, file_overwrite=False):
+        self.file_overwrite = file_overwrite
+        self.files = {}
+
+    def _open(self, name, mode='rb'):
+        return ContentFile(self.files[name][0], name=name)
+
+    def _save(self, name, content):
+        self.files[name] = (content.read(), timezone.now())
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        if self.file_overwrite:
+            return name
+        return super().get_available_name(name, max_length)
+
+    def exists(self, name):
+        return name in self.files
+
+    def delete(self, name):
+        self.files.pop(name, None)
+
+    def get_modified_time(self, name):
+        return self.files[name][1]
+
+
+@override_settings(**LOCAL_SITEMAP_STORAGE)
+class SitemapUpdateTest(TransactionTestCase):
+    """
+    Tests of the files rendered again
+    when objects are saved, see
+    update_sitemaps in sitemaps.py.
+    """
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def wait_for_the_worker(self):
+        # the worker runs the tasks in order
+        sitemaps._executor.submit(lambda: None).result()
+
+    def test_files_are_written_in_the_background(self):
+        self.wait_for_the_worker()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        with mock.patch.object(sitemaps, '_executor') as executor:
+            Tag.objects.create(name='Mapped', slug='mapped')
+        # nothing was rendered during the save
+        self.assertFalse(sitemap_storage().exists(INDEX_NAME))
+        function, shards = executor.submit.call_args[0]
+        self.assertEqual({section for section, shard in shards}, {'tags'})
+        Tag.objects.create(name='Mapped again', slug='mapped-again')
+        self.wait_for_the_worker()
+        self.assertTrue(sitemap_storage().exists(INDEX_NAME))
+        self.assertTrue(sitemap_storage().exists(shard_name('tags', 0)))
+
+
+PAGE_CACHE_MIDDLEWARE = (
+    ['django.middleware.cache.UpdateCacheMiddleware']
+    + [
+        middleware for middleware in settings.MIDDLEWARE
+        if not middleware.startswith('django.middleware.cache.')
+    ]
+    + ['django.middleware.cache.FetchFromCacheMiddleware']
+)
+
+
+@override_settings(
+    MIDDLEWARE=PAGE_CACHE_MIDDLEWARE,
+    **LOCAL_SITEMAP_STORAGE
+)
+class PageCacheTest(TransactionTestCase):
+    """
+    Tests of the conditional responses
+    under the site-wide page cache, see
+    conditional.py. Changes are seen once
+    transactions commit.
+    """
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        local_cache.clear()
+
+    def test_detail_is_revalidated(self):
+        tag = Tag.objects.create(name='Cached', slug='cached')
+        url = tag.get_absolute_url()
+        response = self.client.get(url)
+        self.assertEqual(response['Cache-Control'], 'max-age=0')
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+        tag.name = 'Renamed'
+        tag.save()
+        self.assertContains(self.client.get(url), 'Renamed')
+
+    def test_feeds_and_sitemaps_are_revalidated(self):
+        for url in (reverse('blogs_atom_feed'), reverse('sitemaps')):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response['Cache-Control'], 'max-age=0')
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                )
+                self.assertEqual(response.status_code, 304)
+
+
+class FeedCacheTest(TestCase):
+    """
+    Tests of the cached feeds rendered
+    outside of requests, see feeds.py,
+    and of the cache they need, see
+    checks.py.
+    """
+
+    def test_request_is_for_the_current_site(self):
+        request = FeedRequest('/blog/feed/')
+        self.assertEqual(
+            request.META['SERVER_NAME'], Site.objects.get_current().domain
+        )
+        with self.settings(SITEMAP_PROTOCOL='https'):
+            self.assertEqual(request.scheme, 'https')
+
+    def test_feeds_expire(self):
+        self.assertEqual(AtomStartupFeed().cache_timeout(), 3600)
+        with self.settings(FEED_CACHE_TIMEOUT=60):
+            self.assertEqual(AtomStartupFeed().cache_timeout(), 60)
+        # the post feeds expire at midnight
+        self.assertLessEqual(AtomPostFeed().cache_timeout(), 86401)
+
+    def test_cache_must_be_shared(self):
+        with self.settings(CACHES=LOCMEM_CACHES):
+            errors = check_shared_caches(None)
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+        memcached = {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': '127.0.0.1:11211',
+        }
+        with self.settings(CACHES={'default': memcached}):
+            self.assertEqual(check_shared_caches(None), [])
+        with self.settings(
+                CACHES=dict(LOCMEM_CACHES, default=memcached, objects=(
+                    LOCMEM_CACHES['default']
+                )),
+                OBJECT_CACHE_ALIAS='objects'):
+            errors = check_shared_caches(None)
+        self.assertEqual([error.obj for error in errors], ['objects'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AsyncViewTest(TestCase):
+    """
+    Tests of the async variants of the
+    views and feeds, see asyncviews.py
+    """
+
+    def setUp(self):
+        feed_cache().clear()
+        self.request = RequestFactory().get('/')
+
+    def view(self, request):
+        self.thread = threading.current_thread()
+        return SimpleTemplateResponse(
+            engines['django'].from_string('Rendered')
+        )
+
+    def test_views_are_sync_by_default(self):
+        view = self.view
+        self.assertIs(async_view(view), view)
+        feed = AtomPostFeed()
+        self.assertIs(async_feed(feed), feed)
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_view_is_rendered_in_the_thread_pool(self):
+        view = async_view(self.view)
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        response = async_to_sync(view)(self.request)
+        self.assertTrue(response.is_rendered)
+        self.assertEqual(response.content, b'Rendered')
+        self.assertIsNot(self.thread, threading.main_thread())
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_cached_feed_is_served_without_queries(self):
+        feed = AtomPostFeed()
+        content = feed(self.request).content
+        view = async_feed(feed)
+        with self.assertNumQueries(0):
+            response = async_to_sync(view)(self.request)
+        self.assertEqual(response.content, content)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PROFILING_SAMPLE_RATE=0)
+class ProfilingTest(TestCase):
+    """
+    Tests of the sampling profiler,
+    see profiling.py
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            email='staff@example.com', password='s3cret-Pa55word',
+            is_staff=True
+        )
+        Profile.objects.create(
+            user=cls.staff, slug='staff', name='Staff', about='Profiles.'
+        )
+
+    def setUp(self):
+        caches['default'].clear()
+        self.factory = RequestFactory()
+
+    def test_should_profile(self):
+        request = self.factory.get('/', HTTP_X_PROFILE=make_token())
+        self.assertTrue(should_profile(request))
+        request = self.factory.get('/', HTTP_X_PROFILE='forged:token')
+        self.assertFalse(should_profile(request))
+        request = self.factory.get('/', {'profile': ''})
+        request.user = User(email='reader@example.com')
+        self.assertFalse(should_profile(request))
+        request.user = self.staff
+        self.assertTrue(should_profile(request))
+
+    def test_flame_rects(self):
+        rects, depth = flame_rects({'view;sql:a': 3, 'view;tag:b': 1})
+        self.assertEqual(depth, 3)
+        self.assertEqual(
+            {(rect['name'], rect['depth'], rect['left'], rect['width'])
+             for rect in rects},
+            {('all', 0, 0, 1), ('view', 1, 0, 1),
+             ('sql:a', 2, 0, 0.75), ('tag:b', 2, 0.75, 0.25)}
+        )
+
+    def test_request_is_profiled(self):
+        response = self.client.get(
+            reverse('organizers_tag_list'), HTTP_X_PROFILE=make_token()
+        )
+        profile = get_profile(response['X-Profile-Id'])
+        self.assertEqual(profile['url_name'], 'organizers_tag_list')
+        self.assertTrue(profile['queries'])
+        url = reverse('profile_detail', args=[profile['id']])
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.staff)
+        self.assertContains(
+            self.client.get(reverse('profile_list')), profile['id']
+        )
+        response = self.client.get(url, {'format': 'collapsed'})
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        missing = reverse('profile_detail', args=['missing'])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+
+class SeedBenchmarkTest(TestCase):
+    """
+    Tests of the synthetic dataset,
+    see benchmark.py
+    """
+    sizes = {'tags': 3, 'startups': 2, 'newslinks': 5, 'posts': 4}
+
+    def seed(self):
+        out = StringIO()
+        # composite natural keys are looked
+        # up a few at a time
+        with mock.patch.object(NaturalKeyMap, 'chunk_size', 2):
+            call_command('seed_benchmark', stdout=out, **self.sizes)
+        return out.getvalue()
+
+    def counts(self):
+        return (
+            Tag.objects.filter(slug__startswith='bench-').count(),
+            Startup.objects.filter(slug__startswith='bench-').count(),
+            NewsLink.objects.filter(slug__startswith='bench-').count(),
+            Post.objects.filter(slug__startswith='bench-').count(),
+        )
+
+    def test_records_depend_on_the_seed(self):
+        def records(seed):
+            return list(synthetic_records(seed=seed, **self.sizes))
+        self.assertEqual(records(1), records(1))
+        self.assertNotEqual(records(1), records(2))
+
+    def test_seeding_again_updates_the_rows(self):
+        self.assertIn('blogs.post: 4 created', self.seed())
+        self.assertEqual(self.counts(), (3, 2, 5, 4))
+        self.assertIn('blogs.post: 0 created, 4 updated', self.seed())
+        self.assertEqual(self.counts(), (3, 2, 5, 4))
+        self.assertEqual(
+            Post.objects.filter(author__email=BENCHMARK_USER).count(), 4
+        )
+
+
+class BenchmarkUrlsTest(LiveServerTestCase):
+    """
+    Tests of the benchmark of the pages,
+    run against the live test server.
+    """
+
+    def test_every_route_is_driven_or_skipped(self):
+        for name in url_names(get_resolver().url_patterns):
+            if not name.startswith(SKIPPED_PREFIXES):
+                self.assertTrue(
+                    name in ROUTES or name in SKIPPED, name
+                )
+
+    def test_route_is_benchmarked(self):
+        call_command(
+            'seed_benchmark', tags=2, startups=1, newslinks=1, posts=1,
+            stdout=StringIO()
+        )
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'results.json')
+        call_command(
+            'benchmark_urls', base_url=self.live_server_url,
+            routes=['organizers_tag_list'], requests=4, warmup=1,
+            concurrency=2, json=path, stdout=StringIO()
+        )
+        with open(path) as results:
+            route = json.load(results)['routes']['organizers_tag_list']
+        self.assertEqual(route['statuses'], {'200': 4})
+        self.assertGreater(route['queries_per_request'], 0)
+
+
+class TemplateLoaderTest(TestCase):
+    """
+    Tests of the cached template loader,
+    see loaders.py
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def engine(self, debug):
+        return Engine(dirs=[self.directory], debug=debug, loaders=[
+            ('core.loaders.Loader', [
+                'django.template.loaders.filesystem.Loader',
+            ]),
+        ])
+
+    def write(self, content, mtime):
+        path = os.path.join(self.directory, 'page.html')
+        with open(path, 'w') as template:
+            template.write(content)
+        os.utime(path, (mtime, mtime))
+
+    def render(self, engine):
+        return engine.get_template('page.html').render(Context())
+
+    def test_changed_template_is_compiled_again_when_debugging(self):
+        engine = self.engine(debug=True)
+        with self.assertRaises(TemplateDoesNotExist):
+            engine.get_template('page.html')
+        self.write('First', 1000000000)
+        self.assertEqual(self.render(engine), 'First')
+        self.write('Second', 1000000010)
+        self.assertEqual(self.render(engine), 'Second')
+
+    def test_template_is_compiled_once(self):
+        engine = self.engine(debug=False)
+        self.write('First', 1000000000)
+        self.assertEqual(self.render(engine), 'First')
+        self.write('Second', 1000000010)
+        self.assertEqual(self.render(engine), 'First')
+
+    def test_every_template_compiles(self):
+        compiled, failed = warm_templates()
+        self.assertGreater(compiled, 0)
+        self.assertEqual(failed, 0)
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn('post/post_list.html', loader.get_template_cache)
+
+    def test_only_servers_warm_up(self):
+        config = apps.get_app_config('core')
+        with mock.patch('core.loaders.warm_templates') as warm:
+            with self.settings(TEMPLATE_WARMUP=False):
+                config.ready()
+            warm.assert_not_called()
+            with self.settings(TEMPLATE_WARMUP=True):
+                config.ready()
+            warm.assert_called_once_with()
+        for name in ('suorganizer.wsgi', 'suorganizer.asgi'):
+            with self.subTest(module=name), mock.patch.dict(os.environ):
+                os.environ.pop('TEMPLATE_WARMUP', None)
+                importlib.reload(importlib.import_module(name))
+                self.assertEqual(os.environ['TEMPLATE_WARMUP'], 'true')
+
+
+class SlugLookupTest(TestCase):
+    """
+    Tests of the lowercased slugs and their
+    lookups, see fields.py
+    """
+
+    def setUp(self):
+        local_cache.clear()
+
+    def test_slug_is_lowercased_on_save(self):
+        tag = Tag.objects.create(name='Mixed', slug='MiXeD-Case')
+        tag.refresh_from_db()
+        self.assertEqual(tag.slug, 'mixed-case')
+
+    def test_exact_match_is_tried_first(self):
+        tag = Tag.objects.create(name='Mixed', slug='mixed-case')
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_by_slug(Tag.objects, slug__iexact='MIXED-Case'), tag
+            )
+
+    def test_iexact_fallback(self):
+        tag = Tag.objects.create(name='Mixed', slug='mixed-case')
+        # written around the model, as raw SQL would
+        Tag.objects.filter(pk=tag.pk).update(slug='Mixed-Case')
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                get_by_slug(Tag.objects, slug__iexact='mixed-case'), tag
+            )
+        with self.assertRaises(Tag.DoesNotExist):
+            get_by_slug(Tag.objects, slug__iexact='missing')
+
+    def test_migration_lowercases_the_slugs(self):
+        migration = importlib.import_module(
+            'organizers.migrations.0011_slug_indexes'
+        )
+        tag = Tag.objects.create(name='Mixed', slug='mixed-case')
+        Tag.objects.filter(pk=tag.pk).update(slug='Mixed-Case')
+        migration.lowercase_slugs(apps, None)
+        tag.refresh_from_db()
+        self.assertEqual(tag.slug, 'mixed-case')
+
+    def test_detail_url_ignores_case(self):
+        Tag.objects.create(name='Mixed', slug='mixed-case')
+        response = self.client.get(
+            reverse('organizers_tag_detail', args=['MIXED-case'])
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class FakeConnection:
+    """
+    DB-API connection recording its calls,
+    failing them once broken.
+    """
+
+    def __init__(self):
+        self.broken = self.closed = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        if self.broken:
+            raise OSError('server closed the connection')
+        return mock.Mock()
+
+    def rollback(self):
+        if self.broken:
+            raise OSError('server closed the connection')
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    """
+    Tests of the database connection pool,
+    see db/pool.py. The clock of the pool
+    is moved forward by the tests.
+    """
+
+    def setUp(self):
+        self.now = 1000.0
+        clock = mock.patch(
+            'core.db.pool.time.monotonic', lambda: self.now
+        )
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def pool(self, **options):
+        options = dict({'size': 2, 'timeout': 0.01}, **options)
+        return ConnectionPool('test', **options)
+
+    def test_released_connection_is_reused(self):
+        pool = self.pool()
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertIs(pool.acquire(FakeConnection), connection)
+        self.assertEqual(pool.stats['created'], 1)
+        self.assertEqual(pool.stats['reused'], 1)
+        self.assertEqual(pool.as_dict()['in_use'], 1)
+
+    def test_broken_connection_is_replaced_on_checkout(self):
+        pool = self.pool()
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        connection.broken = True
+        new = pool.acquire(FakeConnection)
+        self.assertIsNot(new, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats['failed_checks'], 1)
+
+    def test_recent_connection_is_not_checked(self):
+        pool = self.pool(check=10)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        self.now += 5
+        self.assertIs(pool.acquire(FakeConnection), connection)
+        self.assertEqual(pool.stats['checked'], 0)
+
+    def test_idle_and_old_connections_are_closed(self):
+        pool = self.pool(idle=60, max_age=100)
+        idle = pool.acquire(FakeConnection)
+        old = pool.acquire(FakeConnection)
+        pool.release(idle)
+        self.now += 61
+        # pruned when the next connection is released
+        pool.release(old)
+        self.assertTrue(idle.closed)
+        self.now += 40
+        self.assertIsNot(pool.acquire(FakeConnection), old)
+        self.assertTrue(old.closed)
+        self.assertEqual(pool.stats['expired'], 1)
+        self.assertEqual(pool.stats['retired'], 1)
+
+    def test_connection_failing_to_roll_back_is_discarded(self):
+        pool = self.pool()
+        connection = pool.acquire(FakeConnection)
+        connection.broken = True
+        pool.release(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.as_dict()['open'], 0)
+
+    def test_checkout_waits_for_a_free_connection(self):
+        pool = self.pool(size=1)
+        connection = pool.acquire(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(FakeConnection)
+        self.assertEqual(pool.stats['timeouts'], 1)
+        pool.release(connection)
+        self.assertIs(pool.acquire(FakeConnection), connection)
+
+    def test_pool_per_alias(self):
+        self.addCleanup(reset_pool, 'pooled')
+        self.assertIsNone(get_pool('unpooled', {'POOL': {'SIZE': 0}}))
+        settings_dict = {'POOL': {'SIZE': 3}}
+        pool = get_pool('pooled', settings_dict)
+        self.assertEqual(pool.size, 3)
+        self.assertIs(get_pool('pooled', settings_dict), pool)
+        reset_pool('pooled')
+        self.assertIsNot(get_pool('pooled', settings_dict), pool)
+
+
+class AdminPerformanceModeTest(TestCase):
+    """
+    Tests of the performance mode of the
+    post and user changelists, see admin.py
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            email='admin@example.com', password='s3cret-Pa55word'
+        )
+        Profile.objects.create(
+            user=cls.user, slug='admin', name='Admin Name', about='Admin.'
+        )
+        tag = Tag.objects.create(name='Admin', slug='admin-tag')
+        for slug, pub_date in (('admin-first', date(2001, 3, 20)),
+                               ('admin-second', date(2002, 7, 1))):
+            post = Post.objects.create(
+                title='Admin post', slug=slug, text='An admin post.',
+                author=cls.user,
+            )
+            post.pub_date = pub_date
+            post.save()
+            post.tags.add(tag)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def changelist(self, url_name, **params):
+        return self.client.get(reverse(url_name), params)
+
+    def test_post_changelist(self):
+        response = self.changelist(
+            'admin:blogs_post_changelist', q='admin post'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(
+            response, '<td class="field-get_author">Admin Name</td>',
+            count=2, html=True
+        )
+        changelist = response.context['cl']
+        self.assertIsInstance(
+            changelist.paginator, EstimatedCountPaginator
+        )
+        self.assertFalse(changelist.show_full_result_count)
+        self.assertEqual(
+            [post.tag_number for post in changelist.result_list], [1, 1]
+        )
+        with self.settings(ADMIN_PERFORMANCE_MODE=False):
+            changelist = self.changelist(
+                'admin:blogs_post_changelist'
+            ).context['cl']
+        self.assertTrue(changelist.show_full_result_count)
+
+    def test_date_hierarchy_reads_the_archive(self):
+        with mock.patch(
+                'blogs.admin.archive_months',
+                wraps=blogs_admin.archive_months) as months:
+            response = self.changelist('admin:blogs_post_changelist')
+            self.assertContains(response, '?pub_date__year=2001')
+            self.assertContains(response, '?pub_date__year=2002')
+            months.assert_called_once_with(allow_future=True, year=None)
+            response = self.changelist(
+                'admin:blogs_post_changelist', pub_date__year=2001
+            )
+            self.assertContains(
+                response, 'pub_date__month=3&amp;pub_date__year=2001'
+            )
+            self.assertNotContains(response, 'pub_date__month=7')
+            # searches fall back to the dates of the rows
+            months.reset_mock()
+            self.changelist('admin:blogs_post_changelist', q='admin')
+            months.assert_not_called()
+
+    def test_date_hierarchy_lists_future_months(self):
+        post = Post.objects.get(slug='admin-second')
+        post.pub_date = date.today().replace(day=1) + timedelta(days=400)
+        post.save()
+        response = self.changelist('admin:blogs_post_changelist')
+        self.assertContains(
+            response, '?pub_date__year={}'.format(post.pub_date.year)
+        )
+
+    def test_estimated_count(self):
+        startups = Startup.objects.all()
+        # the rows are counted on SQLite
+        self.assertEqual(
+            EstimatedCountPaginator(startups, 10).count, startups.count()
+        )
+        with mock.patch('core.admin.estimate_count', return_value=50000):
+            self.assertEqual(
+                EstimatedCountPaginator(startups, 10).count, 50000
+            )
+        with mock.patch('core.admin.estimate_count', return_value=5):
+            self.assertEqual(
+                EstimatedCountPaginator(startups, 10).count, startups.count()
+            )
+
+    def test_user_changelist_joins_the_profiles(self):
+        def count():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.changelist('admin:users_user_changelist')
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+        before = count()
+        for number in range(3):
+            Profile.objects.create(
+                user=User.objects.create_user(
+                    email='staff{}@example.com'.format(number),
+                    password='s3cret-Pa55word'
+                ),
+                slug='staff-{}'.format(number),
+                name='Staff', about='Staff.'
+            )
+        self.assertEqual(count(), before)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTest(TransactionTestCase):
+    """
+    Tests of the routing of reads to the
+    replicas, see routers.py. The replica
+    alias of the test settings mirrors
+    the default database.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        routers._checks.clear()
+        self.addCleanup(routers._checks.clear)
+        self.factory = RequestFactory()
+
+    def request(self, view, method='get', **cookies):
+        request = getattr(self.factory, method)('/')
+        request.COOKIES.update(cookies)
+        return ReplicaMiddleware(view)(request)
+
+    def read_view(self, request):
+        self.read_from = Tag.objects.all().db
+        return HttpResponse()
+
+    def write_view(self, request):
+        Tag.objects.create(name='Written', slug='written')
+        return self.read_view(request)
+
+    def test_safe_requests_read_the_replica(self):
+        response = self.request(self.read_view)
+        self.assertEqual(self.read_from, 'replica')
+        self.assertNotIn('use_primary', response.cookies)
+
+    def test_writes_stick_to_the_primary(self):
+        response = self.request(self.write_view, method='post')
+        self.assertEqual(self.read_from, 'default')
+        self.assertIn('use_primary', response.cookies)
+        self.request(self.read_view, use_primary='1')
+        self.assertEqual(self.read_from, 'default')
+
+    def test_reads_after_a_write_use_the_primary(self):
+        self.request(self.write_view)
+        self.assertEqual(self.read_from, 'default')
+
+    def test_failing_replica_is_skipped(self):
+        with mock.patch.object(
+                routers, 'replica_lag', side_effect=DatabaseError):
+            with self.assertLogs('core.routers', 'WARNING'):
+                self.request(self.read_view)
+        self.assertEqual(self.read_from, 'default')
+
+    def test_lagging_replica_is_skipped(self):
+        with mock.patch.object(routers, 'replica_lag', return_value=60):
+            with self.assertLogs('core.routers', 'WARNING'):
+                self.request(self.read_view)
+        self.assertEqual(self.read_from, 'default')
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(Tag.objects.all().db, 'default')
+
+    def test_page_is_read_from_the_replica(self):
+        Tag.objects.create(name='Replicated', slug='replicated')
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = self.client.get(reverse('organizers_tag_list'))
+        self.assertContains(response, 'Replicated')
+        self.assertTrue(queries.captured_queries)
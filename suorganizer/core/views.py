@@ -1,3 +1,178 @@
-from django.shortcuts import render
+"""
+view module for core app
+"""
+import gzip
 
-# Create your views here.
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.response import TemplateResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_safe
+
+from .conditional import revalidate
+from .db.pool import pool_stats
+from .profiling import flame_rects, get_profile, get_profiles, make_token
+from .querycount import report
+from .sitemaps import (
+    INDEX_NAME, get_sitemaps, modified_time, shard_count, shard_name,
+    sitemap_storage, write_index, write_shard
+)
+
+
+def _sitemap_file(section, page):
+    """
+    Function to return the storage name of
+    the file for a page of section, or of
+    the index if section is None, and when it
+    was written. A missing file is rendered
+    on the spot, e.g. before generate_sitemaps
+    first ran.
+    :param section:
+    :param page:
+    :return: (name, modified time)
+    """
+    if section is None:
+        modified = modified_time(INDEX_NAME)
+        if modified is None:
+            write_index()
+            modified = modified_time(INDEX_NAME)
+        return INDEX_NAME, modified
+    if section not in get_sitemaps():
+        raise Http404(
+            'No sitemap available for section: {!r}'.format(section)
+        )
+    try:
+        shard = int(page) - 1
+    except (TypeError, ValueError):
+        raise Http404("No page '{}'".format(page))
+    name = shard_name(section, shard)
+    modified = modified_time(name)
+    if modified is None:
+        if not 0 <= shard < shard_count(section):
+            raise Http404('Page {} empty'.format(page))
+        write_shard(section, shard)
+        modified = modified_time(name)
+    return name, modified
+
+
+@require_safe
+def sitemap(request, section=None):
+    """
+    View serving the pre-rendered sitemap
+    index, when section is None, or a page
+    of a sitemap section. The files are
+    stored gzipped and sent as they are to
+    clients accepting gzip. The storage is
+    only read when the file is sent.
+    :param request:
+    :param section:
+    :return:
+    """
+    name, modified = _sitemap_file(section, request.GET.get('p', 1))
+
+    @revalidate
+    @condition(last_modified_func=lambda request: modified)
+    def serve(request):
+        with sitemap_storage().open(name) as sitemap_file:
+            content = sitemap_file.read()
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if 'gzip' in accept:
+            response = HttpResponse(
+                content, content_type='application/xml'
+            )
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(
+                gzip.decompress(content), content_type='application/xml'
+            )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response['X-Robots-Tag'] = 'noindex, noodp, noarchive'
+        return response
+
+    return serve(request)
+
+
+@staff_member_required
+def query_report(request):
+    """
+    View returning the query statistics
+    recorded by the QueryCountMiddleware,
+    per url name, as JSON. POST clears them.
+    :param request:
+    :return:
+    """
+    if request.method == 'POST':
+        report.clear()
+    return JsonResponse(report.as_dict())
+
+
+@staff_member_required
+def db_pool_report(request):
+    """
+    View returning the metrics of the database
+    connection pools of the process serving
+    the request, by alias, as JSON.
+    :param request:
+    :return:
+    """
+    return JsonResponse(pool_stats())
+
+
+@staff_member_required
+def profile_list(request):
+    """
+    View listing the profiles recorded by
+    the ProfilingMiddleware.
+    :param request:
+    :return:
+    """
+    return TemplateResponse(request, 'core/profile_list.html', {
+        'profiles': get_profiles(),
+        'token': make_token(),
+    })
+
+
+# colours of the flame graph rectangles, by label
+FLAME_COLORS = {
+    'view': '#8fb8de',
+    'template': '#f5b971',
+    'tag': '#f28f6b',
+    'sql': '#c58fd1',
+}
+
+
+@staff_member_required
+def profile_detail(request, profile_id):
+    """
+    View showing a profile as a flame graph,
+    or its collapsed stacks as text with
+    ?format=collapsed, the input of
+    flamegraph.pl and speedscope.
+    :param request:
+    :param profile_id:
+    :return:
+    """
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise Http404('No profile {}'.format(profile_id))
+    if request.GET.get('format') == 'collapsed':
+        return HttpResponse(
+            ''.join(
+                '{} {}\n'.format(stack, count)
+                for stack, count in profile['stacks'].items()
+            ),
+            content_type='text/plain'
+        )
+    rects, depth = flame_rects(profile['stacks'])
+    for rect in rects:
+        rect['top'] = rect['depth'] * 18
+        rect['left'] *= 100
+        rect['width'] *= 100
+        rect['color'] = FLAME_COLORS.get(
+            rect['name'].split(':')[0], '#e6e6a1'
+        )
+    return TemplateResponse(request, 'core/flamegraph.html', {
+        'profile': profile,
+        'rects': rects,
+        'height': depth * 18,
+    })
@@ -0,0 +1,152 @@
+"""
+The exported models, as resources.
+
+A resource reads the rows of its model with
+values_list() projections, never building model
+instances, and turns each row into a record:
+
+    {"key": ["2020-05-01", "a-post"], "title": ...,
+     "tags": [["a-tag"], ...]}
+
+The key of a record, and of the related objects
+listed in it, is the natural key of the object,
+as given to the get_by_natural_key() of its
+manager, e.g. the pub_date and slug of a post.
+
+The many to many relations of a chunk of rows
+are read with one query per relation, so the
+memory used depends on the chunk size only.
+"""
+from itertools import islice
+
+from blogs.models import Post
+from organizers.models import NewsLink, Startup, Tag
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Resource:
+    """
+    A model exported by natural key. key and
+    fields are the paths given to
+    values_list(), many maps the name of a
+    many to many field to the natural key
+    paths of the related model. The
+    staff_fields, e.g. personal data, are
+    exported to staff users only.
+    """
+
+    def __init__(self, model, key, fields=(), many=None,
+                 staff_fields=()):
+        self.model = model
+        self.key = list(key)
+        self.fields = list(fields)
+        self.many = dict(many or {})
+        self.staff_fields = list(staff_fields)
+
+    def get_queryset(self, request):
+        return self.model._default_manager.all()
+
+    def get_fields(self, request):
+        """
+        Method to return the fields exported
+        to the user of request.
+        :param request:
+        :return: list of paths
+        """
+        if request.user.is_staff:
+            return self.fields + self.staff_fields
+        return self.fields
+
+    def related_keys(self, name, pks, using):
+        """
+        Method to return the natural keys of the
+        objects related to the rows of pks by
+        the many to many field name.
+        :param name:
+        :param pks:
+        :param using: database alias
+        :return: dict of lists of keys, by pk
+        """
+        field = self.model._meta.get_field(name)
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        paths = [
+            '{}__{}'.format(target, path) for path in self.many[name]
+        ]
+        rows = field.remote_field.through.objects.using(using).filter(**{
+            '{}_id__in'.format(source): pks
+        }).order_by(*paths).values_list('{}_id'.format(source), *paths)
+        keys = {}
+        for pk, *key in rows:
+            keys.setdefault(pk, []).append(key)
+        return keys
+
+    def records(self, queryset, fields, chunk_size):
+        """
+        Generator returning the records of the
+        rows of queryset, in its order, with
+        fields, reading chunk_size rows at a
+        time.
+        :param queryset:
+        :param fields: see get_fields
+        :param chunk_size:
+        :return:
+        """
+        rows = queryset.values_list(
+            'pk', *self.key, *fields
+        ).iterator(chunk_size=chunk_size)
+        size = len(self.key)
+        for chunk in _chunks(rows, chunk_size):
+            pks = [row[0] for row in chunk]
+            many = {
+                name: self.related_keys(name, pks, queryset.db)
+                for name in self.many
+            }
+            for pk, *values in chunk:
+                record = {'key': values[:size]}
+                record.update(zip(fields, values[size:]))
+                for name, keys in many.items():
+                    record[name] = keys.get(pk, [])
+                yield record
+
+
+class PostResource(Resource):
+    """
+    Resource of the posts, listing the
+    unpublished posts only to the users
+    allowed to view them.
+    """
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if not request.user.has_perm('blogs.view_future_post'):
+            queryset = queryset.published()
+        return queryset
+
+
+RESOURCES = {
+    'tags': Resource(Tag, ['slug'], ['name', 'modified']),
+    'startups': Resource(
+        Startup, ['slug'],
+        ['name', 'description', 'founded_date', 'website', 'modified'],
+        many={'tags': ['slug']},
+        staff_fields=['contact'],
+    ),
+    'newslinks': Resource(
+        NewsLink, ['startup__slug', 'slug'],
+        ['title', 'pub_date', 'link', 'modified'],
+    ),
+    'posts': PostResource(
+        Post, ['pub_date', 'slug'],
+        ['title', 'text', 'modified'],
+        many={'tags': ['slug'], 'startups': ['slug']},
+    ),
+}
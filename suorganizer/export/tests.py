@@ -0,0 +1,63 @@
+import json
+from datetime import date
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from organizers.models import Startup
+from users.models import Profile, User
+
+
+class ExportTest(TestCase):
+    """
+    Tests of what the export api
+    publishes to each user, see
+    views.py and resources.py.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for n in range(5):
+            Startup.objects.create(
+                name='Startup {}'.format(n), slug='startup-{}'.format(n),
+                description='A startup.', founded_date=date(2015, 1, 1),
+                contact='founder{}@example.com'.format(n),
+                website='https://example.com/',
+            )
+        cls.staff = User.objects.create_user(
+            email='staff@example.com', password='s3cret-Pa55word',
+            is_staff=True,
+        )
+        Profile.objects.create(
+            user=cls.staff, slug='staff', name='Staff', about='Works here.'
+        )
+        cls.url = reverse('export', kwargs={'resource': 'startups'})
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_contact_is_left_out(self):
+        page = self.export()
+        self.assertEqual(len(page['results']), Startup.objects.count())
+        for record in page['results']:
+            self.assertNotIn('contact', record)
+
+    def test_contact_is_exported_to_staff(self):
+        self.client.force_login(self.staff)
+        page = self.export()
+        self.assertIn(
+            'founder0@example.com',
+            [record['contact'] for record in page['results']]
+        )
+
+    @override_settings(EXPORT_ANONYMOUS_PAGE_SIZE=2)
+    def test_anonymous_page_size(self):
+        page = self.export(limit=1000)
+        self.assertEqual(len(page['results']), 2)
+        self.assertIsNotNone(page['next'])
+        self.client.force_login(self.staff)
+        page = self.export(limit=1000)
+        self.assertEqual(len(page['results']), Startup.objects.count())
+        self.assertIsNone(page['next'])
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import export
+
+urlpatterns = [
+    path('<resource>/', export, name='export'),
+]
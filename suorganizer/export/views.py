@@ -0,0 +1,141 @@
+"""
+View module for export app
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (
+    Http404, HttpResponseBadRequest, StreamingHttpResponse
+)
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.views.decorators.http import require_safe
+
+from .resources import RESOURCES
+
+FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def encode_cursor(pk):
+    return urlsafe_base64_encode(json.dumps([pk]).encode())
+
+
+def decode_cursor(cursor):
+    """
+    Function to return the primary key of the
+    last row of a page, from its cursor.
+    :param cursor:
+    :return: pk
+    """
+    try:
+        pk, = json.loads(urlsafe_base64_decode(cursor).decode())
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('That cursor is not valid')
+    if not isinstance(pk, int):
+        raise ValueError('That cursor is not valid')
+    return pk
+
+
+def _dumps(record):
+    return json.dumps(record, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def _ndjson(records):
+    for record in records:
+        yield _dumps(record) + '\n'
+
+
+def _json(records, next_url):
+    yield '{{"next":{},"results":['.format(json.dumps(next_url))
+    separator = ''
+    for record in records:
+        yield separator + _dumps(record)
+        separator = ','
+    yield ']}'
+
+
+def _get_limit(request):
+    """
+    Function to return the number of records
+    of the page requested. Anonymous users get
+    pages of EXPORT_ANONYMOUS_PAGE_SIZE records
+    at most, other users of EXPORT_MAX_PAGE_SIZE.
+    :param request:
+    :return: int
+    """
+    default = getattr(settings, 'EXPORT_PAGE_SIZE', 1000)
+    maximum = getattr(settings, 'EXPORT_MAX_PAGE_SIZE', 100000)
+    if not request.user.is_authenticated:
+        maximum = getattr(settings, 'EXPORT_ANONYMOUS_PAGE_SIZE', 100)
+    limit = int(request.GET.get('limit', min(default, maximum)))
+    if limit < 1:
+        raise ValueError('The limit must be positive')
+    return min(limit, maximum)
+
+
+@require_safe
+def export(request, resource):
+    """
+    View streaming a page of the records of a
+    resource, see export.resources, as JSON
+    or, with ?format=ndjson, one record per
+    line. The records are in the order they
+    were created, limit at most, and the page
+    following the after cursor. The url of the
+    next page is in the Link header, and in
+    the next member of JSON pages.
+    :param request:
+    :param resource:
+    :return:
+    """
+    try:
+        resource = RESOURCES[resource]
+    except KeyError:
+        raise Http404('No resource {!r}'.format(resource))
+    output = request.GET.get('format', 'json')
+    if output not in FORMATS:
+        return HttpResponseBadRequest(
+            'The format must be json or ndjson'
+        )
+    try:
+        limit = _get_limit(request)
+        after = request.GET.get('after')
+        after = decode_cursor(after) if after else None
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    queryset = resource.get_queryset(request).order_by('pk')
+    # the rows are read while the response is
+    # sent, after the middleware returned, so
+    # the database is chosen now, see core.routers
+    queryset = queryset.using(queryset.db)
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after)
+    # the last row of the page, and the next
+    # one if there is a next page
+    bounds = list(queryset.values_list('pk', flat=True)[limit - 1:limit + 1])
+    next_url = None
+    if bounds:
+        queryset = queryset.filter(pk__lte=bounds[0])
+    if len(bounds) > 1:
+        params = request.GET.copy()
+        params['after'] = encode_cursor(bounds[0])
+        next_url = request.build_absolute_uri(
+            '{}?{}'.format(request.path, params.urlencode())
+        )
+    records = resource.records(
+        queryset, resource.get_fields(request),
+        getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    )
+    if output == 'ndjson':
+        content = _ndjson(records)
+    else:
+        content = _json(records, next_url)
+    response = StreamingHttpResponse(
+        content, content_type=FORMATS[output]
+    )
+    if next_url is not None:
+        response['Link'] = '<{}>; rel="next"'.format(next_url)
+    return response
@@ -0,0 +1,33 @@
+from django.contrib import admin, messages
+
+from .models import DeadMail, QueuedMail
+from .queue import requeue
+
+
+@admin.register(QueuedMail)
+class QueuedMailAdmin(admin.ModelAdmin):
+    list_display = (
+        '__str__', 'status', 'attempts', 'error_code', 'next_attempt'
+    )
+    list_filter = ('status', 'error_code')
+    readonly_fields = ('created',)
+
+
+@admin.register(DeadMail)
+class DeadMailAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'attempts', 'error_code', 'died')
+    list_filter = ('error_code',)
+    readonly_fields = ('created', 'died')
+    actions = ['requeue']
+
+    def requeue(self, request, queryset):
+        """
+        Action to put the selected mail
+        back in the queue.
+        """
+        count = requeue(queryset)
+        self.message_user(
+            request, '{} mail queued again.'.format(count),
+            messages.SUCCESS
+        )
+    requeue.short_description = 'Queue the selected mail again'
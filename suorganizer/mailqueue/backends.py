@@ -0,0 +1,139 @@
+"""
+Email backends of the mail queue
+"""
+from smtplib import (
+    SMTPException, SMTPResponseException, SMTPServerDisconnected
+)
+
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.smtp import EmailBackend
+from django.core.mail.message import sanitize_address
+
+from .queue import enqueue
+from .smtp import pool
+
+
+class QueueBackend(BaseEmailBackend):
+    """
+    Email backend storing the messages in
+    the mail queue, sent later by the
+    send_queued_mail command. A message
+    with invalid headers raises
+    BadHeaderError at once, as it would
+    with the backend actually sending it.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        try:
+            return enqueue(email_messages)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+
+
+def _is_disconnect(error):
+    # 421 is the server closing the connection
+    return isinstance(error, SMTPServerDisconnected) or (
+        isinstance(error, SMTPResponseException)
+        and error.smtp_code == 421
+    )
+
+
+class PooledSMTPBackend(EmailBackend):
+    """
+    SMTP email backend taking its connection
+    from the pool of smtp.py and giving it
+    back when closed, instead of logging in
+    and out for every batch of messages.
+    A message interrupted by the server
+    closing the connection is sent again
+    over a new one.
+    """
+
+    @property
+    def pool_key(self):
+        return (
+            self.host, self.port, self.username,
+            self.use_tls, self.use_ssl
+        )
+
+    def _connect(self):
+        # errors are handled by open()
+        fail_silently, self.fail_silently = self.fail_silently, False
+        try:
+            super().open()
+        except BaseException:
+            # a connection failing to log in is
+            # left open by the base class
+            if self.connection is not None:
+                connection, self.connection = self.connection, None
+                connection.close()
+            raise
+        finally:
+            self.fail_silently = fail_silently
+        connection, self.connection = self.connection, None
+        return connection
+
+    def open(self):
+        if self.connection:
+            return False
+        try:
+            self.connection = pool.acquire(
+                self.pool_key, self._connect, self.timeout
+            )
+        except (SMTPException, OSError):
+            if not self.fail_silently:
+                raise
+            return None
+        return True
+
+    def close(self):
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        pool.release(self.pool_key, connection)
+
+    def _reconnect(self):
+        connection, self.connection = self.connection, None
+        pool.discard(self.pool_key, connection)
+        self.connection = pool.acquire(
+            self.pool_key, self._connect, self.timeout
+        )
+
+    def _send(self, email_message):
+        if not email_message.recipients():
+            return False
+        if self.connection is None and not self.open():
+            # the connection was discarded and
+            # could not be opened again
+            return False
+        encoding = email_message.encoding or settings.DEFAULT_CHARSET
+        from_email = sanitize_address(email_message.from_email, encoding)
+        recipients = [
+            sanitize_address(address, encoding)
+            for address in email_message.recipients()
+        ]
+        message = email_message.message()
+        data = message.as_bytes(linesep='\r\n')
+        try:
+            try:
+                self.connection.sendmail(from_email, recipients, data)
+            except SMTPException as error:
+                if not _is_disconnect(error):
+                    raise
+                pool.stats['resent'] += 1
+                self._reconnect()
+                self.connection.sendmail(from_email, recipients, data)
+        except (SMTPException, OSError) as error:
+            if _is_disconnect(error) and self.connection is not None:
+                # do not give a dead connection back
+                connection, self.connection = self.connection, None
+                pool.discard(self.pool_key, connection)
+            if not self.fail_silently:
+                raise
+            return False
+        return True
@@ -0,0 +1,58 @@
+"""
+Command to send the outbound mail queue
+"""
+import time
+
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+
+from mailqueue.queue import send_queued
+from mailqueue.smtp import pool_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Send the mail queued by the QueueBackend, '
+        'once or, with --loop, as a worker polling '
+        'the queue.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of mails sent over one connection.'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the queue.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait when the queue is empty.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total_sent = total_failed = 0
+        try:
+            while True:
+                close_old_connections()
+                sent, failed = send_queued(batch_size)
+                total_sent += sent
+                total_failed += failed
+                if sent + failed < batch_size:
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(
+            '{} mail sent, {} failed.'.format(total_sent, total_failed)
+        )
+        if options['verbosity'] > 1:
+            self.stdout.write('SMTP pool: {}'.format(pool_stats()))
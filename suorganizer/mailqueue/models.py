@@ -0,0 +1,79 @@
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedMail(models.Model):
+    """
+    An email waiting to be sent by the
+    send_queued_mail worker. message holds
+    the serialised EmailMessage, see
+    queue.serialize_message. Sent mails are
+    deleted, mails failing more than
+    MAILQUEUE_MAX_ATTEMPTS times are moved
+    to the DeadMail table.
+    """
+    QUEUED = 'queued'
+    RETRYING = 'retrying'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RETRYING, 'Retrying'),
+    )
+    message = models.JSONField()
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED
+    )
+    # The error codes of users.mixins,
+    # for the last failed attempt.
+    error_code = models.CharField(
+        max_length=20,
+        blank=True
+    )
+    last_error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # When the mail may be sent next, pushed
+    # back while a worker is sending it and
+    # after each failed attempt.
+    next_attempt = models.DateTimeField(
+        default=timezone.now,
+        db_index=True
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return '{} to {}'.format(
+            self.message.get('subject'),
+            ', '.join(self.message.get('to', []))
+        )
+
+    class Meta:
+        ordering = ['next_attempt', 'pk']
+        verbose_name_plural = 'queued mail'
+
+
+class DeadMail(models.Model):
+    """
+    An email which could not be sent,
+    kept for inspection. It can be put
+    back in the queue from the admin.
+    """
+    message = models.JSONField()
+    error_code = models.CharField(
+        max_length=20,
+        blank=True
+    )
+    last_error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created = models.DateTimeField()
+    died = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return '{} to {}'.format(
+            self.message.get('subject'),
+            ', '.join(self.message.get('to', []))
+        )
+
+    class Meta:
+        ordering = ['-died']
+        verbose_name_plural = 'dead mail'
@@ -0,0 +1,286 @@
+"""
+Outbound mail queue.
+
+Mail sent through the QueueBackend is stored
+in the QueuedMail table instead of being sent
+during the request, so that a slow or failing
+SMTP server does not hold up the web workers.
+The send_queued_mail command sends the queue
+in batches over one connection of the real
+backend, the MAILQUEUE_BACKEND setting,
+retries failed mail with an exponential
+backoff and moves mail failing more than
+MAILQUEUE_MAX_ATTEMPTS times to the DeadMail
+table.
+"""
+import base64
+import logging
+from datetime import timedelta
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.http import BadHeaderError
+from django.utils import timezone
+
+from .models import DeadMail, QueuedMail
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def serialize_message(message):
+    """
+    Function to turn an EmailMessage into a
+    dict which can be stored as JSON.
+    Building the MIME message first raises
+    BadHeaderError for invalid headers, as
+    sending it would.
+    :param message:
+    :return: dict
+    """
+    message.message()
+    attachments = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            raise ValueError(
+                'Only (filename, content, mimetype) '
+                'attachments can be queued.'
+            )
+        filename, content, mimetype = attachment
+        if isinstance(content, bytes):
+            attachments.append([
+                filename, base64.b64encode(content).decode('ascii'),
+                mimetype, True
+            ])
+        else:
+            attachments.append([filename, content, mimetype, False])
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': list(message.to),
+        'cc': list(message.cc),
+        'bcc': list(message.bcc),
+        'reply_to': list(message.reply_to),
+        'headers': message.extra_headers,
+        'alternatives': [
+            list(alternative)
+            for alternative in getattr(message, 'alternatives', [])
+        ],
+        'attachments': attachments,
+    }
+
+
+def deserialize_message(data, connection=None):
+    """
+    Function to rebuild the EmailMessage
+    stored by serialize_message.
+    :param data:
+    :param connection:
+    :return: EmailMultiAlternatives
+    """
+    attachments = [
+        (filename, base64.b64decode(content) if encoded else content,
+         mimetype)
+        for filename, content, mimetype, encoded in data['attachments']
+    ]
+    return EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(pair) for pair in data['alternatives']],
+        attachments=attachments,
+        connection=connection,
+    )
+
+
+def enqueue(messages):
+    """
+    Function to add messages to the queue,
+    skipping those without recipients.
+    :param messages: EmailMessage instances
+    :return: the number of messages queued
+    """
+    mails = [
+        QueuedMail(message=serialize_message(message))
+        for message in messages
+        if message.recipients()
+    ]
+    QueuedMail.objects.bulk_create(mails)
+    return len(mails)
+
+
+def error_code(error):
+    """
+    Function to return the error code of
+    users.mixins for an exception raised
+    while sending.
+    :param error:
+    :return:
+    """
+    if isinstance(error, BadHeaderError):
+        return 'badHeader'
+    if isinstance(error, SMTPException):
+        return 'smtperror'
+    return 'unexpectederror'
+
+
+def retry_delay(attempts):
+    """
+    Function to return how long to wait
+    before the next attempt, doubling after
+    each failed one.
+    :param attempts: number of failed attempts
+    :return: timedelta
+    """
+    delay = _setting('MAILQUEUE_RETRY_DELAY', 60) * 2 ** (attempts - 1)
+    return timedelta(
+        seconds=min(delay, _setting('MAILQUEUE_MAX_RETRY_DELAY', 3600))
+    )
+
+
+def claim(batch_size):
+    """
+    Function to take the next batch_size
+    mails due. Their next attempt is pushed
+    back by MAILQUEUE_LEASE seconds, so
+    other workers leave them alone, and
+    they are sent again after that if the
+    worker dies.
+    :param batch_size:
+    :return: list of QueuedMail
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        mails = list(
+            QueuedMail.objects.select_for_update(
+                skip_locked=True
+            ).filter(next_attempt__lte=now)[:batch_size]
+        )
+        QueuedMail.objects.filter(
+            pk__in=[mail.pk for mail in mails]
+        ).update(
+            next_attempt=now + timedelta(
+                seconds=_setting('MAILQUEUE_LEASE', 300)
+            )
+        )
+    return mails
+
+
+def fail(mail, code, error):
+    """
+    Function to record a failed attempt to
+    send mail, and move it to the dead
+    letter table once it failed too many
+    times, or at once if it can never be
+    sent.
+    :param mail:
+    :param code:
+    :param error:
+    :return: True if the mail is dead
+    """
+    mail.attempts += 1
+    mail.error_code = code
+    mail.last_error = error
+    if (code == 'badHeader'
+            or mail.attempts >= _setting('MAILQUEUE_MAX_ATTEMPTS', 5)):
+        with transaction.atomic():
+            DeadMail.objects.create(
+                message=mail.message,
+                error_code=mail.error_code,
+                last_error=mail.last_error,
+                attempts=mail.attempts,
+                created=mail.created,
+            )
+            mail.delete()
+        logger.error(
+            'Mail %s gave up after %s attempts: %s',
+            mail, mail.attempts, error
+        )
+        return True
+    mail.status = QueuedMail.RETRYING
+    mail.next_attempt = timezone.now() + retry_delay(mail.attempts)
+    mail.save(update_fields=[
+        'attempts', 'error_code', 'last_error',
+        'status', 'next_attempt'
+    ])
+    logger.warning(
+        'Mail %s failed, attempt %s: %s', mail, mail.attempts, error
+    )
+    return False
+
+
+def _close(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def send_queued(batch_size=100):
+    """
+    Function to send the next batch of mail
+    due, over a single connection of the
+    MAILQUEUE_BACKEND backend, reopened
+    after an error.
+    :param batch_size:
+    :return: (number sent, number failed)
+    """
+    mails = claim(batch_size)
+    if not mails:
+        return 0, 0
+    connection = get_connection(
+        backend=_setting(
+            'MAILQUEUE_BACKEND',
+            'django.core.mail.backends.smtp.EmailBackend'
+        )
+    )
+    sent = []
+    failed = 0
+    try:
+        for mail in mails:
+            try:
+                connection.open()
+                message = deserialize_message(mail.message, connection)
+                number_sent = connection.send_messages([message])
+            except Exception as error:
+                _close(connection)
+                failed += 1
+                fail(mail, error_code(error), '{}: {}'.format(
+                    error.__class__.__name__, error
+                ))
+            else:
+                if number_sent:
+                    sent.append(mail.pk)
+                else:
+                    failed += 1
+                    fail(mail, 'unknownerror', 'Nothing was sent.')
+    finally:
+        _close(connection)
+        QueuedMail.objects.filter(pk__in=sent).delete()
+    return len(sent), failed
+
+
+def requeue(dead_mails):
+    """
+    Function to put dead mail back in the
+    queue, with its attempts reset.
+    :param dead_mails: DeadMail queryset
+    :return: the number of mails queued
+    """
+    with transaction.atomic():
+        mails = QueuedMail.objects.bulk_create(
+            QueuedMail(message=dead.message) for dead in dead_mails
+        )
+        dead_mails.delete()
+    return len(mails)
@@ -0,0 +1,167 @@
+"""
+SMTP connection pool.
+
+Opening an SMTP connection costs several round
+trips, more with STARTTLS and login, for every
+mail sent through the default backend. The pool
+keeps up to MAILQUEUE_SMTP_POOL_SIZE connections
+per server and account open in each process, to
+be reused by the PooledSMTPBackend.
+
+An idle connection is closed once it has been
+idle for MAILQUEUE_SMTP_POOL_IDLE seconds, as
+servers drop them anyway, and is checked with a
+NOOP before reuse when it has been idle for more
+than MAILQUEUE_SMTP_POOL_CHECK seconds.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from smtplib import SMTPException
+
+from django.conf import settings
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _quit(connection):
+    try:
+        connection.quit()
+    except (SMTPException, OSError):
+        connection.close()
+
+
+class SMTPPool:
+    """
+    Pool of open SMTP connections, by key.
+    At most size connections of a key are
+    open at once, idle or in use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+        self._pid = os.getpid()
+        self.stats = Counter()
+
+    def _check_fork(self):
+        # connections opened before a fork belong
+        # to the parent process
+        if self._pid != os.getpid():
+            self._idle = {}
+            self._slots = {}
+            self._pid = os.getpid()
+            self.stats = Counter()
+
+    def _get_slots(self, key):
+        with self._lock:
+            self._check_fork()
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(
+                    _setting('MAILQUEUE_SMTP_POOL_SIZE', 4)
+                )
+            return self._slots[key]
+
+    def _pop_idle(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else (None, None)
+
+    def _usable(self, connection, released):
+        idle = time.monotonic() - released
+        if idle > _setting('MAILQUEUE_SMTP_POOL_IDLE', 60):
+            return False
+        if idle > _setting('MAILQUEUE_SMTP_POOL_CHECK', 10):
+            try:
+                return connection.noop()[0] == 250
+            except (SMTPException, OSError):
+                return False
+        return True
+
+    def acquire(self, key, connect, timeout=None):
+        """
+        Method to take a connection of key,
+        an idle one if any is usable or a new
+        one opened by connect, waiting up to
+        timeout seconds for a slot if size
+        connections are already in use.
+        :param key:
+        :param connect: function returning a connection
+        :param timeout:
+        :return: connection
+        """
+        slots = self._get_slots(key)
+        if not slots.acquire(timeout=timeout):
+            raise SMTPException(
+                'No SMTP connection available in the pool.'
+            )
+        try:
+            while True:
+                connection, released = self._pop_idle(key)
+                if connection is None:
+                    break
+                if self._usable(connection, released):
+                    self.stats['reused'] += 1
+                    return connection
+                self.stats['expired'] += 1
+                _quit(connection)
+            connection = connect()
+            self.stats['created'] += 1
+            return connection
+        except BaseException:
+            slots.release()
+            raise
+
+    def release(self, key, connection):
+        """
+        Method to give a connection of key
+        back to the pool.
+        :param key:
+        :param connection:
+        :return:
+        """
+        with self._lock:
+            self._idle.setdefault(key, []).append(
+                (connection, time.monotonic())
+            )
+        self._get_slots(key).release()
+
+    def discard(self, key, connection):
+        """
+        Method to close a connection of key
+        which can no longer be used.
+        :param key:
+        :param connection:
+        :return:
+        """
+        self.stats['discarded'] += 1
+        try:
+            connection.close()
+        finally:
+            self._get_slots(key).release()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection, released in connections:
+                _quit(connection)
+
+
+pool = SMTPPool()
+
+
+def pool_stats():
+    """
+    Function to return the counters of the
+    pool of this process: connections
+    created, reused, expired while idle,
+    discarded after an error, and the
+    messages resent after a disconnection.
+    :return: dict
+    """
+    return dict(pool.stats)
@@ -0,0 +1,135 @@
+import socket
+from smtplib import SMTPNotSupportedError
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.handlers import Message
+from django.core.mail import EmailMessage
+from django.test import TestCase, override_settings
+
+from .backends import PooledSMTPBackend
+from .models import QueuedMail
+from .queue import enqueue, send_queued
+from .smtp import pool
+
+
+class Inbox(Message):
+    """
+    aiosmtpd handler keeping the messages
+    the server received.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def handle_message(self, message):
+        self.messages.append(message)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class SMTPServerMixin:
+    """
+    Mixin for test cases, running an SMTP
+    server on localhost during each test,
+    with the settings of the backends
+    pointing at it.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.inbox = Inbox()
+        self.server = Controller(
+            self.inbox, hostname='127.0.0.1', port=_free_port()
+        )
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        settings = override_settings(
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.server.port,
+            EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            EMAIL_USE_TLS=False, EMAIL_USE_SSL=False,
+            MAILQUEUE_BACKEND='mailqueue.backends.PooledSMTPBackend',
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        pool.close_all()
+        pool.stats.clear()
+        self.addCleanup(pool.close_all)
+
+    def message(self, subject='Hello'):
+        return EmailMessage(
+            subject, 'A message.', 'site@example.com', ['reader@example.com']
+        )
+
+    def subjects(self):
+        return [message['Subject'] for message in self.inbox.messages]
+
+
+class PooledSMTPBackendTest(SMTPServerMixin, TestCase):
+    """
+    Tests of the pooled SMTP backend,
+    see backends.py and smtp.py.
+    """
+
+    def test_connection_is_reused(self):
+        for subject in ('First', 'Second'):
+            self.assertEqual(
+                PooledSMTPBackend().send_messages([self.message(subject)]), 1
+            )
+        self.assertEqual(self.subjects(), ['First', 'Second'])
+        self.assertEqual(pool.stats['created'], 1)
+        self.assertEqual(pool.stats['reused'], 1)
+
+    def test_message_is_resent_after_disconnection(self):
+        PooledSMTPBackend().send_messages([self.message('First')])
+        # the idle connection is dropped, as
+        # servers do after a while
+        connection, released = pool._idle[PooledSMTPBackend().pool_key][0]
+        connection.sock.shutdown(socket.SHUT_RDWR)
+        self.assertEqual(
+            PooledSMTPBackend().send_messages([self.message('Second')]), 1
+        )
+        self.assertEqual(self.subjects(), ['First', 'Second'])
+        self.assertEqual(pool.stats['resent'], 1)
+        self.assertEqual(pool.stats['discarded'], 1)
+
+    def test_open_fails_silently_on_smtp_error(self):
+        # the server offers no AUTH without TLS
+        backend = PooledSMTPBackend(
+            username='user', password='secret', fail_silently=True
+        )
+        self.assertIsNone(backend.open())
+        self.assertEqual(backend.send_messages([self.message()]), 0)
+        self.assertEqual(self.inbox.messages, [])
+
+    def test_open_raises_smtp_error(self):
+        backend = PooledSMTPBackend(username='user', password='secret')
+        with self.assertRaises(SMTPNotSupportedError):
+            backend.open()
+        self.assertIsNone(backend.connection)
+
+
+class SendQueuedTest(SMTPServerMixin, TestCase):
+    """
+    Tests of sending the mail queue,
+    see queue.py.
+    """
+
+    def test_queued_mail_is_sent(self):
+        enqueue([self.message('First'), self.message('Second')])
+        self.assertEqual(send_queued(), (2, 0))
+        self.assertEqual(sorted(self.subjects()), ['First', 'Second'])
+        self.assertFalse(QueuedMail.objects.exists())
+
+    def test_mail_is_retried_when_the_server_is_down(self):
+        enqueue([self.message()])
+        with override_settings(EMAIL_PORT=_free_port()), \
+                self.assertLogs('mailqueue.queue', 'WARNING'):
+            self.assertEqual(send_queued(), (0, 1))
+        mail = QueuedMail.objects.get()
+        self.assertEqual(mail.attempts, 1)
+        self.assertEqual(mail.status, QueuedMail.RETRYING)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class OrganizersConfig(AppConfig):
     name = 'organizers'
+
+    def ready(self):
+        import organizers.signals
@@ -0,0 +1,87 @@
+"""
+States of the organizers resources for
+conditional GET, see core.conditional.
+
+Each function computes, with one query, the
+last modification of everything a page shows
+and adds the fragment version of the object,
+which changes when a related object is
+removed, something no remaining timestamp
+can tell.
+"""
+from datetime import date
+
+from core.conditional import latest, latest_subquery
+from core.fragments import get_version
+
+from .models import NewsLink, Startup, Tag
+
+
+def _published_posts(through):
+    # the posts listed by published_posts
+    return through.objects.filter(post__pub_date__lt=date.today())
+
+
+def tag_state(**lookup):
+    """
+    Function to return the state of the
+    detail page of the tag matching lookup,
+    which shows its startups and its
+    published posts.
+    :param lookup:
+    :return: (last_modified, parts) or None
+    """
+    posts = _published_posts(Tag.blog_posts.through)
+    row = Tag.objects.filter(**lookup).annotate(
+        startups_modified=latest_subquery(
+            Startup.tags.through.objects.all(), 'tag',
+            'startup__modified'
+        ),
+        posts_modified=latest_subquery(posts, 'tag', 'post__modified'),
+        posts_published=latest_subquery(posts, 'tag', 'post__pub_date'),
+    ).values_list(
+        'pk', 'modified', 'startups_modified',
+        'posts_modified', 'posts_published'
+    ).first()
+    if row is None:
+        return None
+    pk, *dates = row
+    return latest(*dates), [get_version(Tag, pk)]
+
+
+def startup_state(**lookup):
+    """
+    Function to return the state of the
+    detail page of the startup matching
+    lookup, which shows its tags, its
+    newslinks and its published posts.
+    :param lookup:
+    :return: (last_modified, parts) or None
+    """
+    posts = _published_posts(Startup.blog_posts.through)
+    row = Startup.objects.filter(**lookup).annotate(
+        tags_modified=latest_subquery(
+            Startup.tags.through.objects.all(), 'startup',
+            'tag__modified'
+        ),
+        newslinks_modified=latest_subquery(
+            NewsLink.objects.all(), 'startup', 'modified'
+        ),
+        newslinks_published=latest_subquery(
+            NewsLink.objects.all(), 'startup', 'pub_date'
+        ),
+        posts_modified=latest_subquery(
+            posts, 'startup', 'post__modified'
+        ),
+        posts_published=latest_subquery(
+            posts, 'startup', 'post__pub_date'
+        ),
+    ).values_list(
+        'pk', 'modified', 'tags_modified', 'newslinks_modified',
+        'newslinks_published', 'posts_modified', 'posts_published'
+    ).first()
+    if row is None:
+        return None
+    pk, *dates = row
+    return latest(*dates), [get_version(Startup, pk)]
+
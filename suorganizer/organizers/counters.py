@@ -0,0 +1,145 @@
+"""
+Module maintaining the denormalized counters
+on Tag and Startup.
+
+Instead of counting related rows every time a
+list or detail page is rendered, the counts
+are stored on the objects themselves and
+recomputed by the signal handlers whenever a
+relation changes. Each function recounts a set
+of objects with a single UPDATE using
+correlated subqueries, so the counts are always
+computed by the database from the actual rows
+and never drift by being incremented.
+Published post counts depend on today's date,
+run the recount management command once a day
+to pick up posts published in the future.
+QuerySet.update() sends no post_save, so the
+functions forget the recounted objects from
+the object cache themselves, see
+core.objectcache.
+"""
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.fragments import m2m_changed_pks
+from core.objectcache import forget, object_key
+
+from .models import NewsLink, Startup, Tag
+
+
+def _count(queryset, field_name):
+    """
+    Function to build a subquery counting
+    the rows of queryset that reference the
+    outer object through field_name.
+    :param queryset:
+    :param field_name:
+    :return:
+    """
+    subquery = queryset.filter(
+        **{field_name: OuterRef('pk')}
+    ).order_by().values(field_name).annotate(
+        count=Count('pk')
+    ).values('count')
+    return Coalesce(
+        Subquery(subquery, output_field=IntegerField()), 0
+    )
+
+
+def _forget(queryset):
+    """
+    Function to forget the cached objects
+    of the tags or startups of queryset.
+    :param queryset:
+    :return:
+    """
+    forget(
+        object_key(queryset.model, slug)
+        for slug in queryset.values_list('slug', flat=True).iterator()
+    )
+
+
+def update_tag_counts(pks=None):
+    """
+    Function to recount startup_count and
+    published_post_count of the tags in pks.
+    Every tag is recounted when pks is None.
+    :param pks:
+    :return: number of tags updated
+    """
+    tags = Tag.objects.all()
+    if pks is not None:
+        tags = tags.filter(pk__in=pks)
+    # counted as listed by Tag.published_posts
+    post_tags = Tag.blog_posts.through.objects.filter(
+        post__pub_date__lt=date.today()
+    )
+    updated = tags.update(
+        startup_count=_count(
+            Startup.tags.through.objects.all(), 'tag_id'
+        ),
+        published_post_count=_count(post_tags, 'tag_id'),
+    )
+    _forget(tags)
+    return updated
+
+
+def update_startup_counts(pks=None):
+    """
+    Function to recount newslink_count and
+    published_post_count of the startups in
+    pks. Every startup is recounted when pks
+    is None.
+    :param pks:
+    :return: number of startups updated
+    """
+    startups = Startup.objects.all()
+    if pks is not None:
+        startups = startups.filter(pk__in=pks)
+    # counted as listed by Startup.published_posts
+    post_startups = Startup.blog_posts.through.objects.filter(
+        post__pub_date__lt=date.today()
+    )
+    updated = startups.update(
+        newslink_count=_count(
+            NewsLink.objects.all(), 'startup_id'
+        ),
+        published_post_count=_count(post_startups, 'startup_id'),
+    )
+    _forget(startups)
+    return updated
+
+
+def update_m2m_counts(update, counted_model, sender, instance,
+                     action, model, pk_set):
+    """
+    Function to recount the objects of
+    counted_model affected by an m2m_changed
+    signal, whichever side of the relation
+    the change was made from.
+    On clear the rows are removed after the
+    signal is sent, so the recount is run
+    once the transaction commits.
+    :param update: update_tag_counts or update_startup_counts
+    :param counted_model:
+    :param sender:
+    :param instance:
+    :param action:
+    :param model:
+    :param pk_set:
+    :return:
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if isinstance(instance, counted_model):
+        pks = [instance.pk]
+    else:
+        pks = m2m_changed_pks(sender, instance, model, action, pk_set)
+    if action == 'pre_clear':
+        transaction.on_commit(lambda: update(pks))
+    else:
+        update(pks)
@@ -0,0 +1,136 @@
+"""
+Streaming dumper for tags, startups, newslinks
+and posts, the counterpart of the importer.
+
+Records are written in the fixture format, one
+JSON object per line, with natural keys instead
+of primary keys, as dumpdata does with
+--natural-foreign and --natural-primary:
+
+    {"model": "organizers.newslink", "fields":
+     {"title": ..., "startup": ["a-startup"]}}
+
+dumpdata builds every object and serializes its
+relations one query per object. The dumper
+reads the fields and the natural keys of the
+foreign keys with values_list() instead, chunk
+by chunk with .iterator(), and the m2m natural
+keys of a chunk with one query per relation,
+so memory does not grow with the number of
+rows. The output is read back by the importer,
+which resolves the natural keys in batches too.
+"""
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .importer import Importer
+
+
+def key_fields(label):
+    """
+    Function to return the fields of the
+    natural key of the model label.
+    :param label:
+    :return: tuple
+    """
+    if label == 'users.user':
+        return (get_user_model().USERNAME_FIELD,)
+    return Importer.specs[label].key_fields
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def many_to_many_keys(model, field, related, pks):
+    """
+    Function to return the natural keys of
+    the objects related to the rows of pks
+    by the m2m field.
+    :param model:
+    :param field:
+    :param related: label of the related model
+    :param pks:
+    :return: dict of lists of keys, by pk
+    """
+    m2m_field = model._meta.get_field(field)
+    source = m2m_field.m2m_field_name()
+    target = m2m_field.m2m_reverse_field_name()
+    paths = [
+        '{}__{}'.format(target, name) for name in key_fields(related)
+    ]
+    rows = m2m_field.remote_field.through.objects.filter(**{
+        '{}_id__in'.format(source): pks
+    }).order_by(*paths).values_list('{}_id'.format(source), *paths)
+    keys = {}
+    for pk, *key in rows:
+        keys.setdefault(pk, []).append(key)
+    return keys
+
+
+def dump_records(label, chunk_size=2000):
+    """
+    Generator returning the records of every
+    object of the model label, in the order
+    they were created.
+    :param label: e.g. 'organizers.tag'
+    :param chunk_size: rows read at a time
+    :return: dicts in the fixture format
+    """
+    spec = Importer.specs[label]
+    foreign_keys = [
+        (field, [
+            '{}__{}'.format(field, name) for name in key_fields(related)
+        ])
+        for field, related in spec.foreign_keys.items()
+    ]
+    paths = list(spec.fields)
+    for field, key_paths in foreign_keys:
+        paths.extend(key_paths)
+    rows = spec.model.objects.order_by('pk').values_list(
+        'pk', *paths
+    ).iterator(chunk_size=chunk_size)
+    for chunk in _chunks(rows, chunk_size):
+        pks = [row[0] for row in chunk]
+        many = {
+            field: many_to_many_keys(spec.model, field, related, pks)
+            for field, related in spec.many_to_many.items()
+        }
+        for pk, *values in chunk:
+            fields = dict(zip(spec.fields, values))
+            position = len(spec.fields)
+            for field, key_paths in foreign_keys:
+                fields[field] = values[position:position + len(key_paths)]
+                position += len(key_paths)
+            for field, keys in many.items():
+                fields[field] = keys.get(pk, [])
+            yield {'model': label, 'fields': fields}
+
+
+def write_jsonl(stream, labels, chunk_size=2000):
+    """
+    Function to write the records of the
+    models labels to stream, one per line.
+    :param stream: text stream
+    :param labels:
+    :param chunk_size:
+    :return: number of records written, by label
+    """
+    counts = {}
+    for label in labels:
+        counts[label] = 0
+        for record in dump_records(label, chunk_size):
+            stream.write(json.dumps(
+                record, cls=DjangoJSONEncoder, separators=(',', ':')
+            ))
+            stream.write('\n')
+            counts[label] += 1
+    return counts
@@ -0,0 +1,520 @@
+"""
+Streaming bulk importer for tags, startups,
+newslinks and posts.
+
+Records are read one at a time and written in
+batches: every batch resolves all the natural
+keys it references with one query per model,
+inserts new rows with bulk_create, updates
+existing rows with bulk_update and adds the
+m2m rows straight into the through tables.
+Each batch is committed on its own, so memory
+use does not grow with the size of the input.
+
+Relations are given by natural key, as in
+fixtures dumped with --natural-foreign:
+a tag or startup by its slug, a user by its
+email. Slugs are lowercased as they are read,
+as LowercaseSlugField.pre_save would on save.
+bulk_create doesn't send signals, so the
+importer recounts the counters of the tags and
+startups, and the archive months, touched by
+the records itself when it is done.
+"""
+import csv
+import json
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from blogs.archive import update_archive
+from blogs.models import Post
+from blogs.tagging import propagate_startup_tags
+from core.fields import LowercaseSlugField
+
+from .counters import update_startup_counts, update_tag_counts
+from .models import NewsLink, Startup, Tag
+
+
+def normalize_key(value):
+    """
+    Function to turn a natural key, as found
+    in the input or read from the database,
+    into a tuple of strings, so keys compare
+    equal whatever their source. A single
+    item list, as dumped by django for a
+    one field natural key, is unpacked.
+    :param value:
+    :return: tuple
+    """
+    if not isinstance(value, (list, tuple)):
+        value = (value,)
+    return tuple(str(item) for item in value)
+
+
+def lowercase(value):
+    """
+    Function to lowercase a slug, or the
+    slugs of a list.
+    :param value:
+    :return:
+    """
+    if isinstance(value, (list, tuple)):
+        return [lowercase(item) for item in value]
+    if isinstance(value, str):
+        return value.lower()
+    return value
+
+
+class NaturalKeyMap:
+    """
+    In memory map of natural key to primary
+    key for one model. Missing keys are
+    looked up in batches, one query for all
+    the keys a batch of records references,
+    instead of one get_by_natural_key() per
+    record. The map is emptied when it grows
+    past max_size, to keep memory bounded.
+    """
+    chunk_size = 200
+
+    def __init__(self, model, key_fields, max_size=100000):
+        self.model = model
+        self.key_fields = key_fields
+        self.max_size = max_size
+        self.pks = {}
+
+    def _filter(self, keys):
+        if len(self.key_fields) == 1:
+            return Q(**{
+                '{}__in'.format(self.key_fields[0]):
+                    [key[0] for key in keys]
+            })
+        # keys sharing their leading fields are
+        # looked up with one IN on the last one
+        groups = {}
+        for key in keys:
+            groups.setdefault(key[:-1], []).append(key[-1])
+        query = Q()
+        for prefix, values in groups.items():
+            lookup = dict(zip(self.key_fields, prefix))
+            lookup['{}__in'.format(self.key_fields[-1])] = values
+            query |= Q(**lookup)
+        return query
+
+    def resolve(self, keys):
+        """
+        Method to load the primary keys of
+        every key not in the map yet.
+        Composite keys are looked up
+        chunk_size at a time, as databases
+        limit the depth of a WHERE clause.
+        :param keys: iterable of normalized keys
+        :return:
+        """
+        missing = list({key for key in keys if key not in self.pks})
+        if not missing:
+            return
+        if len(self.pks) + len(missing) > self.max_size:
+            self.pks.clear()
+        step = len(missing) if len(self.key_fields) == 1 else self.chunk_size
+        for start in range(0, len(missing), step):
+            rows = self.model.objects.filter(
+                self._filter(missing[start:start + step])
+            ).values_list('pk', *self.key_fields)
+            for pk, *key in rows.iterator():
+                self.pks[normalize_key(key)] = pk
+
+    def get(self, key):
+        return self.pks.get(key)
+
+    def add(self, key, pk):
+        self.pks[key] = pk
+
+
+class ModelSpec:
+    """
+    Describes how the records of a model
+    are imported: the fields forming its
+    natural key, the fields copied as they
+    are, its foreign keys and its m2m fields,
+    each given as field name and the model
+    label of the related natural key map.
+    """
+
+    def __init__(self, model, key_fields, fields,
+                 foreign_keys=(), many_to_many=()):
+        self.model = model
+        self.key_fields = key_fields
+        self.fields = fields
+        self.foreign_keys = dict(foreign_keys)
+        self.many_to_many = dict(many_to_many)
+
+    def key(self, record):
+        return normalize_key([
+            record.get(field.split('__')[0])
+            for field in self.key_fields
+        ])
+
+    def slug_fields(self):
+        return [
+            field for field in self.fields
+            if isinstance(self.model._meta.get_field(field),
+                          LowercaseSlugField)
+        ]
+
+
+class Importer:
+    """
+    Class importing a stream of (model label,
+    fields) records, batch_size records at a
+    time.
+    """
+    # counters recounted at once, see recount()
+    recount_chunk_size = 500
+    specs = OrderedDict((
+        ('organizers.tag', ModelSpec(
+            Tag, ('slug',), ('name', 'slug'),
+        )),
+        ('organizers.startup', ModelSpec(
+            Startup, ('slug',),
+            ('name', 'slug', 'description', 'founded_date',
+             'contact', 'website'),
+            many_to_many=(('tags', 'organizers.tag'),),
+        )),
+        ('organizers.newslink', ModelSpec(
+            NewsLink, ('startup__slug', 'slug'),
+            ('title', 'slug', 'pub_date', 'link'),
+            foreign_keys=(('startup', 'organizers.startup'),),
+        )),
+        ('blogs.post', ModelSpec(
+            Post, ('pub_date', 'slug'),
+            ('title', 'slug', 'text', 'pub_date'),
+            foreign_keys=(('author', 'users.user'),),
+            many_to_many=(('tags', 'organizers.tag'),
+                          ('startups', 'organizers.startup')),
+        )),
+    ))
+
+    def __init__(self, batch_size=1000, stderr=None):
+        self.batch_size = batch_size
+        self.stderr = stderr
+        user = get_user_model()
+        self.maps = {
+            label: NaturalKeyMap(spec.model, spec.key_fields)
+            for label, spec in self.specs.items()
+        }
+        self.maps['users.user'] = NaturalKeyMap(
+            user, (user.USERNAME_FIELD,)
+        )
+        self.created = dict.fromkeys(self.specs, 0)
+        self.updated = dict.fromkeys(self.specs, 0)
+        self.skipped = dict.fromkeys(self.specs, 0)
+        # pks of the tags and startups whose
+        # counters the records changed, and
+        # the months of the imported posts
+        self.touched = {
+            'organizers.tag': set(), 'organizers.startup': set()
+        }
+        self.months = set()
+
+    def run(self, records):
+        """
+        Method to import every record,
+        grouping consecutive records of the
+        same model into batches.
+        :param records: iterable of (label, fields)
+        :return:
+        """
+        batch = []
+        batch_label = None
+        for label, fields in records:
+            label = label.lower()
+            if label not in self.specs:
+                raise ValueError(
+                    'Cannot import records of {}'.format(label)
+                )
+            if batch and (label != batch_label
+                          or len(batch) >= self.batch_size):
+                self.import_batch(batch_label, batch)
+                batch = []
+            batch_label = label
+            batch.append(self.lowercase_slugs(label, fields))
+        if batch:
+            self.import_batch(batch_label, batch)
+        self.recount()
+
+    def lowercase_slugs(self, label, fields):
+        """
+        Method to return a copy of the fields
+        of a record with its slugs lowercased,
+        and the slugs it references. The slugs
+        would be saved lowercased, but bulk_update
+        skips pre_save, and they are looked up
+        as they are in the natural key maps.
+        :param label:
+        :param fields:
+        :return: dict
+        """
+        spec = self.specs[label]
+        fields = dict(fields)
+        references = dict(spec.foreign_keys, **spec.many_to_many)
+        for field in spec.slug_fields() + [
+                field for field, related in references.items()
+                if self.is_slug_key(related)]:
+            if field in fields:
+                fields[field] = lowercase(fields[field])
+        return fields
+
+    def is_slug_key(self, label):
+        spec = self.specs.get(label)
+        return spec is not None and spec.key_fields == ('slug',)
+
+    def recount(self):
+        """
+        Method to recount the counters of the
+        tags and startups, and the archive
+        months, touched by the records, a
+        chunk of rows at a time, leaving the
+        rest of the tables alone.
+        :return:
+        """
+        for update, label in ((update_tag_counts, 'organizers.tag'),
+                              (update_startup_counts,
+                               'organizers.startup')):
+            pks = sorted(self.touched[label])
+            for start in range(0, len(pks), self.recount_chunk_size):
+                update(pks[start:start + self.recount_chunk_size])
+        update_archive(self.months)
+
+    def warn(self, message):
+        if self.stderr is not None:
+            self.stderr.write(message)
+
+    def skip(self, label, record, reason):
+        self.skipped[label] += 1
+        self.warn('Skipped {} {}: {}'.format(label, record, reason))
+
+    def import_batch(self, label, records):
+        """
+        Method to import one batch of records
+        of a model in its own transaction.
+        :param label:
+        :param records:
+        :return:
+        """
+        spec = self.specs[label]
+        own_map = self.maps[label]
+        for field, related in spec.foreign_keys.items():
+            self.maps[related].resolve(
+                normalize_key(record.get(field)) for record in records
+            )
+        for field, related in spec.many_to_many.items():
+            self.maps[related].resolve(
+                normalize_key(value) for record in records
+                for value in record.get(field) or ()
+            )
+        own_map.resolve(spec.key(record) for record in records)
+
+        # the last record with a key wins
+        objects = OrderedDict()
+        for record in records:
+            obj = spec.model(**{
+                field: record.get(field) for field in spec.fields
+            })
+            missing = False
+            for field, related in spec.foreign_keys.items():
+                pk = self.maps[related].get(
+                    normalize_key(record.get(field))
+                )
+                if pk is None:
+                    self.skip(label, record, 'unknown {}'.format(field))
+                    missing = True
+                    break
+                setattr(obj, '{}_id'.format(field), pk)
+            if missing:
+                continue
+            key = spec.key(record)
+            obj.pk = own_map.get(key)
+            objects[key] = (obj, record)
+
+        new = [obj for obj, record in objects.values() if obj.pk is None]
+        old = [obj for obj, record in objects.values() if obj.pk is not None]
+        with transaction.atomic():
+            if old:
+                # bulk_update doesn't set auto_now fields
+                now = timezone.now()
+                for obj in old:
+                    obj.modified = now
+                spec.model.objects.bulk_update(
+                    old,
+                    spec.fields + tuple(spec.foreign_keys) + ('modified',),
+                    batch_size=self.batch_size
+                )
+            if new:
+                self.bulk_insert(spec.model, new)
+            for key, (obj, record) in objects.items():
+                own_map.add(key, obj.pk)
+            pks = [obj.pk for obj, record in objects.values()]
+            self.touch(label, pks)
+            for field, related in spec.foreign_keys.items():
+                self.touch(related, (
+                    getattr(obj, '{}_id'.format(field))
+                    for obj, record in objects.values()
+                ))
+            for field, related in spec.many_to_many.items():
+                self.touch(related, self.add_many_to_many(
+                    label, spec.model, field, related, objects.items()
+                ))
+            if spec.model is Post:
+                # as the assign_extra_tags signal would
+                propagate_startup_tags(post_pks=pks)
+                self.touch('organizers.tag', Post.tags.through.objects.filter(
+                    post_id__in=pks
+                ).values_list('tag_id', flat=True).distinct().iterator())
+                pub_date = Post._meta.get_field('pub_date')
+                self.months.update(
+                    pub_date.to_python(obj.pub_date)
+                    for obj, record in objects.values()
+                )
+        self.created[label] += len(new)
+        self.updated[label] += len(old)
+
+    def touch(self, label, pks):
+        if label in self.touched:
+            self.touched[label].update(pks)
+
+    def bulk_insert(self, model, objs):
+        """
+        Method to insert objs and set their
+        primary keys. Only some databases
+        return the keys from bulk_create, on
+        others the new rows are read back,
+        in insertion order, within the same
+        transaction.
+        The pub_date of posts is written again
+        afterwards, because auto_now_add
+        replaces it with today on insert.
+        :param model:
+        :param objs:
+        :return:
+        """
+        connection = connections[router.db_for_write(model)]
+        pub_dates = [getattr(obj, 'pub_date', None) for obj in objs]
+        if connection.features.can_return_rows_from_bulk_insert:
+            model.objects.bulk_create(objs, batch_size=self.batch_size)
+        else:
+            last_pk = model.objects.aggregate(
+                last_pk=Max('pk')
+            )['last_pk'] or 0
+            model.objects.bulk_create(objs, batch_size=self.batch_size)
+            pks = model.objects.filter(
+                pk__gt=last_pk
+            ).order_by('pk').values_list('pk', flat=True)
+            for obj, pk in zip(objs, pks.iterator()):
+                obj.pk = pk
+        for obj, pub_date in zip(objs, pub_dates):
+            if pub_date is not None:
+                obj.pub_date = pub_date
+        if model is Post:
+            model.objects.bulk_update(
+                objs, ['pub_date'], batch_size=self.batch_size
+            )
+
+    def add_many_to_many(self, label, model, field, related, objects):
+        """
+        Method to add the m2m rows of a batch
+        with a single insert into the through
+        table. Rows that already exist are
+        ignored, relations are only added,
+        never removed.
+        :param label:
+        :param model:
+        :param field:
+        :param related:
+        :param objects: iterable of (key, (obj, record))
+        :return: set of the related pks
+        """
+        m2m_field = model._meta.get_field(field)
+        through = m2m_field.remote_field.through
+        source = m2m_field.m2m_field_name() + '_id'
+        target = m2m_field.m2m_reverse_field_name() + '_id'
+        rows = []
+        for key, (obj, record) in objects:
+            for value in record.get(field) or ():
+                pk = self.maps[related].get(normalize_key(value))
+                if pk is None:
+                    self.warn('Ignored unknown {} {} of {} {}'.format(
+                        field, value, label, key
+                    ))
+                    continue
+                rows.append(through(**{source: obj.pk, target: pk}))
+        through.objects.bulk_create(
+            rows, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        return {getattr(row, target) for row in rows}
+
+
+def split_list(value):
+    """
+    Function to read an m2m value. In JSON it
+    is a list, in CSV a comma separated string.
+    :param value:
+    :return: list
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    return value
+
+
+def read_jsonl(stream, label=None):
+    """
+    Generator reading one JSON object per
+    line. Objects in the fixture format
+    ({"model": ..., "fields": {...}}) are
+    accepted as well as flat objects, for
+    which label gives the model.
+    :param stream:
+    :param label:
+    :return:
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        record_label = record.pop('model', label)
+        fields = record.get('fields', record)
+        if record_label is None:
+            raise ValueError('Record without a model: {}'.format(line))
+        yield record_label, _normalize_record(record_label, fields)
+
+
+def read_csv(stream, label):
+    """
+    Generator reading the rows of a CSV
+    file with a header, all of them being
+    records of the model given by label.
+    :param stream:
+    :param label:
+    :return:
+    """
+    for row in csv.DictReader(stream):
+        yield label, _normalize_record(label, row)
+
+
+def _normalize_record(label, fields):
+    spec = Importer.specs.get(label.lower())
+    if spec is not None:
+        for field in spec.foreign_keys:
+            value = fields.get(field)
+            if isinstance(value, (list, tuple)) and len(value) == 1:
+                fields[field] = value[0]
+        for field in spec.many_to_many:
+            fields[field] = split_list(fields.get(field))
+    return fields
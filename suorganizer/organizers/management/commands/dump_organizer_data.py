@@ -0,0 +1,67 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...dumper import write_jsonl
+from ...importer import Importer
+
+
+class Command(BaseCommand):
+    """
+    Command class to dump tags, startups,
+    newslinks and posts as JSON lines, with
+    natural keys, see organizers.dumper.
+    The rows are streamed chunk by chunk,
+    so tables of any size are dumped in
+    constant memory. The output is loaded
+    back with import_organizer_data.
+    """
+    help = 'Dump tags, startups, newslinks and posts as JSON lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            nargs='?',
+            default='-',
+            help='File to write, the standard output by default.'
+        )
+        parser.add_argument(
+            '--model',
+            dest='models',
+            action='append',
+            choices=list(Importer.specs),
+            help='Model to dump, all of them by default.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            dest='chunk_size',
+            type=int,
+            default=2000,
+            help='Number of rows read from the database at a time.'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        # in the order of the importer, parents first
+        labels = [
+            label for label in Importer.specs
+            if not options['models'] or label in options['models']
+        ]
+        if options['output'] == '-':
+            counts = write_jsonl(sys.stdout, labels, options['chunk_size'])
+        else:
+            try:
+                with open(options['output'], 'w',
+                          encoding='utf-8') as stream:
+                    counts = write_jsonl(
+                        stream, labels, options['chunk_size']
+                    )
+            except OSError as error:
+                raise CommandError(error)
+        for label, count in counts.items():
+            self.stderr.write('{}: {} dumped.'.format(label, count))
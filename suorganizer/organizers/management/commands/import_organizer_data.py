@@ -0,0 +1,119 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importer import Importer, read_csv, read_jsonl
+
+
+class Command(BaseCommand):
+    """
+    Command class to bulk import tags,
+    startups, newslinks and posts from
+    JSON lines or CSV files.
+    The files are streamed and imported
+    in batches, each batch committed on
+    its own, so files of any size can be
+    imported in constant memory. Records
+    whose natural key already exists
+    update the existing object.
+    Files are imported in the order given,
+    so tags and startups must come before
+    the newslinks and posts referencing
+    them, as dump_organizer_data writes
+    them.
+    """
+    help = 'Bulk import tags, startups, newslinks and posts.'
+
+    def add_arguments(self, parser):
+        """
+        Method that will receive the
+        command line arguments passed
+        by the user.
+        :param parser:
+        :return:
+        """
+        parser.add_argument(
+            'files',
+            nargs='+',
+            help='JSON lines (.jsonl) or CSV (.csv) files, '
+                 '- for JSON lines on the standard input.'
+        )
+        parser.add_argument(
+            '--model',
+            default=None,
+            choices=list(Importer.specs),
+            help='Model of the records, required for CSV files '
+                 'and JSON lines without a "model" key.'
+        )
+        parser.add_argument(
+            '--format',
+            dest='format',
+            default=None,
+            choices=['jsonl', 'csv'],
+            help='Format of the files, guessed from '
+                 'the extension by default.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=1000,
+            help='Number of records imported per transaction.'
+        )
+
+    def records(self, path, file_format, model):
+        """
+        Generator returning the records
+        of the file at path.
+        :param path:
+        :param file_format:
+        :param model:
+        :return:
+        """
+        if path == '-':
+            # e.g. the output of dump_organizer_data
+            yield from read_jsonl(sys.stdin, model)
+            return
+        if file_format is None:
+            file_format = os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('jsonl', 'csv'):
+            raise CommandError(
+                'Cannot guess the format of {}, '
+                'use --format.'.format(path)
+            )
+        if file_format == 'csv' and model is None:
+            raise CommandError('CSV files require --model.')
+        with open(path, newline='', encoding='utf-8') as stream:
+            if file_format == 'csv':
+                yield from read_csv(stream, model)
+            else:
+                yield from read_jsonl(stream, model)
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        importer = Importer(
+            batch_size=options['batch_size'], stderr=self.stderr
+        )
+        for path in options['files']:
+            try:
+                importer.run(self.records(
+                    path, options['format'], options['model']
+                ))
+            except (OSError, ValueError) as error:
+                raise CommandError(error)
+        for label in importer.specs:
+            self.stdout.write(
+                '{}: {} created, {} updated, {} skipped.'.format(
+                    label, importer.created[label],
+                    importer.updated[label], importer.skipped[label]
+                )
+            )
+        self.stdout.write(
+            'Run rebuild_search_index to index the imported objects.'
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from ...counters import update_startup_counts, update_tag_counts
+
+
+class Command(BaseCommand):
+    """
+    Command class to rebuild the
+    denormalized counters of every
+    Tag and Startup.
+    The counters are kept up to date
+    by signals, but the published post
+    counts change as posts published in
+    the future become visible, so this
+    command should be run once a day.
+    """
+    help = 'Recount the denormalized counters of Tags and Startups.'
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command.
+        Each model is recounted with a
+        single UPDATE statement.
+        :param args:
+        :param options:
+        :return:
+        """
+        tags = update_tag_counts()
+        startups = update_startup_counts()
+        self.stdout.write(
+            'Recounted {} tags and {} startups.'.format(
+                tags, startups
+            )
+        )
@@ -0,0 +1,100 @@
+# Generated by Django 3.1.1 on 2026-10-18 12:10
+
+"""
+Migration adding the denormalized counters
+to Tag and Startup and filling them in.
+"""
+from datetime import date
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset, field_name):
+    """
+    Helper building a subquery that counts
+    the rows of queryset referencing the
+    outer object through field_name.
+    :param queryset:
+    :param field_name:
+    :return:
+    """
+    subquery = queryset.filter(
+        **{field_name: OuterRef('pk')}
+    ).order_by().values(field_name).annotate(
+        count=Count('pk')
+    ).values('count')
+    return Coalesce(
+        Subquery(subquery, output_field=IntegerField()), 0
+    )
+
+
+def add_counts(apps, schema_editor):
+    """
+    Compute the counters of every tag and
+    startup in one UPDATE per model.
+    :param apps:
+    :param schema_editor:
+    :return:
+    """
+    Tag = apps.get_model('organizers', 'Tag')
+    Startup = apps.get_model('organizers', 'Startup')
+    NewsLink = apps.get_model('organizers', 'NewsLink')
+    Post = apps.get_model('blogs', 'Post')
+    today = date.today()
+    Tag.objects.update(
+        startup_count=count_subquery(
+            Startup.tags.through.objects.all(), 'tag_id'
+        ),
+        published_post_count=count_subquery(
+            Post.tags.through.objects.filter(
+                post__pub_date__lte=today
+            ), 'tag_id'
+        ),
+    )
+    Startup.objects.update(
+        newslink_count=count_subquery(
+            NewsLink.objects.all(), 'startup_id'
+        ),
+        published_post_count=count_subquery(
+            Post.startups.through.objects.filter(
+                post__pub_date__lte=today
+            ), 'startup_id'
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizers', '0008_newslinkmanager_startupmanager'),
+        ('blogs', '0007_index_together_slug_pubdate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startup',
+            name='newslink_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='startup_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            add_counts,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 3.1.1 on 2026-10-18 12:39
+
+"""
+Migration lowercasing the stored slugs and
+adding the UPPER(slug) indexes serving the
+__iexact lookups on PostgreSQL, see core.fields.
+"""
+import core.fields
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_slugs(apps, schema_editor):
+    """
+    Lowercase the slugs of every tag, startup
+    and newslink, in one UPDATE per model.
+    :param apps:
+    :param schema_editor:
+    :return:
+    """
+    for model_name in ('Tag', 'Startup', 'NewsLink'):
+        model = apps.get_model('organizers', model_name)
+        model.objects.exclude(
+            slug=Lower('slug')
+        ).update(slug=Lower('slug'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizers', '0010_modified'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='newslink',
+            name='slug',
+            field=core.fields.LowercaseSlugField(max_length=63),
+        ),
+        migrations.AlterField(
+            model_name='startup',
+            name='slug',
+            field=core.fields.LowercaseSlugField(help_text='A label for URL Config', max_length=31, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=core.fields.LowercaseSlugField(help_text='A label for URL Config', max_length=31, unique=True),
+        ),
+        migrations.RunPython(
+            lowercase_slugs,
+            migrations.RunPython.noop
+        ),
+        core.fields.FunctionalIndex(
+            model_name='tag',
+            name='organizers_tag_slug_upper',
+            expressions=['UPPER("slug"::text)'],
+        ),
+        core.fields.FunctionalIndex(
+            model_name='startup',
+            name='organizers_startup_slug_upper',
+            expressions=['UPPER("slug"::text)'],
+        ),
+        core.fields.FunctionalIndex(
+            model_name='newslink',
+            name='organizers_newslink_startup_slug_upper',
+            expressions=['"startup_id"', 'UPPER("slug"::text)'],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.1.1 on 2026-10-18 12:53
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizers', '0011_slug_indexes'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='NewsLinkManager',
+        ),
+        migrations.DeleteModel(
+            name='StartupManager',
+        ),
+    ]
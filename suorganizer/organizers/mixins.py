@@ -1,10 +1,14 @@
 """
 Utility module for organizers app
 """
+from django.core.paginator import InvalidPage
 from django.forms import forms
-from django.shortcuts import get_object_or_404
+from django.http import Http404
+
+from core.objectcache import get_object_or_404
 
 from .models import Startup, NewsLink
+from .paginator import KeysetPaginator
 
 
 class SlugCleanMixin:
@@ -26,8 +30,22 @@ class SlugCleanMixin:
 class PageLinksMixin:
     """
     A class to create pagination urls
+    By default pages are numbered and
+    fetched with OFFSET. Setting
+    keyset_pagination to True switches
+    to cursor based pagination, with
+    ?after= and ?before= links, where
+    a deep page costs the same as the
+    first one and no COUNT(*) is run.
+    The cursors are built from
+    keyset_ordering, which defaults to
+    the model Meta.ordering.
     """
     page_kwarg = 'page'
+    keyset_pagination = False
+    keyset_ordering = None
+    after_kwarg = 'after'
+    before_kwarg = 'before'
 
     def _page_urls(self, page_number):
         """
@@ -41,6 +59,44 @@ class PageLinksMixin:
             n=page_number
         )
 
+    def _cursor_urls(self, cursor_kwarg, cursor):
+        """
+        A method to create a pagination url
+        pointing after or before a cursor
+        :param cursor_kwarg:
+        :param cursor:
+        :return: url(string)
+        """
+        return '?{ckw}={c}'.format(
+            ckw=cursor_kwarg,
+            c=cursor
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Overriding the method to page with
+        the KeysetPaginator when keyset
+        pagination is enabled.
+        :param queryset:
+        :param page_size:
+        :return:
+        """
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(
+            queryset, page_size,
+            ordering=self.keyset_ordering
+        )
+        try:
+            page = paginator.page(
+                after=self.request.GET.get(self.after_kwarg),
+                before=self.request.GET.get(self.before_kwarg)
+            )
+        except InvalidPage as e:
+            raise Http404('Invalid page: {}'.format(e))
+        return (paginator, page, page.object_list,
+                page.has_other_pages())
+
     def previous_page(self, page):
         """
         A method to return the previous page url
@@ -48,6 +104,10 @@ class PageLinksMixin:
         :return:
         """
         if page.has_previous():
+            if self.keyset_pagination:
+                return self._cursor_urls(
+                    self.before_kwarg, page.previous_cursor
+                )
             return self._page_urls(page.previous_page_number())
         return None
 
@@ -58,6 +118,10 @@ class PageLinksMixin:
         :return:
         """
         if page.has_next():
+            if self.keyset_pagination:
+                return self._cursor_urls(
+                    self.after_kwarg, page.next_cursor
+                )
             return self._page_urls(page.next_page_number())
         return None
 
@@ -106,7 +170,7 @@ class StartupContextMixin:
                 self.startup_slug_url_kwarg
             )
             startup = get_object_or_404(
-                Startup, slug__iexact=startup_slug
+                Startup, (startup_slug,), slug__iexact=startup_slug
             )
             context = {
                 self.startup_context_object_name:
@@ -141,6 +205,7 @@ class NewsLinkGetObjectMixin:
         )
         return get_object_or_404(
             NewsLink,
+            (startup_slug, newslink_slug),
             slug__iexact=newslink_slug,
             startup__slug__iexact=startup_slug
         )
@@ -164,6 +229,7 @@ class BaseStartupFeedMixin:
     def get_object(self, request, startup_slug):
         return get_object_or_404(
             Startup,
+            (startup_slug,),
             slug__iexact=startup_slug
         )
 
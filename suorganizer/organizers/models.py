@@ -5,6 +5,8 @@ from django.db import models
 from django.urls import reverse
 from django.utils.functional import cached_property
 
+from core.fields import LowercaseSlugField
+
 
 class TagManager(models.Manager):
     """
@@ -26,9 +28,18 @@ class TagManager(models.Manager):
 class Tag(models.Model):
     name = models.CharField(max_length=31,
                             unique=True)
-    slug = models.SlugField(unique=True,
+    slug = LowercaseSlugField(unique=True,
                             max_length=31,
                             help_text='A label for URL Config')
+    # Last time the tag was saved, used for
+    # conditional GET, see conditional.py
+    modified = models.DateTimeField(auto_now=True)
+    # Denormalized counters kept up to date
+    # by the signal handlers, see counters.py
+    startup_count = models.PositiveIntegerField(
+        default=0, editable=False)
+    published_post_count = models.PositiveIntegerField(
+        default=0, editable=False)
 
     def __str__(self):
         # to capitalise the first Character
@@ -75,11 +86,11 @@ class Tag(models.Model):
         :return:
         """
         return (
-            self.slug
+            self.slug,
         )
 
 
-class StartupManager(models.Model):
+class StartupManager(models.Manager):
     """
     Custom manager class for Startup model
     """
@@ -97,7 +108,7 @@ class StartupManager(models.Model):
 class Startup(models.Model):
     name = models.CharField(max_length=31,
                             db_index=True)
-    slug = models.SlugField(max_length=31,
+    slug = LowercaseSlugField(max_length=31,
                             unique=True,
                             help_text='A label for URL Config')
     description = models.TextField()
@@ -105,6 +116,13 @@ class Startup(models.Model):
     contact = models.EmailField()
     website = models.URLField(max_length=255)
     tags = models.ManyToManyField(Tag, blank=True)
+    modified = models.DateTimeField(auto_now=True)
+    # Denormalized counters kept up to date
+    # by the signal handlers, see counters.py
+    newslink_count = models.PositiveIntegerField(
+        default=0, editable=False)
+    published_post_count = models.PositiveIntegerField(
+        default=0, editable=False)
 
     def __str__(self):
         return 'Startup with Title {}' \
@@ -140,7 +158,7 @@ class Startup(models.Model):
         the parenthesis
         :return:
         """
-        return (self.slug)
+        return (self.slug,)
 
     @cached_property
     def published_posts(self):
@@ -182,7 +200,7 @@ class Startup(models.Model):
             kwargs={'startup_slug': self.slug}
         )
 
-class NewsLinkManager(models.Model):
+class NewsLinkManager(models.Manager):
     """
     Custom manager class for NewsLink
     """
@@ -195,8 +213,8 @@ class NewsLinkManager(models.Model):
         :return:
         """
         return self.get(
-            startup_slug=self.startup_slug,
-            slug=self.slug
+            startup__slug=startup_slug,
+            slug=slug
         )
 
 
@@ -206,7 +224,8 @@ class NewsLink(models.Model):
     link = models.URLField(max_length=255)
     startup = models.ForeignKey(Startup,
                                 on_delete=models.CASCADE)
-    slug = models.SlugField(max_length=63)
+    slug = LowercaseSlugField(max_length=63)
+    modified = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return 'NewsLink for startup {}: with title {}'.format(
@@ -248,10 +267,7 @@ class NewsLink(models.Model):
         way.
         :return:
         """
-        return (
-            self.startup.natural_key(),
-            self.slug
-        )
+        return self.startup.natural_key() + (self.slug,)
 
     natural_key.dependencies = [
         'organizers.startup',
@@ -0,0 +1,226 @@
+"""
+Keyset (seek) pagination for the list views.
+
+Django's Paginator pages with OFFSET and needs
+a COUNT(*) of the whole table to know how many
+pages there are. Both get slower as the table
+grows, and a deep page has to skip every row
+before it.
+Keyset pagination instead remembers the ordering
+values of the last row shown and asks the
+database for the rows that sort after it. The
+cost of any page is then the same as the cost
+of the first one, and no count is ever needed.
+"""
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.http import (
+    urlsafe_base64_decode,
+    urlsafe_base64_encode,
+)
+
+
+class InvalidCursor(InvalidPage):
+    """
+    Raised when a cursor passed in the
+    query string cannot be decoded.
+    """
+    pass
+
+
+class KeysetPage(Sequence):
+    """
+    A page of results returned by the
+    KeysetPaginator. It behaves like
+    django's Page in templates, but
+    instead of page numbers it knows the
+    cursors of the pages around it.
+    """
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Keyset page of {} objects>'.format(
+            len(self.object_list)
+        )
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginator that seeks through a queryset
+    using the values of its ordering fields.
+    The ordering defaults to the ordering of
+    the queryset, falling back to the model
+    Meta.ordering. The primary key is always
+    added as the last ordering field so that
+    every row has a unique position, even when
+    the other fields have duplicates (e.g. two
+    startups with the same name).
+    Only concrete fields of the model itself
+    can be used in the ordering, and they are
+    expected not to be null.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        model = queryset.model
+        if ordering is None:
+            ordering = (queryset.query.order_by
+                        or model._meta.ordering)
+        ordering = list(ordering)
+        pk_names = ('pk', model._meta.pk.name)
+        if not any(name.lstrip('-') in pk_names
+                   for name in ordering):
+            ordering.append('pk')
+        self.per_page = int(per_page)
+        self.ordering = ordering
+        self.fields = []
+        for name in ordering:
+            field_name = name.lstrip('-')
+            if field_name == 'pk':
+                field = model._meta.pk
+            else:
+                field = model._meta.get_field(field_name)
+            self.fields.append(
+                (field, name.startswith('-'))
+            )
+        self.queryset = queryset.order_by(*ordering)
+
+    def encode_cursor(self, obj):
+        """
+        Method to create an opaque cursor
+        out of the ordering values of obj.
+        :param obj:
+        :return: cursor(string)
+        """
+        values = [
+            field.value_to_string(obj)
+            for field, descending in self.fields
+        ]
+        return urlsafe_base64_encode(
+            json.dumps(values).encode()
+        )
+
+    def decode_cursor(self, cursor):
+        """
+        Method to turn a cursor back into
+        the ordering values it was made from.
+        :param cursor:
+        :return: list of values
+        """
+        try:
+            values = json.loads(
+                urlsafe_base64_decode(cursor).decode()
+            )
+            if (not isinstance(values, list)
+                    or len(values) != len(self.fields)):
+                raise ValueError(cursor)
+            return [
+                field.to_python(value)
+                for (field, descending), value
+                in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError,
+                UnicodeDecodeError, ValidationError):
+            raise InvalidCursor(
+                'That cursor is not valid'
+            )
+
+    def _seek_filter(self, values, forward=True):
+        """
+        Method to build the filter that selects
+        the rows after (or before) the row the
+        values were taken from.
+        For ordering (a, -b, pk) and forward
+        direction this builds:
+        a > x OR (a = x AND b < y)
+        OR (a = x AND b = y AND pk > z)
+        :param values:
+        :param forward:
+        :return: Q
+        """
+        seek = Q()
+        equal = {}
+        for (field, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending == forward else 'gt'
+            seek |= Q(**equal, **{
+                '{}__{}'.format(field.attname, lookup): value
+            })
+            equal[field.attname] = value
+        return seek
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else '-' + name
+            for name in self.ordering
+        ]
+
+    def page(self, after=None, before=None):
+        """
+        Method to return the page following the
+        after cursor, or preceding the before
+        cursor. Without cursors the first page
+        is returned.
+        One extra row is fetched to find out if
+        there is another page in the direction
+        we are paging.
+        :param after:
+        :param before:
+        :return: KeysetPage
+        """
+        limit = self.per_page + 1
+        if before:
+            queryset = self.queryset.filter(
+                self._seek_filter(
+                    self.decode_cursor(before), forward=False
+                )
+            ).order_by(*self._reversed_ordering())
+            rows = list(queryset[:limit])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            next_cursor = (self.encode_cursor(rows[-1])
+                           if rows else None)
+            previous_cursor = (self.encode_cursor(rows[0])
+                               if has_more else None)
+        else:
+            queryset = self.queryset
+            if after:
+                queryset = queryset.filter(
+                    self._seek_filter(self.decode_cursor(after))
+                )
+            rows = list(queryset[:limit])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            next_cursor = (self.encode_cursor(rows[-1])
+                           if has_more else None)
+            previous_cursor = (self.encode_cursor(rows[0])
+                               if after and rows else None)
+        return KeysetPage(
+            rows, self,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor
+        )
@@ -0,0 +1,316 @@
+"""
+Signal module for organizers
+"""
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.db import transaction
+from django.dispatch import receiver
+
+from core.fragments import (
+    invalidate_fragments, invalidate_m2m_fragments
+)
+from core.feeds import forget_feeds, refresh_feeds
+from core.objectcache import forget, object_key
+from core.sitemaps import update_sitemaps
+from core.stored import forget_stored, stored, track_stored
+
+from .counters import (
+    update_m2m_counts, update_startup_counts, update_tag_counts
+)
+from .feeds import AtomStartupFeed, Rss2StartupFeed
+from .models import NewsLink, Startup, Tag
+
+
+# The stored slugs of the objects being saved,
+# read once per save by the receivers below
+track_stored(Tag.objects.only('slug'))
+track_stored(Startup.objects.only('slug'))
+track_stored(
+    NewsLink.objects.select_related('startup').only(
+        'slug', 'startup', 'startup__slug'
+    )
+)
+
+
+def object_keys(instance, old=None):
+    """
+    Function to return the keys a tag, startup
+    or newslink is cached under, see
+    core.objectcache, and those of its stored
+    version old, whose slugs may differ. The
+    newslinks of a startup are cached under
+    its slug too.
+    :param instance:
+    :param old:
+    :return: list of keys
+    """
+    versions = [instance] if old is None else [instance, old]
+    if isinstance(instance, NewsLink):
+        return list({
+            object_key(NewsLink, version.startup.slug, version.slug)
+            for version in versions
+        })
+    slugs = {version.slug for version in versions}
+    keys = [object_key(type(instance), slug) for slug in slugs]
+    if isinstance(instance, Startup):
+        newslink_slugs = list(
+            instance.newslink_set.values_list('slug', flat=True)
+        )
+        keys.extend(
+            object_key(NewsLink, slug, newslink_slug)
+            for slug in slugs for newslink_slug in newslink_slugs
+        )
+    return keys
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Startup)
+@receiver(post_delete, sender=Startup)
+@receiver(post_save, sender=NewsLink)
+@receiver(post_delete, sender=NewsLink)
+def cached_objects(sender, instance, **kwargs):
+    """
+    Function to forget the cached objects of
+    a saved or deleted tag, startup or
+    newslink, under its current and stored
+    slugs. It is connected before the feed
+    receivers, so the objects are forgotten
+    before the feeds are rendered again.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    forget(object_keys(instance, stored(instance)))
+
+
+def invalidate_startup_fragments(startup):
+    """
+    Function to invalidate the fragments
+    displaying a startup. Tag detail pages
+    list the names of their startups and
+    post detail pages list the startups of
+    the post.
+    :param startup:
+    :return:
+    """
+    invalidate_fragments(Startup, [startup.pk])
+    invalidate_fragments(
+        Tag, startup.tags.values_list('pk', flat=True)
+    )
+    invalidate_fragments(
+        startup.blog_posts.model,
+        startup.blog_posts.values_list('pk', flat=True)
+    )
+
+
+def invalidate_tag_fragments(tag):
+    """
+    Function to invalidate the fragments
+    displaying a tag. Startup and post
+    detail pages list the names of their
+    tags.
+    :param tag:
+    :return:
+    """
+    invalidate_fragments(Tag, [tag.pk])
+    invalidate_fragments(
+        Startup, tag.startup_set.values_list('pk', flat=True)
+    )
+    invalidate_fragments(
+        tag.blog_posts.model,
+        tag.blog_posts.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=Startup)
+@receiver(pre_delete, sender=Startup)
+def startup_fragments(sender, instance, **kwargs):
+    """
+    Function to invalidate fragments when
+    a startup is saved or is about to be
+    deleted. On deletion we have to find
+    the related objects before the m2m
+    rows are removed with the startup.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    invalidate_startup_fragments(instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def tag_fragments(sender, instance, **kwargs):
+    """
+    Function to invalidate fragments when
+    a tag is saved or is about to be
+    deleted.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    invalidate_tag_fragments(instance)
+
+
+@receiver(post_save, sender=NewsLink)
+@receiver(post_delete, sender=NewsLink)
+def newslink_fragments(sender, instance, **kwargs):
+    """
+    Function to invalidate the startup
+    detail fragments showing the newslink.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    invalidate_fragments(Startup, [instance.startup_id])
+
+
+m2m_changed.connect(
+    invalidate_m2m_fragments,
+    sender=Startup.tags.through
+)
+
+
+@receiver(post_save, sender=NewsLink)
+@receiver(post_delete, sender=NewsLink)
+def newslink_counts(sender, instance, **kwargs):
+    """
+    Function to recount the newslinks of
+    the startup the newslink belongs to.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    update_startup_counts([instance.startup_id])
+
+
+@receiver(pre_delete, sender=Startup)
+def startup_counts(sender, instance, **kwargs):
+    """
+    Function to recount the startups of the
+    tags of a startup being deleted. Django
+    doesn't send m2m_changed for the rows
+    removed with the startup, so we find the
+    tags now and recount them once the
+    deletion is committed.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    tag_pks = list(instance.tags.values_list('pk', flat=True))
+    transaction.on_commit(lambda: update_tag_counts(tag_pks))
+
+
+@receiver(m2m_changed, sender=Startup.tags.through)
+def startup_tags_counts(sender, instance, action,
+                        model, pk_set, **kwargs):
+    """
+    Function to recount the startups of the
+    tags added to or removed from startups.
+    :param sender:
+    :param instance:
+    :param action:
+    :param model:
+    :param pk_set:
+    :param kwargs:
+    :return:
+    """
+    update_m2m_counts(
+        update_tag_counts, Tag,
+        sender, instance, action, model, pk_set
+    )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Startup)
+@receiver(post_delete, sender=Startup)
+def sitemap_files(sender, instance, **kwargs):
+    """
+    Function to render again the sitemap
+    file listing a saved or deleted tag
+    or startup.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    update_sitemaps(sender, [instance.pk])
+
+
+@receiver(post_save, sender=NewsLink)
+@receiver(post_delete, sender=NewsLink)
+def newslink_sitemap_files(sender, instance, **kwargs):
+    """
+    Function to render again the sitemap
+    file listing the startup of a newslink,
+    whose lastmod is the latest newslink date.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    update_sitemaps(Startup, [instance.startup_id])
+
+
+def startup_feeds():
+    return [AtomStartupFeed(), Rss2StartupFeed()]
+
+
+@receiver(post_save, sender=NewsLink)
+@receiver(post_delete, sender=NewsLink)
+def newslink_feeds(sender, instance, **kwargs):
+    """
+    Function to render again the feeds of
+    the startup a newslink belongs to.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    refresh_feeds(startup_feeds(), startup_slug=instance.startup.slug)
+
+
+@receiver(post_save, sender=Startup)
+def startup_feeds_changed(sender, instance, **kwargs):
+    """
+    Function to render again the feeds of
+    a startup, which show its name, and to
+    remove those cached under its stored
+    slug if it changed.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    old = stored(instance)
+    if old is not None and old.slug != instance.slug:
+        forget_feeds(startup_feeds(), startup_slug=old.slug)
+    refresh_feeds(startup_feeds(), startup_slug=instance.slug)
+
+
+@receiver(post_delete, sender=Startup)
+def deleted_startup_feeds(sender, instance, **kwargs):
+    """
+    Function to remove the cached feeds
+    of a deleted startup.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    forget_feeds(startup_feeds(), startup_slug=instance.slug)
+
+
+# after every receiver using stored()
+post_save.connect(forget_stored, sender=Tag)
+post_save.connect(forget_stored, sender=Startup)
+post_save.connect(forget_stored, sender=NewsLink)
@@ -9,18 +9,27 @@ can be passed a dictionary of items to
 automatically generate Sitemap subclass
 """
 
-from django.contrib.sitemaps import (
-    GenericSitemap, Sitemap
-)
+from django.db.models import Max
+
+from core.sitemaps import ShardedSitemap
+
 from .models import Tag, Startup
 
-tag_sitemap_dict = {
-    'queryset': Tag.objects.all(),
-}
-TagSitemap = GenericSitemap(tag_sitemap_dict)
+
+class TagSitemap(ShardedSitemap):
+    """
+    Class for implementing sitemap
+    functionality for Tag. The
+    sitemap files are pre-rendered
+    and sharded, see core.sitemaps
+    """
+    model = Tag
+
+    def items(self):
+        return self.model.objects.all()
 
 
-class StartupSitemap(Sitemap):
+class StartupSitemap(ShardedSitemap):
     """
     Class for implementing sitemap
     functionality for Startup
@@ -30,9 +39,14 @@ class StartupSitemap(Sitemap):
     def items(self):
         """
         overriding the items method
-        of the Sitemap class
+        of the Sitemap class.
+        The date of the latest newslink
+        is annotated in the same query,
+        rather than queried per startup.
         """
-        return self.model.objects.all()
+        return self.model.objects.annotate(
+            latest_newslink_date=Max('newslink__pub_date')
+        )
 
     def lastmod(self, startup):
         """
@@ -41,9 +55,7 @@ class StartupSitemap(Sitemap):
         mod based on that, else it
         will be based on the founded_date
         """
-        if startup.newslink_set.exists():
-            return (
-                startup.newslink_set.latest().pub_date
-            )
-        else:
-            return startup.founded_date
+        return (
+            startup.latest_newslink_date
+            or startup.founded_date
+        )
@@ -1,3 +1,498 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core import serializers
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import urlsafe_base64_encode
+
+from blogs.models import Post, PostArchive
+from core.objectcache import local_cache
+from core.testing import QueryBudgetMixin
+from users.models import Profile, User
+
+from .counters import update_startup_counts, update_tag_counts
+from .dumper import write_jsonl
+from .importer import Importer
+from .models import NewsLink, Startup, Tag
+from .paginator import InvalidCursor, KeysetPaginator
+
+
+class KeysetPaginatorTest(TestCase):
+    """
+    Tests of the keyset pagination,
+    see paginator.py
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # two startups share each name, so the
+        # pages are told apart by the pk alone
+        Startup.objects.bulk_create(
+            Startup(
+                name='Keyset {}'.format(n // 2),
+                slug='keyset-{}'.format(n),
+                description='Paged startup.',
+                founded_date=date(2020, 1, 1),
+                contact='keyset@example.com',
+                website='https://example.com/',
+            )
+            for n in range(7)
+        )
+        cls.startups = list(
+            Startup.objects.filter(
+                slug__startswith='keyset-'
+            ).order_by('name', 'pk')
+        )
+
+    def paginator(self):
+        return KeysetPaginator(
+            Startup.objects.filter(slug__startswith='keyset-'), 3
+        )
+
+    def test_pages_forward_over_duplicate_names(self):
+        paginator = self.paginator()
+        rows, page = [], paginator.page()
+        self.assertFalse(page.has_previous())
+        while True:
+            rows.extend(page)
+            if not page.has_next():
+                break
+            page = paginator.page(after=page.next_cursor)
+            self.assertTrue(page.has_previous())
+        self.assertEqual(rows, self.startups)
+
+    def test_pages_backward(self):
+        paginator = self.paginator()
+        last = paginator.page(after=paginator.encode_cursor(
+            self.startups[3]
+        ))
+        self.assertEqual(list(last), self.startups[4:7])
+        self.assertFalse(last.has_next())
+        page = paginator.page(before=last.previous_cursor)
+        self.assertEqual(list(page), self.startups[1:4])
+        self.assertTrue(page.has_previous())
+        page = paginator.page(before=page.previous_cursor)
+        self.assertEqual(list(page), self.startups[0:1])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def test_past_the_last_row_is_empty(self):
+        paginator = self.paginator()
+        page = paginator.page(after=paginator.encode_cursor(
+            self.startups[-1]
+        ))
+        self.assertEqual(list(page), [])
+        self.assertFalse(page.has_other_pages())
+
+    def test_page_runs_no_count(self):
+        paginator = self.paginator()
+        cursor = paginator.encode_cursor(self.startups[2])
+        with self.assertNumQueries(1):
+            list(paginator.page(after=cursor))
+
+    def test_invalid_cursor(self):
+        paginator = self.paginator()
+        # not base64, and a list of the wrong length
+        for cursor in ('not-a-cursor', urlsafe_base64_encode(b'[1]')):
+            with self.assertRaises(InvalidCursor):
+                paginator.page(after=cursor)
+        response = self.client.get(
+            reverse('organizers_startup_list'),
+            {'after': 'not-a-cursor'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class StoredObjectTest(TestCase):
+    """
+    Tests of the receivers of saved tags,
+    startups and newslinks, which share the
+    stored row, see core.stored.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.startup = Startup.objects.create(
+            name='Stored', slug='stored', description='A startup.',
+            founded_date=date(2015, 1, 1), contact='hi@example.com',
+            website='https://example.com/',
+        )
+        NewsLink.objects.create(
+            title='News', slug='news', pub_date=date(2019, 1, 1),
+            startup=cls.startup, link='https://example.com/news/',
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        local_cache.clear()
+
+    def test_stored_row_is_read_once(self):
+        self.startup.slug = 'renamed'
+        with CaptureQueriesContext(connection) as queries:
+            self.startup.save()
+        reads = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and (
+                'FROM "organizers_startup" WHERE "organizers_startup"."id"'
+                in query['sql']
+            )
+        ]
+        self.assertEqual(len(reads), 1)
+        self.assertNotIn('_stored', vars(self.startup))
+
+    def test_renamed_startup_is_forgotten(self):
+        url = reverse('organizers_startup_detail', kwargs={'slug': 'stored'})
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.startup.slug = 'renamed'
+        self.startup.save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertContains(
+            self.client.get(self.startup.get_absolute_url()), 'News'
+        )
+
+
+class OrganizerQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    Tests of the query budgets of the tag and
+    startup pages and feeds, see QUERY_BUDGETS.
+    The pages list several objects, each with
+    several relations, so queries repeated per
+    row show up.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='reader@example.com', password='s3cret-Pa55word'
+        )
+        Profile.objects.create(
+            user=cls.user, slug='reader', name='Reader', about='Reads.'
+        )
+        tags = [
+            Tag.objects.create(name='Tag {}'.format(n), slug='tag-{}'.format(n))
+            for n in range(3)
+        ]
+        startups = []
+        for n in range(3):
+            startup = Startup.objects.create(
+                name='Startup {}'.format(n), slug='startup-{}'.format(n),
+                description='A startup.', founded_date=date(2015, 1, 1),
+                contact='hi@example.com', website='https://example.com/',
+            )
+            startup.tags.set(tags)
+            for m in range(3):
+                NewsLink.objects.create(
+                    title='News {}'.format(m), slug='news-{}'.format(m),
+                    pub_date=date(2019, 1, m + 1), startup=startup,
+                    link='https://example.com/news/{}'.format(m),
+                )
+            startups.append(startup)
+        for n in range(3):
+            post = Post.objects.create(
+                title='Post {}'.format(n), slug='post-{}'.format(n),
+                text='Text of the post.', author=cls.user,
+            )
+            post.tags.set(tags)
+            post.startups.set(startups)
+        cls.tag = tags[0]
+        cls.startup = startups[0]
+
+    def setUp(self):
+        # the budgets are for a cold cache
+        for cache in caches.all():
+            cache.clear()
+        local_cache.clear()
+        self.client.force_login(self.user)
+
+    def test_tag_list(self):
+        self.assertWithinBudget(
+            reverse('organizers_tag_list'), allow_n_plus_one=False
+        )
+
+    def test_tag_detail(self):
+        self.assertWithinBudget(
+            self.tag.get_absolute_url(), allow_n_plus_one=False
+        )
+
+    def test_startup_list(self):
+        self.assertWithinBudget(
+            reverse('organizers_startup_list'), allow_n_plus_one=False
+        )
+
+    def test_startup_detail(self):
+        self.assertWithinBudget(
+            self.startup.get_absolute_url(), allow_n_plus_one=False
+        )
+
+    def test_startup_atom_feed(self):
+        self.assertWithinBudget(
+            reverse('organizers_startup_atom_feed',
+                    kwargs={'startup_slug': self.startup.slug}),
+            allow_n_plus_one=False
+        )
+
+    def test_startup_rss_feed(self):
+        self.assertWithinBudget(
+            reverse('organizers_startup_rss_feed',
+                    kwargs={'startup_slug': self.startup.slug}),
+            allow_n_plus_one=False
+        )
+
+
+class DumpTest(TestCase):
+    """
+    Tests of the organizer data dumps,
+    see dumper.py
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='dump@example.com', password='s3cret-Pa55word'
+        )
+        tag = Tag.objects.create(name='Dumped', slug='dumped')
+        cls.startup = Startup.objects.create(
+            name='Dumped Startup', slug='dumped-startup',
+            description='A dumped startup.', founded_date=date(2015, 1, 1),
+            contact='dump@example.com', website='https://example.com/',
+        )
+        cls.startup.tags.add(tag)
+        cls.newslink = NewsLink.objects.create(
+            title='Dumped news', slug='dumped-news',
+            pub_date=date(2019, 1, 1), startup=cls.startup,
+            link='https://example.com/news/',
+        )
+        post = Post.objects.create(
+            title='Dumped post', slug='dumped-post',
+            text='A dumped post.', author=cls.author,
+        )
+        post.pub_date = date(2019, 2, 3)
+        post.save()
+        post.tags.add(tag)
+        post.startups.add(cls.startup)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def dump(self, name):
+        path = os.path.join(self.directory, name)
+        call_command(
+            'dump_organizer_data', path, chunk_size=2, stderr=StringIO()
+        )
+        with open(path) as dump:
+            # the records of the test data
+            return path, [line for line in dump if 'dumped' in line]
+
+    def test_dump_is_loaded_back(self):
+        path, dumped = self.dump('first.jsonl')
+        self.assertEqual(len(dumped), 4)
+        self.assertIn('"startup":["dumped-startup"]', dumped[2])
+        Post.objects.filter(slug='dumped-post').delete()
+        Startup.objects.filter(slug='dumped-startup').delete()
+        Tag.objects.filter(slug='dumped').delete()
+        call_command(
+            'import_organizer_data', path,
+            stdout=StringIO(), stderr=StringIO()
+        )
+        post = Post.objects.get(slug='dumped-post')
+        self.assertEqual(post.pub_date, date(2019, 2, 3))
+        self.assertEqual(post.author, self.author)
+        self.assertEqual(
+            list(post.startups.values_list('slug', flat=True)),
+            ['dumped-startup']
+        )
+        self.assertEqual(
+            NewsLink.objects.get(slug='dumped-news').startup.slug,
+            'dumped-startup'
+        )
+        self.assertEqual(self.dump('second.jsonl')[1], dumped)
+
+    def test_queries_do_not_grow_with_the_rows(self):
+        def count():
+            with CaptureQueriesContext(connection) as queries:
+                write_jsonl(StringIO(), ['organizers.startup'], 1000)
+            return len(queries)
+        before = count()
+        for number in range(5):
+            Startup.objects.create(
+                name='More {}'.format(number),
+                slug='more-{}'.format(number),
+                description='Another startup.',
+                founded_date=date(2015, 1, 1),
+                contact='dump@example.com', website='https://example.com/',
+            ).tags.add(Tag.objects.get(slug='dumped'))
+        self.assertEqual(count(), before)
+
+    def test_natural_keys(self):
+        self.assertEqual(self.startup.natural_key(), ('dumped-startup',))
+        self.assertEqual(
+            self.newslink.natural_key(), ('dumped-startup', 'dumped-news')
+        )
+        self.assertEqual(
+            NewsLink.objects.get_by_natural_key(
+                'dumped-startup', 'dumped-news'
+            ),
+            self.newslink
+        )
+        data = serializers.serialize(
+            'json', [self.newslink],
+            use_natural_foreign_keys=True, use_natural_primary_keys=True
+        )
+        newslink = next(serializers.deserialize('json', data)).object
+        self.assertEqual(newslink.pk, self.newslink.pk)
+
+
+class ImporterTest(TestCase):
+    """
+    Tests of the bulk importer,
+    see importer.py
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', password='s3cret-Pa55word'
+        )
+
+    def import_post(self):
+        Importer().run([
+            ('organizers.tag', {'name': 'Django', 'slug': 'django'}),
+            ('blogs.post', {
+                'title': 'Dated post',
+                'slug': 'dated-post',
+                'text': 'Imported with its date.',
+                'pub_date': '2019-03-14',
+                'author': 'author@example.com',
+                'tags': ['django'],
+            }),
+        ])
+        return Post.objects.get(slug='dated-post')
+
+    def test_post_pub_date_is_kept(self):
+        post = self.import_post()
+        self.assertEqual(post.pub_date, date(2019, 3, 14))
+        self.assertEqual(
+            list(post.tags.values_list('slug', flat=True)), ['django']
+        )
+
+    def test_post_pub_date_is_kept_with_returned_pks(self):
+        # as on PostgreSQL, where bulk_create
+        # sets the primary keys itself
+        with mock.patch.object(
+                connection.features,
+                'can_return_rows_from_bulk_insert', True):
+            post = self.import_post()
+        self.assertEqual(post.pub_date, date(2019, 3, 14))
+
+    def test_slugs_are_lowercased(self):
+        startup = {
+            'name': 'Mixed Case', 'slug': 'Mixed-Case',
+            'description': 'A startup.', 'founded_date': '2015-01-01',
+            'contact': 'hi@example.com', 'website': 'https://example.com/',
+            'tags': ['MIXED-tag'],
+        }
+        Importer().run([
+            ('organizers.tag', {'name': 'Mixed', 'slug': 'Mixed-Tag'}),
+            ('organizers.startup', startup),
+            ('organizers.newslink', {
+                'title': 'News', 'slug': 'Mixed-News',
+                'pub_date': '2019-01-01', 'startup': 'MIXED-CASE',
+                'link': 'https://example.com/news/',
+            }),
+        ])
+        # the second import updates the same rows
+        Importer().run([
+            ('organizers.tag', {'name': 'Renamed', 'slug': 'MIXED-TAG'}),
+            ('organizers.startup', dict(startup, slug='MIXED-case')),
+        ])
+        tag = Tag.objects.get(slug='mixed-tag')
+        self.assertEqual(tag.name, 'Renamed')
+        startup = Startup.objects.get(slug='mixed-case')
+        self.assertEqual(list(startup.tags.all()), [tag])
+        self.assertEqual(startup.newslink_set.get().slug, 'mixed-news')
+        self.assertEqual(tag.startup_count, 1)
+        self.assertEqual(startup.newslink_count, 1)
+
+    def test_only_touched_rows_are_recounted(self):
+        Tag.objects.update(startup_count=99)
+        self.import_post()
+        tag = Tag.objects.get(slug='django')
+        self.assertEqual(tag.startup_count, tag.startup_set.count())
+        # the other tags are left alone
+        self.assertFalse(
+            Tag.objects.exclude(pk=tag.pk).exclude(startup_count=99).exists()
+        )
+        self.assertEqual(
+            PostArchive.objects.get(month=date(2019, 3, 1)).post_count,
+            Post.objects.filter(
+                pub_date__year=2019, pub_date__month=3
+            ).count()
+        )
+
+
+class CachedCountersTest(TransactionTestCase):
+    """
+    Tests of the counters of the objects
+    kept in the object cache, see
+    counters.py. The cached fragments are
+    invalidated when transactions commit.
+    """
+
+    def test_tag_detail_shows_added_startup(self):
+        tag = Tag.objects.create(name='Cached', slug='cached')
+        startup = Startup.objects.create(
+            name='Counted', slug='counted', description='A startup.',
+            founded_date=date(2015, 1, 1), contact='hi@example.com',
+            website='https://example.com/',
+        )
+        url = reverse('organizers_tag_detail', kwargs={'slug': tag.slug})
+        self.assertNotContains(self.client.get(url), 'Tag is associated')
+        startup.tags.add(tag)
+        self.assertContains(
+            self.client.get(url), 'Tag is associated with 1 startup'
+        )
+
+
+class PublishedCountTest(TestCase):
+    """
+    Tests of the counts of published posts,
+    see counters.py
+    """
+
+    def test_counts_match_the_published_posts(self):
+        author = User.objects.create_user(
+            email='counted@example.com', password='s3cret-Pa55word'
+        )
+        tag = Tag.objects.create(name='Counted', slug='counted')
+        startup = Startup.objects.create(
+            name='Counted', slug='counted', description='A startup.',
+            founded_date=date(2015, 1, 1), contact='hi@example.com',
+            website='https://example.com/',
+        )
+        for days, slug in ((-1, 'yesterday'), (0, 'today'), (1, 'tomorrow')):
+            post = Post.objects.create(
+                title='Counted', slug=slug, text='Text.', author=author
+            )
+            post.pub_date = date.today() + timedelta(days=days)
+            post.save()
+            post.tags.add(tag)
+            post.startups.add(startup)
+        update_tag_counts([tag.pk])
+        update_startup_counts([startup.pk])
+        for obj in (tag, startup):
+            obj.refresh_from_db()
+            self.assertEqual(
+                obj.published_post_count, len(obj.published_posts)
+            )
+            self.assertEqual(obj.published_post_count, 1)
@@ -1,14 +1,16 @@
 from django.urls import path
 
+from core.asyncviews import async_view
+
 from ..views import (
     StartupDetail, StartupUpdate, StartupDelete, StartupList,StartupCreate,
     NewsLinkCreate, NewsLinkDelete, NewsLinkUpdate
 )
 
 urlpatterns = [
-    path('', StartupList.as_view(), name='organizers_startup_list'),
+    path('', async_view(StartupList.as_view()), name='organizers_startup_list'),
     path('create/', StartupCreate.as_view(), name='organizers_startup_create'),
-    path('<slug:slug>/', StartupDetail.as_view(), name='organizers_startup_detail'),
+    path('<slug:slug>/', async_view(StartupDetail.as_view()), name='organizers_startup_detail'),
     path('<slug:slug>/update/', StartupUpdate.as_view(), name='organizers_startup_update'),
     path('<slug:slug>/delete/', StartupDelete.as_view(), name='organizers_startup_delete'),
     path('<slug:startup_slug>/add_article_link/', NewsLinkCreate.as_view(), name='organizers_newslink_create'),
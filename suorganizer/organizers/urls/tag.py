@@ -1,5 +1,7 @@
 from django.urls import path
 
+from core.asyncviews import async_view
+
 from ..views import (
     TagDetail,
     TagCreate,
@@ -9,9 +11,9 @@ from ..views import (
 )
 
 urlpatterns = [
-    path('', TagList.as_view(), name='organizers_tag_list'),
+    path('', async_view(TagList.as_view()), name='organizers_tag_list'),
     path('create/', TagCreate.as_view(), name='organizers_tag_create'),
-    path('<slug:slug>/', TagDetail.as_view(), name='organizers_tag_detail'),
+    path('<slug:slug>/', async_view(TagDetail.as_view()), name='organizers_tag_detail'),
     path('<slug:slug>/update/', TagUpdate.as_view(), name='organizers_tag_update'),
     path('<slug:slug>/delete/', TagDelete.as_view(), name='organizers_tag_delete'),
 ]
@@ -5,7 +5,6 @@ from django.contrib.auth.mixins import (
     LoginRequiredMixin,
     PermissionRequiredMixin,
 )
-from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.views.generic import (
     CreateView,
@@ -15,6 +14,10 @@ from django.views.generic import (
     ListView,
 )
 
+from core.conditional import ConditionalGetMixin
+from core.objectcache import CachedObjectMixin, get_object_or_404
+
+from .conditional import startup_state, tag_state
 from .forms import (
     TagForm,
     StartupForm,
@@ -32,14 +35,20 @@ class TagList(PageLinksMixin, ListView):
     """Tag list view"""
     template_name = 'tag/tag_list.html'
     paginate_by = 5
+    keyset_pagination = True
     model = Tag
 
 
-class TagDetail(DetailView):
+class TagDetail(ConditionalGetMixin, CachedObjectMixin, DetailView):
     """Tag detail view"""
     template_name = 'tag/tag_detail.html'
-    queryset = Tag.objects. \
-        prefetch_related('startup_set')
+    # The related startups and posts are rendered
+    # inside cached fragments, so they are loaded
+    # lazily and only on a cache miss.
+    model = Tag
+
+    def get_conditional_state(self, request, *args, **kwargs):
+        return tag_state(slug=kwargs.get(self.slug_url_kwarg))
 
 
 class TagCreate(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
@@ -49,7 +58,8 @@ class TagCreate(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     permission_required = 'organizers.change_tag'
 
 
-class TagUpdate(LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
+class TagUpdate(LoginRequiredMixin, PermissionRequiredMixin,
+                CachedObjectMixin, UpdateView):
     """Tag update view"""
     form_class = TagForm
     model = Tag
@@ -57,7 +67,7 @@ class TagUpdate(LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
     permission_required = 'organizers.change_tag'
 
 
-class TagDelete(LoginRequiredMixin, DeleteView):
+class TagDelete(LoginRequiredMixin, CachedObjectMixin, DeleteView):
     """Tag delete view"""
     template_name = 'tag/tag_confirm_delete.html'
     model = Tag
@@ -69,15 +79,21 @@ class StartupList(PageLinksMixin, ListView):
     template_name = 'startup/startup_list.html'
     paginate_by = 5
     page_kwarg = 'page'
+    keyset_pagination = True
     model = Startup
 
 
-class StartupDetail(DetailView):
+class StartupDetail(ConditionalGetMixin, CachedObjectMixin,
+                    DetailView):
     """Startup detail view"""
     template_name = 'startup/startup_detail.html'
-    queryset = Startup.objects. \
-        prefetch_related('tags') \
-        .prefetch_related('newslink_set')
+    # The tags and newslinks are rendered inside
+    # cached fragments, so they are loaded lazily
+    # and only on a cache miss.
+    model = Startup
+
+    def get_conditional_state(self, request, *args, **kwargs):
+        return startup_state(slug=kwargs.get(self.slug_url_kwarg))
 
 
 class StartupCreate(LoginRequiredMixin, CreateView):
@@ -86,14 +102,14 @@ class StartupCreate(LoginRequiredMixin, CreateView):
     template_name = 'startup/startup_form.html'
 
 
-class StartupUpdate(LoginRequiredMixin, UpdateView):
+class StartupUpdate(LoginRequiredMixin, CachedObjectMixin, UpdateView):
     """startup update view"""
     form_class = StartupForm
     model = Startup
     template_name = 'startup/startup_form_update.html'
 
 
-class StartupDelete(LoginRequiredMixin, DeleteView):
+class StartupDelete(LoginRequiredMixin, CachedObjectMixin, DeleteView):
     """Startup delete view"""
     model = Startup
     template_name = 'startup/startup_confirm_delete.html'
@@ -124,6 +140,7 @@ class NewsLinkCreate(LoginRequiredMixin, NewsLinkGetObjectMixin,
             self.startup_slug_url_kwarg
         )
         self.startup = get_object_or_404(Startup,
+                                         (startup_slug,),
                                          slug__iexact=startup_slug)
         initial = {
             self.startup_context_object_name: self.startup,
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class RelatedConfig(AppConfig):
+    name = 'related'
+
+    def ready(self):
+        import related.signals
@@ -0,0 +1,314 @@
+"""
+Related posts and startups, by co-occurrence.
+
+Two posts are related by the tags and the
+startups they share, including the tags
+propagated from their startups, see
+blogs.tagging. Two startups are related by the
+tags they share and the posts mentioning both.
+Each shared feature counts for its inverse
+document frequency, log((N + 1) / df), so a tag
+found on most posts counts for little, and
+features on more than RELATED_MAX_ITEMS items
+are left out altogether.
+
+The scores are computed from a sparse matrix of
+items by features, kept in arrays: the features
+of each item and the items of each feature, the
+posting lists. Scoring an item walks the posting
+lists of its features only, and the best
+RELATED_KEEP neighbours of each item are stored
+in RelatedPost and RelatedStartup. A page then
+reads its k neighbours with one indexed query,
+without any similarity SQL.
+
+When a through table changes, only the items
+sharing a feature with the change are scored
+again, in a background thread once the
+transaction commits, as done for the feeds in
+core.feeds. The rebuild_related command scores
+every item, e.g. after loading data without
+signals.
+"""
+import heapq
+import logging
+import math
+from array import array
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from blogs.models import Post
+from core.fragments import invalidate_fragments
+from organizers.models import Startup
+
+from .models import RelatedPost, RelatedStartup
+
+logger = logging.getLogger(__name__)
+
+# The rows of through linking an item, in
+# item_field, to one of its features, named
+# kind, in feature_field.
+Feature = namedtuple(
+    'Feature', 'through item_field feature_field kind'
+)
+# The items of model, whose neighbours are
+# stored in table, by the source field.
+Relation = namedtuple('Relation', 'model table source features')
+
+RELATIONS = {
+    'post': Relation(Post, RelatedPost, 'post', [
+        Feature(Post.tags.through, 'post_id', 'tag_id', 'tag'),
+        Feature(Post.startups.through, 'post_id', 'startup_id', 'startup'),
+    ]),
+    'startup': Relation(Startup, RelatedStartup, 'startup', [
+        Feature(Startup.tags.through, 'startup_id', 'tag_id', 'tag'),
+        Feature(Post.startups.through, 'startup_id', 'post_id', 'post'),
+    ]),
+}
+
+# A single worker scores the items changed,
+# one update after the other, off the
+# request path.
+_executor = ThreadPoolExecutor(max_workers=1)
+
+CHUNK_SIZE = 500
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), CHUNK_SIZE):
+        yield values[start:start + CHUNK_SIZE]
+
+
+def feature_model(feature):
+    return feature.through._meta.get_field(
+        feature.feature_field[:-len('_id')]
+    ).related_model
+
+
+def max_items():
+    return getattr(settings, 'RELATED_MAX_ITEMS', 1000)
+
+
+class CoOccurrence:
+    """
+    Sparse matrix of items by features. The
+    features are numbered, codes maps each
+    (kind, pk) to its number. features holds
+    the numbers of the features of each item
+    and items the ids of the items of each
+    feature, both in arrays.
+    """
+
+    def __init__(self, item_count):
+        self.item_count = item_count
+        self.codes = {}
+        self.features = defaultdict(lambda: array('l'))
+        self.items = []
+
+    def add(self, item, feature):
+        code = self.codes.get(feature)
+        if code is None:
+            code = self.codes[feature] = len(self.items)
+            self.items.append(array('l'))
+        self.features[item].append(code)
+        self.items[code].append(item)
+
+    @classmethod
+    def load(cls, relation, items=None):
+        """
+        Method to load the matrix of every
+        item of relation or, when items is
+        given, of these items along with the
+        complete posting lists of their
+        features, all scoring them needs.
+        :param relation:
+        :param items: ids
+        :return: CoOccurrence
+        """
+        matrix = cls(relation.model.objects.count())
+        for feature in relation.features:
+            rows = feature.through.objects.order_by()
+            if items is None:
+                chunks = [rows]
+            else:
+                values = set()
+                for chunk in _chunks(items):
+                    values.update(rows.filter(**{
+                        '{}__in'.format(feature.item_field): chunk
+                    }).values_list(feature.feature_field, flat=True))
+                chunks = (
+                    rows.filter(**{
+                        '{}__in'.format(feature.feature_field): chunk
+                    })
+                    for chunk in _chunks(values)
+                )
+            for chunk in chunks:
+                for item, value in chunk.values_list(
+                        feature.item_field,
+                        feature.feature_field).iterator():
+                    matrix.add(item, (feature.kind, value))
+        return matrix
+
+    def weight(self, code):
+        count = len(self.items[code])
+        if count > max_items():
+            return 0.0
+        return math.log((self.item_count + 1) / count)
+
+    def neighbours(self, item, keep):
+        """
+        Method to return the keep items sharing
+        the most features with item, best first,
+        as (item, score) pairs.
+        :param item:
+        :param keep:
+        :return: list
+        """
+        scores = defaultdict(float)
+        for code in self.features.get(item, ()):
+            weight = self.weight(code)
+            if not weight:
+                continue
+            for other in self.items[code]:
+                if other != item:
+                    scores[other] += weight
+        return heapq.nlargest(
+            keep, scores.items(), key=lambda pair: (pair[1], pair[0])
+        )
+
+
+def _stored(relation, items):
+    """
+    Function to return the neighbours stored
+    for items, best first, by item.
+    :param relation:
+    :param items:
+    :return: dict
+    """
+    source_id = '{}_id'.format(relation.source)
+    stored = defaultdict(list)
+    for chunk in _chunks(items):
+        rows = relation.table.objects.filter(**{
+            '{}__in'.format(source_id): chunk
+        }).order_by(source_id, '-score', '-related_id').values_list(
+            source_id, 'related_id'
+        )
+        for item, related in rows:
+            stored[item].append(related)
+    return stored
+
+
+def update_related(name, items=None):
+    """
+    Function to score the items of the
+    relation name again, or every item when
+    items is None, and to store their best
+    neighbours. The fragments of the items
+    whose neighbours changed are invalidated.
+    :param name: 'post' or 'startup'
+    :param items: ids
+    :return: number of items whose neighbours changed
+    """
+    relation = RELATIONS[name]
+    matrix = CoOccurrence.load(relation, items)
+    if items is None:
+        items = relation.model.objects.values_list('pk', flat=True)
+    else:
+        # skip the items deleted in the meantime
+        existing = set()
+        for chunk in _chunks(items):
+            existing.update(relation.model.objects.filter(
+                pk__in=chunk
+            ).values_list('pk', flat=True))
+        items = existing
+    keep = getattr(settings, 'RELATED_KEEP', 10)
+    neighbours = {
+        item: matrix.neighbours(item, keep) for item in items
+    }
+    stored = _stored(relation, neighbours)
+    changed = [
+        item for item, pairs in neighbours.items()
+        if [other for other, score in pairs] != stored.get(item, [])
+    ]
+    source_id = '{}_id'.format(relation.source)
+    with transaction.atomic():
+        for chunk in _chunks(changed):
+            relation.table.objects.filter(**{
+                '{}__in'.format(source_id): chunk
+            }).delete()
+        relation.table.objects.bulk_create(
+            (
+                relation.table(**{
+                    source_id: item,
+                    'related_id': other,
+                    'score': score,
+                })
+                for item in changed
+                for other, score in neighbours[item]
+            ),
+            batch_size=1000
+        )
+        invalidate_fragments(relation.model, changed)
+    return len(changed)
+
+
+def items_with(feature, values):
+    """
+    Function to return the items having one
+    of the features of values, leaving out
+    the features on too many items to count.
+    :param feature:
+    :param values: pks of the features
+    :return: set of ids
+    """
+    by_value = defaultdict(list)
+    rows = feature.through.objects.order_by()
+    for chunk in _chunks(values):
+        for item, value in rows.filter(**{
+            '{}__in'.format(feature.feature_field): chunk
+        }).values_list(feature.item_field, feature.feature_field):
+            by_value[value].append(item)
+    return {
+        item for items in by_value.values()
+        if len(items) <= max_items()
+        for item in items
+    }
+
+
+def _update(name, items, features):
+    try:
+        relation = RELATIONS[name]
+        items = set(items)
+        for feature in relation.features:
+            values = features.get(feature.kind)
+            if values:
+                items |= items_with(feature, values)
+        if items:
+            update_related(name, items)
+    except Exception:
+        logger.exception('Could not update related %ss', name)
+    finally:
+        # the worker thread has its own connections
+        connections.close_all()
+
+
+def schedule_update(name, items=(), **features):
+    """
+    Function to score again, once the current
+    transaction commits, the items given and
+    the items having the features given, by
+    kind, e.g. tag=[tag pks].
+    :param name: 'post' or 'startup'
+    :param items: ids
+    :param features: lists of pks, by kind
+    :return:
+    """
+    items = list(items)
+    features = {kind: list(values) for kind, values in features.items()}
+    transaction.on_commit(
+        lambda: _executor.submit(_update, name, items, features)
+    )
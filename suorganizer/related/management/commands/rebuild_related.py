@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from ...engine import RELATIONS, update_related
+
+
+class Command(BaseCommand):
+    """
+    Command class to score every post and
+    startup again and store their related
+    items, see related.engine. The related
+    items are kept up to date by signals,
+    this is needed once the app is
+    installed and after loading data
+    without signals, e.g. with loaddata or
+    the importer.
+    """
+    help = 'Rebuild the related posts and startups.'
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        for name, relation in RELATIONS.items():
+            changed = update_related(name)
+            self.stdout.write(
+                'Updated the related items of {} {}.'.format(
+                    changed, relation.model._meta.verbose_name_plural
+                )
+            )
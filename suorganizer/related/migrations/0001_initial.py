@@ -0,0 +1,51 @@
+# Generated by Django 3.1.1 on 2026-10-18 12:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('organizers', '0011_slug_indexes'),
+        ('blogs', '0010_post_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedStartup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizers.startup')),
+                ('startup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_startups', to='organizers.startup')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_posts', to='blogs.post')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blogs.post')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='relatedstartup',
+            index=models.Index(fields=['startup', '-score'], name='related_rel_startup_85b6a5_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='relatedstartup',
+            unique_together={('startup', 'related')},
+        ),
+        migrations.AddIndex(
+            model_name='relatedpost',
+            index=models.Index(fields=['post', '-score'], name='related_rel_post_id_d47ff8_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='relatedpost',
+            unique_together={('post', 'related')},
+        ),
+    ]
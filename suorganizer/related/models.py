@@ -0,0 +1,64 @@
+from django.db import models
+
+from blogs.models import Post
+from organizers.models import Startup
+
+
+class RelatedPost(models.Model):
+    """
+    A post shown as related to another
+    post, see related.engine. Only the
+    best RELATED_KEEP posts are stored
+    for each post.
+    """
+    post = models.ForeignKey(
+        Post,
+        related_name='related_posts',
+        on_delete=models.CASCADE
+    )
+    related = models.ForeignKey(
+        Post,
+        related_name='+',
+        on_delete=models.CASCADE
+    )
+    score = models.FloatField()
+
+    def __str__(self):
+        return 'Post {} related to post {}'.format(
+            self.related_id, self.post_id
+        )
+
+    class Meta:
+        unique_together = ('post', 'related')
+        indexes = [
+            models.Index(fields=['post', '-score']),
+        ]
+
+
+class RelatedStartup(models.Model):
+    """
+    A startup shown as related to another
+    startup, see related.engine.
+    """
+    startup = models.ForeignKey(
+        Startup,
+        related_name='related_startups',
+        on_delete=models.CASCADE
+    )
+    related = models.ForeignKey(
+        Startup,
+        related_name='+',
+        on_delete=models.CASCADE
+    )
+    score = models.FloatField()
+
+    def __str__(self):
+        return 'Startup {} related to startup {}'.format(
+            self.related_id, self.startup_id
+        )
+
+    class Meta:
+        unique_together = ('startup', 'related')
+        indexes = [
+            models.Index(fields=['startup', '-score']),
+        ]
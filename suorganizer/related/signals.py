@@ -0,0 +1,134 @@
+"""
+Signal module for related.
+The items are scored again, in the background,
+when the through tables they are related by
+change, see related.engine.
+"""
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from blogs.tagging import startup_tags_propagated
+from core.fragments import invalidate_fragments, m2m_changed_pks
+
+from .engine import RELATIONS, feature_model, items_with, schedule_update
+
+
+def features_changed(name, feature):
+    """
+    Function to build the m2m_changed receiver
+    of a feature of the relation name, on
+    either side of its through table.
+    :param name:
+    :param feature:
+    :return: receiver
+    """
+    item_model = RELATIONS[name].model
+
+    def changed(sender, instance, action, model, pk_set, **kwargs):
+        if action not in ('post_add', 'post_remove', 'pre_clear'):
+            return
+        pks = m2m_changed_pks(sender, instance, model, action, pk_set)
+        if not pks:
+            return
+        if isinstance(instance, item_model):
+            items, values = [instance.pk], pks
+        else:
+            items, values = pks, [instance.pk]
+        schedule_update(name, items, **{feature.kind: values})
+
+    return changed
+
+
+for name, relation in RELATIONS.items():
+    for feature in relation.features:
+        m2m_changed.connect(
+            features_changed(name, feature),
+            sender=feature.through,
+            weak=False,
+            dispatch_uid='related.{}.{}'.format(name, feature.kind)
+        )
+
+
+@receiver(startup_tags_propagated)
+def propagated_tags(sender, tag_pks, **kwargs):
+    """
+    Function to score again the posts of the
+    tags propagated from their startups, as
+    the rows are inserted without sending
+    m2m_changed.
+    :param sender:
+    :param tag_pks:
+    :param kwargs:
+    :return:
+    """
+    schedule_update('post', tag=tag_pks)
+
+
+def deleted_feature(sender, instance, **kwargs):
+    """
+    Function to score again the items related
+    to an item being deleted and the items
+    having a feature being deleted, found
+    before the rows are removed with it.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    for name, relation in RELATIONS.items():
+        items = set()
+        if sender is relation.model:
+            items.update(relation.table.objects.filter(
+                related=instance
+            ).values_list('{}_id'.format(relation.source), flat=True))
+        for feature in relation.features:
+            if sender is feature_model(feature):
+                items |= items_with(feature, [instance.pk])
+        if items:
+            schedule_update(name, items)
+
+
+def renamed_item(sender, instance, raw=False, **kwargs):
+    """
+    Function to invalidate the fragments of
+    the items listing a saved item among
+    their related items, which show its name.
+    :param sender:
+    :param instance:
+    :param raw:
+    :param kwargs:
+    :return:
+    """
+    for relation in RELATIONS.values():
+        if sender is relation.model and not raw:
+            invalidate_fragments(
+                relation.model,
+                relation.table.objects.filter(
+                    related=instance
+                ).values_list('{}_id'.format(relation.source), flat=True)
+            )
+
+
+# Only the items and features of the
+# relations are connected, saves and
+# deletes of other models don't call
+# the receivers.
+deleted_models = set()
+for relation in RELATIONS.values():
+    deleted_models.add(relation.model)
+    deleted_models.update(
+        feature_model(feature) for feature in relation.features
+    )
+    post_save.connect(
+        renamed_item,
+        sender=relation.model,
+        dispatch_uid='related.renamed.{}'.format(
+            relation.model._meta.label_lower
+        )
+    )
+for model in deleted_models:
+    pre_delete.connect(
+        deleted_feature,
+        sender=model,
+        dispatch_uid='related.deleted.{}'.format(model._meta.label_lower)
+    )
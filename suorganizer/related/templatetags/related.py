@@ -0,0 +1,51 @@
+"""
+Template tags listing the related posts
+and startups stored by related.engine,
+each with one indexed query.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.template import Library
+
+from ..models import RelatedPost, RelatedStartup
+
+register = Library()
+
+
+def _count(count):
+    return count or getattr(settings, 'RELATED_COUNT', 5)
+
+
+@register.simple_tag
+def related_posts(post, count=None):
+    """
+    Tag returning the published posts most
+    related to post, e.g.
+    {% related_posts post as related_list %}
+    :param post:
+    :param count:
+    :return: list of posts
+    """
+    return [
+        related.related for related in RelatedPost.objects.filter(
+            post=post,
+            related__pub_date__lte=date.today()
+        ).select_related('related').order_by('-score')[:_count(count)]
+    ]
+
+
+@register.simple_tag
+def related_startups(startup, count=None):
+    """
+    Tag returning the startups most related
+    to startup.
+    :param startup:
+    :param count:
+    :return: list of startups
+    """
+    return [
+        related.related for related in RelatedStartup.objects.filter(
+            startup=startup
+        ).select_related('related').order_by('-score')[:_count(count)]
+    ]
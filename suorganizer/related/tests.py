@@ -0,0 +1,118 @@
+from datetime import date
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from organizers.models import NewsLink, Startup, Tag
+
+from .engine import RELATIONS, CoOccurrence, update_related
+from .models import RelatedStartup
+
+
+class CoOccurrenceTest(SimpleTestCase):
+    """
+    Tests of the scores of the items
+    sharing features, see engine.py
+    """
+
+    def matrix(self):
+        # item 1 shares a rare tag with item 2,
+        # and a common tag with items 3 and 4
+        matrix = CoOccurrence(item_count=4)
+        for item, tag in ((1, 'rare'), (2, 'rare'), (1, 'common'),
+                          (3, 'common'), (4, 'common')):
+            matrix.add(item, ('tag', tag))
+        return matrix
+
+    def test_rare_features_count_more(self):
+        neighbours = self.matrix().neighbours(1, keep=3)
+        self.assertEqual([item for item, score in neighbours], [2, 4, 3])
+        self.assertGreater(neighbours[0][1], neighbours[1][1])
+        self.assertEqual(neighbours[1][1], neighbours[2][1])
+
+    def test_keep_limits_the_neighbours(self):
+        self.assertEqual(len(self.matrix().neighbours(1, keep=1)), 1)
+        self.assertEqual(self.matrix().neighbours(5, keep=3), [])
+
+    @override_settings(RELATED_MAX_ITEMS=2)
+    def test_features_on_too_many_items_are_left_out(self):
+        neighbours = self.matrix().neighbours(1, keep=3)
+        self.assertEqual([item for item, score in neighbours], [2])
+
+
+class RelatedStartupTest(TestCase):
+    """
+    Tests of the related startups stored
+    by update_related and of the receivers
+    scheduling their updates.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rare = Tag.objects.create(name='Rare', slug='rare')
+        cls.common = Tag.objects.create(name='Common', slug='common')
+        cls.startups = []
+        for number, tags in enumerate((
+                [cls.rare, cls.common], [cls.rare], [cls.common],
+                [cls.common])):
+            startup = Startup.objects.create(
+                name='Related {}'.format(number),
+                slug='related-{}'.format(number),
+                description='A related startup.',
+                founded_date=date(2020, 1, 1),
+                contact='related@example.com',
+                website='https://example.com/',
+            )
+            startup.tags.set(tags)
+            cls.startups.append(startup)
+
+    def related(self, startup):
+        return list(
+            RelatedStartup.objects.filter(startup=startup).order_by(
+                '-score', '-related_id'
+            ).values_list('related__slug', flat=True)
+        )
+
+    def test_neighbours_are_stored(self):
+        pks = [startup.pk for startup in self.startups]
+        self.assertEqual(update_related('startup', pks), 4)
+        self.assertEqual(
+            self.related(self.startups[0]),
+            ['related-1', 'related-3', 'related-2']
+        )
+        self.assertEqual(self.related(self.startups[1]), ['related-0'])
+        # nothing changed, nothing is written
+        self.assertEqual(update_related('startup', pks), 0)
+
+    def test_changed_tags_schedule_an_update(self):
+        with mock.patch('related.signals.schedule_update') as schedule:
+            self.startups[1].tags.add(self.common)
+        schedule.assert_called_once_with(
+            'startup', [self.startups[1].pk], tag={self.common.pk}
+        )
+
+    def test_deleted_tag_schedules_an_update(self):
+        with mock.patch('related.signals.schedule_update') as schedule:
+            self.rare.delete()
+        schedule.assert_any_call(
+            'startup', {self.startups[0].pk, self.startups[1].pk}
+        )
+
+    def test_other_models_are_not_looked_at(self):
+        newslink = NewsLink.objects.create(
+            title='Related news', slug='related-news',
+            pub_date=date(2020, 1, 1), link='https://example.com/news',
+            startup=self.startups[0],
+        )
+        relations = mock.MagicMock(wraps=RELATIONS)
+        with mock.patch('related.signals.RELATIONS', relations):
+            newslink.title = 'Renamed news'
+            newslink.save()
+            newslink.delete()
+            relations.items.assert_not_called()
+            relations.values.assert_not_called()
+            self.startups[3].delete()
+            relations.items.assert_called_once_with()
+            relations.values.assert_not_called()
+            self.startups[2].save()
+            relations.values.assert_called_once_with()
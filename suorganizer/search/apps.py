@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def clear_backend_cache(**kwargs):
+    from .backends import backend_class
+    backend_class.cache_clear()
+
+
+class SearchConfig(AppConfig):
+    name = 'search'
+
+    def ready(self):
+        import search.signals
+        # migrations add or drop the full text index
+        post_migrate.connect(clear_backend_cache, sender=self)
@@ -0,0 +1,199 @@
+"""
+Full text search backends.
+
+The full text index over SearchDocument is
+built by the database itself:
+- On PostgreSQL the migration adds a tsvector
+  column, weighting the title above the body,
+  with a GIN index over it. The column is
+  generated on PostgreSQL 12 and later, and
+  set by a trigger on older servers.
+- On SQLite it creates an FTS5 virtual table
+  kept in sync with triggers.
+Which backend is used depends on the database
+the documents are stored in, and is looked up
+once per database, see get_backend. If neither index
+exists, e.g. SQLite built without FTS5, the
+SimpleSearchBackend scans the documents and
+ranks them in Python.
+"""
+import re
+from datetime import date
+from functools import lru_cache
+
+from django.db import connections, router
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import SearchDocument
+
+FTS_TABLE = 'search_fts'
+SEARCH_CONFIG = 'english'
+
+
+class BaseSearchBackend:
+    """
+    Base class of the search backends.
+    Subclasses implement matches(), returning
+    the documents matching the query, best
+    match first.
+    """
+
+    def __init__(self, using):
+        self.using = using
+
+    def documents(self, published_only):
+        documents = SearchDocument.objects.using(self.using)
+        if published_only:
+            documents = documents.filter(
+                Q(pub_date__isnull=True)
+                | Q(pub_date__lte=date.today())
+            )
+        return documents
+
+    def search(self, query, limit=50, published_only=True):
+        """
+        Method to return at most limit
+        documents matching query, ranked.
+        :param query:
+        :param limit:
+        :param published_only:
+        :return: list of SearchDocument
+        """
+        query = query.strip()
+        if not query:
+            return []
+        return self.matches(query, limit, published_only)
+
+    def matches(self, query, limit, published_only):
+        raise NotImplementedError(
+            'Subclasses of BaseSearchBackend must '
+            'implement matches()'
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Backend using the tsvector column and
+    its GIN index, ranking with ts_rank_cd.
+    The query is parsed with
+    websearch_to_tsquery, so it accepts
+    "quoted phrases", OR and -excluded words.
+    """
+
+    def matches(self, query, limit, published_only):
+        tsquery = "websearch_to_tsquery('{}', %s)".format(
+            SEARCH_CONFIG
+        )
+        return list(
+            self.documents(published_only).filter(
+                RawSQL(
+                    'vector @@ {}'.format(tsquery), (query,),
+                    output_field=BooleanField()
+                )
+            ).annotate(
+                rank=RawSQL(
+                    'ts_rank_cd(vector, {})'.format(tsquery),
+                    (query,), output_field=FloatField()
+                )
+            ).order_by('-rank')[:limit]
+        )
+
+
+class SqliteSearchBackend(BaseSearchBackend):
+    """
+    Backend using the FTS5 table, ranking
+    with bm25, where a match in the title
+    counts ten times a match in the body.
+    Every word of the query is quoted so
+    that user input can't be read as FTS5
+    query syntax.
+    """
+
+    def matches(self, query, limit, published_only):
+        words = re.findall(r'\w+', query)
+        if not words:
+            return []
+        match = ' '.join('"{}"'.format(word) for word in words)
+        table = SearchDocument._meta.db_table
+        sql = (
+            'SELECT {table}.*, bm25({fts}, 10.0, 1.0) AS rank '
+            'FROM {fts} JOIN {table} ON {table}.id = {fts}.rowid '
+            'WHERE {fts} MATCH %s'
+        ).format(table=table, fts=FTS_TABLE)
+        params = [match]
+        if published_only:
+            sql += (
+                ' AND ({table}.pub_date IS NULL'
+                ' OR {table}.pub_date <= %s)'.format(table=table)
+            )
+            params.append(date.today())
+        # bm25 scores are negative, best first
+        sql += ' ORDER BY rank LIMIT %s'
+        params.append(limit)
+        return list(
+            SearchDocument.objects.using(self.using).raw(sql, params)
+        )
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    Fallback backend, used when the database
+    has no full text index. Every word must
+    appear in the title or body, and the
+    documents are ranked in Python by the
+    number of occurrences, counting a title
+    occurrence ten times.
+    This scans the whole table, it is only
+    meant for development and tests.
+    """
+    title_weight = 10
+
+    def matches(self, query, limit, published_only):
+        words = [word.lower() for word in re.findall(r'\w+', query)]
+        documents = self.documents(published_only)
+        for word in words:
+            documents = documents.filter(
+                Q(title__icontains=word) | Q(body__icontains=word)
+            )
+
+        def rank(document):
+            title = document.title.lower()
+            body = document.body.lower()
+            return sum(
+                self.title_weight * title.count(word) + body.count(word)
+                for word in words
+            )
+
+        return sorted(documents, key=rank, reverse=True)[:limit]
+
+
+@lru_cache(maxsize=None)
+def backend_class(using):
+    """
+    Function to return the search backend
+    class for the database using. The tables
+    are only listed once per database, the
+    cache is cleared after migrations, see
+    apps.py.
+    :param using:
+    :return:
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend
+    if (connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()):
+        return SqliteSearchBackend
+    return SimpleSearchBackend
+
+
+def get_backend():
+    """
+    Function to return the search backend
+    for the database the documents are read
+    from.
+    :return:
+    """
+    using = router.db_for_read(SearchDocument)
+    return backend_class(using)(using)
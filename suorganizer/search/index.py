@@ -0,0 +1,126 @@
+"""
+Module defining what is indexed for the site
+search and keeping the SearchDocument rows in
+sync with the indexed objects.
+"""
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+
+from .models import SearchDocument
+
+# For each indexed model, the fields holding
+# the document title and the document body.
+INDEXED_MODELS = {
+    'blogs.post': ('title', 'text'),
+    'organizers.startup': ('name', 'description'),
+    'organizers.tag': ('name', None),
+    'organizers.newslink': ('title', None),
+}
+
+
+def indexed_models():
+    """
+    Function to return the indexed
+    model classes.
+    :return:
+    """
+    return [apps.get_model(label) for label in INDEXED_MODELS]
+
+
+def is_indexed(model):
+    label = model._meta.label_lower
+    # the historical models of data migrations
+    # have the same label but are not indexed
+    return label in INDEXED_MODELS and apps.get_model(label) is model
+
+
+def build_document(obj, content_type=None):
+    """
+    Function to build the unsaved search
+    document for obj.
+    :param obj:
+    :param content_type:
+    :return: SearchDocument
+    """
+    title_field, body_field = INDEXED_MODELS[
+        obj._meta.label_lower
+    ]
+    if content_type is None:
+        content_type = ContentType.objects.get_for_model(obj)
+    pub_date = None
+    if obj._meta.label_lower == 'blogs.post':
+        pub_date = obj.pub_date
+    return SearchDocument(
+        content_type=content_type,
+        object_id=obj.pk,
+        title=getattr(obj, title_field),
+        body=getattr(obj, body_field) if body_field else '',
+        url=obj.get_absolute_url(),
+        pub_date=pub_date
+    )
+
+
+def index_object(obj):
+    """
+    Function to add obj to the index
+    or update its document.
+    :param obj:
+    :return:
+    """
+    document = build_document(obj)
+    SearchDocument.objects.update_or_create(
+        content_type=document.content_type,
+        object_id=document.object_id,
+        defaults={
+            'title': document.title,
+            'body': document.body,
+            'url': document.url,
+            'pub_date': document.pub_date,
+        }
+    )
+
+
+def remove_object(obj):
+    """
+    Function to remove the document
+    of obj from the index.
+    :param obj:
+    :return:
+    """
+    SearchDocument.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk
+    ).delete()
+
+
+def rebuild_model_index(model, batch_size=1000):
+    """
+    Function to rebuild the documents of
+    every object of model. The objects are
+    read with iterator() and the documents
+    are written with bulk_create, batch_size
+    rows at a time.
+    :param model:
+    :param batch_size:
+    :return: number of documents created
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    SearchDocument.objects.filter(
+        content_type=content_type
+    ).delete()
+    queryset = model.objects.all()
+    if model._meta.label_lower == 'organizers.newslink':
+        # the newslink url uses the startup slug
+        queryset = queryset.select_related('startup')
+    created = 0
+    batch = []
+    for obj in queryset.iterator(chunk_size=batch_size):
+        batch.append(build_document(obj, content_type))
+        if len(batch) >= batch_size:
+            SearchDocument.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        SearchDocument.objects.bulk_create(batch)
+        created += len(batch)
+    return created
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from ...index import indexed_models, rebuild_model_index
+
+
+class Command(BaseCommand):
+    """
+    Command class to rebuild the site
+    search index from scratch. The index
+    is kept up to date by signals, this
+    is only needed after loading data
+    without signals, e.g. with loaddata.
+    """
+    help = 'Rebuild the site search index.'
+
+    def add_arguments(self, parser):
+        """
+        Method that will receive the
+        command line arguments passed
+        by the user.
+        :param parser:
+        :return:
+        """
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=1000,
+            help='Number of documents written per query.'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Method to execute the command
+        :param args:
+        :param options:
+        :return:
+        """
+        for model in indexed_models():
+            created = rebuild_model_index(
+                model, batch_size=options['batch_size']
+            )
+            self.stdout.write(
+                'Indexed {} {}.'.format(
+                    created, model._meta.verbose_name_plural
+                )
+            )
@@ -0,0 +1,135 @@
+# Generated by Django 3.1.1 on 2026-10-18 12:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TABLE = 'search_searchdocument'
+FTS_TABLE = 'search_fts'
+
+# generated columns need PostgreSQL 12,
+# older servers fill the column by trigger
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}body, '')), 'B')"
+)
+POSTGRES_GENERATED = [
+    "ALTER TABLE {table} ADD COLUMN vector tsvector "
+    "GENERATED ALWAYS AS (" + POSTGRES_VECTOR.format(row='') + ") STORED",
+]
+POSTGRES_TRIGGER = [
+    'ALTER TABLE {table} ADD COLUMN vector tsvector',
+    'CREATE FUNCTION {table}_vector_update() RETURNS trigger AS $$ '
+    'BEGIN NEW.vector := ' + POSTGRES_VECTOR.format(row='NEW.') + '; '
+    'RETURN NEW; END $$ LANGUAGE plpgsql',
+    'CREATE TRIGGER {table}_vector BEFORE INSERT OR UPDATE '
+    'ON {table} FOR EACH ROW '
+    'EXECUTE PROCEDURE {table}_vector_update()',
+]
+POSTGRES_INDEX = [
+    'CREATE INDEX {table}_vector_gin ON {table} USING gin (vector)',
+]
+POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS {table}_vector_gin',
+    'DROP TRIGGER IF EXISTS {table}_vector ON {table}',
+    'DROP FUNCTION IF EXISTS {table}_vector_update()',
+    'ALTER TABLE {table} DROP COLUMN IF EXISTS vector',
+]
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE {fts} USING fts5("
+    "title, body, content='{table}', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN '
+    'INSERT INTO {fts}(rowid, title, body) '
+    'VALUES (new.id, new.title, new.body); END',
+    'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN '
+    "INSERT INTO {fts}({fts}, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    'CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN '
+    "INSERT INTO {fts}({fts}, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    'INSERT INTO {fts}(rowid, title, body) '
+    'VALUES (new.id, new.title, new.body); END',
+]
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS {fts}_ai',
+    'DROP TRIGGER IF EXISTS {fts}_ad',
+    'DROP TRIGGER IF EXISTS {fts}_au',
+    'DROP TABLE IF EXISTS {fts}',
+]
+
+
+def execute(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(
+            statement.format(table=TABLE, fts=FTS_TABLE)
+        )
+
+
+def has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def add_full_text_index(apps, schema_editor):
+    """
+    Create the tsvector column and GIN index
+    on PostgreSQL, or the FTS5 table on SQLite.
+    The column is generated on PostgreSQL 12
+    and later, and set by a trigger before.
+    Without FTS5, searches fall back to the
+    SimpleSearchBackend.
+    Run manage.py rebuild_search_index to
+    index the existing data.
+    :param apps:
+    :param schema_editor:
+    :return:
+    """
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        if connection.pg_version >= 120000:
+            execute(schema_editor, POSTGRES_GENERATED)
+        else:
+            execute(schema_editor, POSTGRES_TRIGGER)
+        execute(schema_editor, POSTGRES_INDEX)
+    elif connection.vendor == 'sqlite' and has_fts5(connection):
+        execute(schema_editor, SQLITE_FTS)
+
+
+def remove_full_text_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        execute(schema_editor, POSTGRES_DROP)
+    elif vendor == 'sqlite':
+        execute(schema_editor, SQLITE_DROP)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('url', models.CharField(max_length=255)),
+                ('pub_date', models.DateField(blank=True, null=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(
+            add_full_text_index,
+            remove_full_text_index
+        ),
+    ]
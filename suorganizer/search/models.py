@@ -0,0 +1,52 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    A row of the site search index.
+    Every indexed Post, Startup, Tag and
+    NewsLink has one document holding the
+    text that is searched, and the url
+    and title shown in the results, so a
+    search never has to load the objects
+    themselves.
+    The full text index over title and
+    body is not a django field. It is
+    created by the migration depending on
+    the database, see backends.py.
+    """
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE
+    )
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=255)
+    # Only set for posts, used to hide
+    # posts that are not published yet.
+    pub_date = models.DateField(
+        null=True, blank=True
+    )
+
+    def __str__(self):
+        return 'Search document for {}'.format(self.title)
+
+    class Meta:
+        unique_together = ('content_type', 'object_id')
+
+    def get_absolute_url(self):
+        return self.url
+
+    def kind(self):
+        """
+        Method to return the verbose
+        name of the indexed model. The
+        content type is read from
+        django's content type cache.
+        :return:
+        """
+        return ContentType.objects.get_for_id(
+            self.content_type_id
+        ).name
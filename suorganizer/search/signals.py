@@ -0,0 +1,47 @@
+"""
+Signal module for search.
+The index is updated as the indexed
+objects are saved and deleted.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .index import index_object, is_indexed, remove_object
+
+
+@receiver(post_save)
+def update_document(sender, instance, raw=False, **kwargs):
+    """
+    Function to index an object when it
+    is saved. Fixtures are loaded raw and
+    are indexed by the rebuild_search_index
+    command instead.
+    As newslink urls are built from the
+    startup slug, saving a startup also
+    updates the documents of its newslinks.
+    :param sender:
+    :param instance:
+    :param raw:
+    :param kwargs:
+    :return:
+    """
+    if raw or not is_indexed(sender):
+        return
+    index_object(instance)
+    if sender._meta.label_lower == 'organizers.startup':
+        for newslink in instance.newslink_set.all():
+            index_object(newslink)
+
+
+@receiver(post_delete)
+def delete_document(sender, instance, **kwargs):
+    """
+    Function to remove the document of a
+    deleted object from the index.
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    if is_indexed(sender):
+        remove_object(instance)
@@ -0,0 +1,188 @@
+from datetime import date, timedelta
+from unittest import skipUnless
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from blogs.models import Post
+from core.objectcache import local_cache
+from core.testing import QueryBudgetMixin
+from organizers.models import Tag
+from users.models import Profile, User
+
+from .backends import (
+    FTS_TABLE,
+    PostgresSearchBackend,
+    SimpleSearchBackend,
+    SqliteSearchBackend,
+    get_backend,
+)
+from .models import SearchDocument
+
+
+def has_fts_table():
+    return (connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names())
+
+
+class SearchBackendTestMixin:
+    """
+    Tests run against every search backend,
+    see backends.py. Subclasses set the
+    backend_class to test.
+    """
+    backend_class = None
+
+    @classmethod
+    def setUpTestData(cls):
+        content_type = ContentType.objects.get_for_model(Tag)
+
+        def document(pk, title, body='', pub_date=None):
+            return SearchDocument.objects.create(
+                content_type=content_type,
+                object_id=1000 + pk,
+                title=title,
+                body=body,
+                url='/search-test/{}/'.format(pk),
+                pub_date=pub_date
+            )
+
+        cls.in_body = document(
+            1, 'Weather report',
+            'A zephyr blew over the zephyr valley.'
+        )
+        cls.in_title = document(2, 'Zephyr', 'A light wind.')
+        cls.both_words = document(3, 'Zephyr gardens', 'Quiet lanes.')
+        cls.future = document(
+            4, 'Zephyr forecast', 'Not published yet.',
+            pub_date=date.today() + timedelta(days=1)
+        )
+        cls.other = document(5, 'Unrelated', 'Nothing to see.')
+        cls.many_words = document(6, 'Calm day', 'A breeze, then a breeze.')
+        cls.one_word = document(7, 'Windy day', 'A breeze.')
+        cls.today = document(
+            8, 'Gust warning', 'Published today.', pub_date=date.today()
+        )
+
+    def search(self, query, published_only=True):
+        return self.backend_class(connection.alias).search(
+            query, published_only=published_only
+        )
+
+    def test_title_match_ranks_first(self):
+        results = self.search('zephyr')
+        self.assertEqual(results[0], self.in_title)
+        self.assertEqual(
+            set(results), {self.in_title, self.in_body, self.both_words}
+        )
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search('zephyr gardens'), [self.both_words])
+        self.assertEqual(self.search('zephyr nowhere'), [])
+
+    def test_unpublished_documents(self):
+        self.assertNotIn(self.future, self.search('forecast zephyr'))
+        self.assertEqual(
+            self.search('forecast zephyr', published_only=False),
+            [self.future]
+        )
+
+    def test_more_matches_rank_first(self):
+        self.assertEqual(
+            self.search('breeze'), [self.many_words, self.one_word]
+        )
+
+    def test_documents_published_today(self):
+        self.assertEqual(self.search('gust'), [self.today])
+
+    def test_limit(self):
+        results = self.backend_class(connection.alias).search(
+            'zephyr', limit=1
+        )
+        self.assertEqual(results, [self.in_title])
+
+    def test_blank_query(self):
+        self.assertEqual(self.search('   '), [])
+
+
+class SimpleSearchBackendTest(SearchBackendTestMixin, TestCase):
+    backend_class = SimpleSearchBackend
+
+
+class SqliteSearchBackendTest(SearchBackendTestMixin, TestCase):
+    backend_class = SqliteSearchBackend
+
+    def setUp(self):
+        if not has_fts_table():
+            self.skipTest('Needs SQLite with FTS5')
+
+    def test_backend_is_used(self):
+        self.assertIsInstance(get_backend(), SqliteSearchBackend)
+        # the tables are listed once per database
+        with self.assertNumQueries(0):
+            self.assertIsInstance(get_backend(), SqliteSearchBackend)
+
+    def test_query_syntax_is_not_interpreted(self):
+        # FTS5 would read quotes, * and - as operators
+        self.assertEqual(
+            self.search('gardens* "zephyr" -lanes'), [self.both_words]
+        )
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Needs PostgreSQL')
+class PostgresSearchBackendTest(SearchBackendTestMixin, TestCase):
+    backend_class = PostgresSearchBackend
+
+    def test_backend_is_used(self):
+        self.assertIsInstance(get_backend(), PostgresSearchBackend)
+
+
+class SearchViewTest(TestCase):
+    """
+    Tests of the search page,
+    see views.py
+    """
+
+    def test_tag_is_found(self):
+        Tag.objects.create(name='Zephyr', slug='zephyr')
+        response = self.client.get(reverse('site_search'), {'q': 'zephyr'})
+        self.assertContains(response, '/tag/zephyr/')
+
+
+class SearchQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    Tests of the query budget of the
+    search results, see QUERY_BUDGETS.
+    Every post matches the query, so
+    queries repeated per result show up.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='reader@example.com', password='s3cret-Pa55word'
+        )
+        Profile.objects.create(
+            user=cls.user, slug='reader', name='Reader', about='Reads.'
+        )
+        tag = Tag.objects.create(name='Budget', slug='budget')
+        for n in range(5):
+            Post.objects.create(
+                title='Django post {}'.format(n), slug='post-{}'.format(n),
+                text='A post about Django.', author=cls.user,
+            ).tags.add(tag)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        local_cache.clear()
+        self.client.force_login(self.user)
+
+    def test_search(self):
+        response = self.assertWithinBudget(
+            reverse('site_search') + '?q=django', allow_n_plus_one=False
+        )
+        self.assertContains(response, 'Django Post 0')
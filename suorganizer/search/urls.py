@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import SearchResults
+
+urlpatterns = [
+    path('', SearchResults.as_view(), name='site_search'),
+]
@@ -0,0 +1,42 @@
+"""
+View module for search app
+"""
+from django.views.generic import ListView
+
+from .backends import get_backend
+
+
+class SearchResults(ListView):
+    """
+    View listing the documents matching
+    the q query parameter, best match
+    first. Unpublished posts are only
+    found by users allowed to view them.
+    """
+    template_name = 'search/search_results.html'
+    context_object_name = 'result_list'
+    query_kwarg = 'q'
+    limit = 50
+
+    def get_query(self):
+        return self.request.GET.get(self.query_kwarg, '')
+
+    def get_queryset(self):
+        """
+        Overriding the method to return
+        the ranked documents from the
+        search backend.
+        :return:
+        """
+        return get_backend().search(
+            self.get_query(),
+            limit=self.limit,
+            published_only=not self.request.user.has_perm(
+                'blogs.view_future_post'
+            )
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        return context
@@ -16,12 +16,13 @@ from django.core.exceptions import ImproperlyConfigured
 
 
 
-def get_env_variable(var_name):
+def get_env_variable(var_name, default=None):
     """
-    Get the environment variable or return exception
+    Get the environment variable, or default when
+    it is not set, or return exception
     """
     try:
-        return os.environ.get(var_name)
+        return os.environ.get(var_name, default)
     except KeyError:
         error_msg = 'Set the {} environment variable'.format(var_name)
         raise ImproperlyConfigured(error_msg)
@@ -59,6 +60,10 @@ INSTALLED_APPS = [
     'blogs.apps.BlogsConfig',
     'organizers.apps.OrganizersConfig',
     'contacts.apps.ContactsConfig',
+    'search.apps.SearchConfig',
+    'mailqueue.apps.MailqueueConfig',
+    'related.apps.RelatedConfig',
+    'export.apps.ExportConfig',
 ]
 """
 As the order of the middleware in response is
@@ -69,11 +74,14 @@ last.
 MIDDLEWARE = [
     'django.middleware.cache.UpdateCacheMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.ObjectCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.cache.FetchFromCacheMiddleware'
@@ -102,21 +110,25 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Templates are compiled once per process, and
+            # compiled again when their file changes when
+            # DEBUG is True, see core.loaders
             'loaders': [
-                'django.template.loaders.filesystem.Loader',
-                'django.template.loaders.app_directories.Loader',
-                # To cache any templates Django loads, we use
-                # the cached.Loader, passing in any of the loaders
-                # we want Django to use
-                # ('django.template.loaders.cached.Loader', [
-                #    'django.template.loaders.filesystem.Loader',
-                #   'django.template.loaders.app_directories.Loader',
-                # ]),
+                ('core.loaders.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
 ]
 
+# Compile every template when the process starts,
+# see core.loaders. Only server processes do, as
+# set by the wsgi and asgi modules, not management
+# commands or tests
+TEMPLATE_WARMUP = os.environ.get('TEMPLATE_WARMUP', '').lower() == 'true'
+
 WSGI_APPLICATION = 'suorganizer.wsgi.application'
 
 # Database
@@ -129,6 +141,18 @@ DATABASES = {
     }
 }
 
+# Reads of GET requests go to one of the
+# DATABASE_REPLICAS, see core.routers. Users who
+# wrote read the primary for REPLICA_STICKY_SECONDS,
+# replicas more than REPLICA_MAX_LAG seconds behind,
+# checked every REPLICA_CHECK_INTERVAL, are skipped
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_COOKIE = 'use_primary'
+REPLICA_STICKY_SECONDS = 10
+REPLICA_MAX_LAG = 5
+REPLICA_CHECK_INTERVAL = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -187,6 +211,112 @@ DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 AWS_DEFAULT_ACL = None
 AWS_S3_FILE_OVERWRITE = False
 
+# The site of the sitemaps and feeds rendered
+# outside of requests, created by the
+# 0001_sites_data migration of core
+SITE_ID = 1
+
+# The sitemaps, pre-rendered to SITEMAP_STORAGE,
+# see core.sitemaps. The files are replaced in one
+# request, so the storage overwrites them instead
+# of saving new names. The time a file was
+# written is cached SITEMAP_MODIFIED_TIMEOUT seconds
+SITEMAPS = 'suorganizer.sitemaps.sitemaps'
+SITEMAP_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+SITEMAP_STORAGE_OPTIONS = {'file_overwrite': True}
+SITEMAP_PROTOCOL = 'https'
+SITEMAP_MODIFIED_TIMEOUT = 60
+
+# Maximum number of queries per url name, for
+# a logged in user with a cold cache, enforced
+# in tests by core.testing.QueryBudgetMixin and
+# reported by core.middleware.QueryCountMiddleware
+QUERY_BUDGETS = {
+    'blogs_posts_list': 8,
+    'blogs_post_detail': 10,
+    'blogs_atom_feed': 4,
+    'blogs_rss_feed': 4,
+    'organizers_tag_list': 8,
+    'organizers_tag_detail': 10,
+    'organizers_startup_list': 8,
+    'organizers_startup_detail': 10,
+    'organizers_startup_atom_feed': 4,
+    'organizers_startup_rss_feed': 4,
+    'site_search': 8,
+    'sitemaps': 2,
+    'django.contrib.sitemaps.views.sitemap': 2,
+}
+# Number of times a query must be repeated
+# in a request to be reported as N+1
+QUERY_N_PLUS_ONE_THRESHOLD = 3
+
+# Mail is queued and sent by the send_queued_mail
+# command, with MAILQUEUE_BACKEND, see mailqueue.queue
+EMAIL_BACKEND = 'mailqueue.backends.QueueBackend'
+MAILQUEUE_BACKEND = 'mailqueue.backends.PooledSMTPBackend'
+MAILQUEUE_MAX_ATTEMPTS = 5
+# seconds, doubled after each failed attempt
+MAILQUEUE_RETRY_DELAY = 60
+MAILQUEUE_MAX_RETRY_DELAY = 3600
+# SMTP connections kept open per process,
+# see mailqueue.smtp
+MAILQUEUE_SMTP_POOL_SIZE = 4
+MAILQUEUE_SMTP_POOL_IDLE = 60
+MAILQUEUE_SMTP_POOL_CHECK = 10
+
+# Feeds are cached until they are rendered again,
+# or for FEED_CACHE_TIMEOUT seconds at most, see
+# core.feeds
+FEED_CACHE_TIMEOUT = 3600
+
+# Serve the public read only views and the feeds
+# with their async variants, see core.asyncviews.
+# Only worth it under ASGI, e.g. uvicorn with
+# suorganizer.asgi:application
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '').lower() == 'true'
+
+# Sampling profiler, see core.profiling. Profile
+# a fraction of all requests with PROFILING_SAMPLE_RATE
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get('PROFILING_SAMPLE_RATE') or 0
+)
+# seconds between two samples
+PROFILING_INTERVAL = 0.005
+PROFILING_KEEP = 100
+
+# Objects looked up by slug are cached per request,
+# in the process and in the OBJECT_CACHE_ALIAS cache,
+# see core.objectcache. Other processes may serve a
+# changed object for up to OBJECT_CACHE_LOCAL_TTL seconds
+OBJECT_CACHE_ALIAS = 'default'
+OBJECT_CACHE_TIMEOUT = 300
+OBJECT_CACHE_LOCAL_TTL = 5
+OBJECT_CACHE_LOCAL_SIZE = 1000
+
+# Related posts and startups, see related.engine.
+# RELATED_COUNT are shown out of the RELATED_KEEP
+# stored, features on more than RELATED_MAX_ITEMS
+# items are not counted
+RELATED_COUNT = 5
+RELATED_KEEP = 10
+RELATED_MAX_ITEMS = 1000
+
+# Pages of the export api, see export.views, with
+# EXPORT_PAGE_SIZE records by default, read from the
+# database EXPORT_CHUNK_SIZE rows at a time. Pages of
+# anonymous users have EXPORT_ANONYMOUS_PAGE_SIZE
+# records at most
+EXPORT_PAGE_SIZE = 1000
+EXPORT_MAX_PAGE_SIZE = 100000
+EXPORT_ANONYMOUS_PAGE_SIZE = 100
+EXPORT_CHUNK_SIZE = 2000
+
+# Admin changelists of large tables, see core.admin.
+# Rows are counted only when the planner estimates
+# fewer than ADMIN_EXACT_COUNT_LIMIT of them
+ADMIN_PERFORMANCE_MODE = True
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
 # Replacing the auth user model with our own
 AUTH_USER_MODEL = 'users.user'
 
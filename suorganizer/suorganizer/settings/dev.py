@@ -3,6 +3,9 @@ from ..log_filters import ManagementFilter
 import socket
 
 DEBUG = True
+# Templates are compiled when first used and
+# again when they change, see core.loaders
+TEMPLATE_WARMUP = False
 
 ALLOWED_HOSTS = ['app', '127.0.0.1']
 
@@ -17,15 +20,14 @@ DATABASES = {
         # 'OPTIONS': {'sslmode': 'verify-full'},
     }
 }
-# Dev email settings, enables email output to the console
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Dev email settings, the queued mail is output to the console
+MAILQUEUE_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 SERVER_EMAIL = 'contact@django-unleashed.com'
 DEFAULT_FROM_EMAIL = 'no-reply@django-unleashed.com'
 EMAIL_SUBJECT_PREFIX = '[Startup Organizer]'
 MANAGERS = (
     ('Us', 'ourselves@django-unleashed.com'),
 )
-SITE_ID = 1
 # Auth app settings
 # Redirect to blogs_post_list view
 LOGIN_REDIRECT_URL = 'blogs_posts_list'
@@ -69,6 +71,9 @@ LOGGING = {
 # django-debug-toolbar
 INSTALLED_APPS += ('debug_toolbar',)
 MIDDLEWARE += ()
+# Query counts and N+1 detection, first so that
+# the queries of the other middleware count too
+MIDDLEWARE = ['core.middleware.QueryCountMiddleware'] + MIDDLEWARE
 socket_hostname = socket.gethostname()
 container_ip = socket.gethostbyname(socket_hostname)
 INTERNAL_IPS = [container_ip]
@@ -3,12 +3,47 @@ from .base import *
 DEBUG = False
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        # postgresql with pooled connections
+        'ENGINE': 'core.db.postgresql',
         'NAME': get_env_variable('PGSQL_DB_NAME'),
         'USER': get_env_variable('PGSQL_DB_USER'),
         'PASSWORD': get_env_variable('PGSQL_DB_PASW'),
         'HOST': get_env_variable('PGSQL_DB_HOST'),
         'PORT': get_env_variable('PGSQL_DB_PORT'),
         # 'OPTIONS': {'sslmode': 'verify-full'},
+        # Connections open in each process, see core.db.pool.
+        # CONN_MAX_AGE stays 0 so django gives them back
+        # to the pool after each request
+        'POOL': {
+            'SIZE': int(get_env_variable('PGSQL_POOL_SIZE', 10)),
+            'TIMEOUT': float(get_env_variable('PGSQL_POOL_TIMEOUT', 10)),
+            'IDLE': float(get_env_variable('PGSQL_POOL_IDLE', 300)),
+            'CHECK': float(get_env_variable('PGSQL_POOL_CHECK', 0)),
+            'MAX_AGE': float(get_env_variable('PGSQL_POOL_MAX_AGE', 3600)),
+        },
+    }
+}
+# Read replicas, a comma separated list of hosts
+# sharing the credentials of the primary, see
+# core.routers. Tests read the primary through them
+for number, host in enumerate(
+        (get_env_variable('PGSQL_REPLICA_HOSTS') or '').split(','), 1):
+    if host.strip():
+        DATABASES['replica_{}'.format(number)] = dict(
+            DATABASES['default'],
+            HOST=host.strip(),
+            TEST={'MIRROR': 'default'},
+        )
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+# A cache shared by every process and server, so
+# that the feeds and objects cached by one are
+# replaced for all, see core.checks. A comma
+# separated list of hosts
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': get_env_variable(
+            'MEMCACHED_LOCATION', '127.0.0.1:11211'
+        ).split(','),
     }
 }
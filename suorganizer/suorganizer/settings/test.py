@@ -2,4 +2,11 @@ from .base import *
 
 DEBUG = True
 
-ALLOWED_HOSTS = []
\ No newline at end of file
+ALLOWED_HOSTS = []
+
+# A second alias on the test database, for the
+# tests of core.routers, which list it in
+# DATABASE_REPLICAS
+DATABASES['replica'] = dict(
+    DATABASES['default'], TEST={'MIRROR': 'default'}
+)
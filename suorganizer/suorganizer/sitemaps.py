@@ -30,7 +30,7 @@ class RootSitemap(Sitemap):
             'site_mission',
             'site_work',
             'blogs_posts_list',
-            'dj_auth:login',
+            'dj-auth:login',
             'organizers_startup_list',
             'organizers_tag_list',
         ]
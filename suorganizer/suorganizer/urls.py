@@ -16,17 +16,19 @@ Including another URLconf
 import os
 from blogs import urls as blog_urls
 from contacts import urls as contact_urls
+from export import urls as export_urls
+from search import urls as search_urls
 from django.conf import settings
 from django.conf.urls import url
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView, RedirectView
-from django.contrib.sitemaps.views import (
-    index as site_index_view,
+
+from core.feeds import async_feed
+from core.views import (
+    db_pool_report, profile_detail, profile_list, query_report,
     sitemap as sitemap_view
 )
-
-from .sitemaps import sitemaps as sitemaps_dict
 from organizers.urls import startup as start_urls
 from organizers.urls import tag as tag_urls
 from users import urls as user_urls
@@ -37,8 +39,8 @@ admin.site.site_header = 'Startup Organizer Admin'
 admin.site.site_title = 'Startup Organizer Site Admin'
 # Url configuration for new feeds
 sitenews = [
-    path('atom/', AtomPostFeed(), name='blogs_atom_feed'),
-    path('rss/', Rss2PostFeed(), name='blogs_rss_feed'),
+    path('atom/', async_feed(AtomPostFeed()), name='blogs_atom_feed'),
+    path('rss/', async_feed(Rss2PostFeed()), name='blogs_rss_feed'),
 ]
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -46,6 +48,8 @@ urlpatterns = [
     path('contact/', include(contact_urls)),
     path('startup/', include(start_urls)),
     path('tag/', include(tag_urls)),
+    path('search/', include(search_urls)),
+    path('export/', include(export_urls)),
     path('about/', TemplateView.as_view(template_name='site/about.html'), name='about_site'),
     path('mission/', TemplateView.as_view(template_name='site/mission.html'), name='site_mission'),
     path('how/', TemplateView.as_view(template_name='site/work.html'), name='site_work'),
@@ -56,14 +60,21 @@ urlpatterns = [
     path('users/', include(user_urls,
                            namespace='dj-auth')),
     path('sitenews/', include(sitenews)),
-    path('<slug:startup_slug>/atom/', AtomStartupFeed(), name='organizers_startup_atom_feed'),
-    path('<slug:startup_slug>/rss/', Rss2StartupFeed(), name='organizers_startup_rss_feed'),
+    path('<slug:startup_slug>/atom/', async_feed(AtomStartupFeed()), name='organizers_startup_atom_feed'),
+    path('<slug:startup_slug>/rss/', async_feed(Rss2StartupFeed()), name='organizers_startup_rss_feed'),
     # The index view is a higher level overview of the sitemaps
     # for each section of the application.
-    path('sitemap.xml', site_index_view, {'sitemaps': sitemaps_dict},
-         name='sitemaps'),
-    path('sitemap-<section>.xml', sitemap_view, {'sitemaps': sitemaps_dict},
+    # The sitemaps defined in sitemaps.py are
+    # served pre-rendered, see core.sitemaps
+    path('sitemap.xml', sitemap_view, name='sitemaps'),
+    path('sitemap-<section>.xml', sitemap_view,
          name='django.contrib.sitemaps.views.sitemap'),
+    # Profiles of the ProfilingMiddleware, staff only
+    path('__profile__/', profile_list, name='profile_list'),
+    path('__profile__/<profile_id>/', profile_detail,
+         name='profile_detail'),
+    # Database connection pools of the process, staff only
+    path('__db_pool__/', db_pool_report, name='db_pool_report'),
 ]
 
 if settings.DEBUG:
@@ -71,4 +82,6 @@ if settings.DEBUG:
 
     urlpatterns += [
         path('__debug__/', include(debug_toolbar.urls)),
+        # Query statistics of the QueryCountMiddleware
+        path('__queries__/', query_report, name='query_report'),
     ]
@@ -12,5 +12,8 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'suorganizer.settings')
+# compile the templates before the first
+# request, see core.loaders
+os.environ.setdefault('TEMPLATE_WARMUP', 'true')
 
 application = get_wsgi_application()
@@ -13,6 +13,8 @@ from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.forms import AdminPasswordChangeForm
 from django.utils.html import escape
 
+from core.admin import PerformanceModeMixin
+
 from .models import User, Profile
 from .forms import UserCreationForm, UserChangeForm
 
@@ -31,7 +33,7 @@ class ProfileAdminInline(admin.StackedInline):
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(PerformanceModeMixin, admin.ModelAdmin):
     """
     Custom user admin for user model
     """
@@ -80,6 +82,10 @@ class UserAdmin(admin.ModelAdmin):
     )
     search_fields = ('email',)
     ordering = ('email',)
+    # get_name and get_date_joined read the
+    # profile, loaded with the user by a join
+    # instead of one query per row
+    list_select_related = ('profile',)
     # The values in the below tuple
     # will become links, linking to edit
     # page for the instance of the user
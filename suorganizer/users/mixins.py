@@ -158,7 +158,9 @@ class ActivationMailFormMixin:
             'recipient_list': [user.email]
         }
         try:
-            # number_sent will be 0 or 1
+            # number_sent will be 0 or 1. With the
+            # QueueBackend the mail is only queued,
+            # SMTP errors are recorded on the queue.
             number_sent = send_mail(**mail_kwargs)
         except Exception as error:
             self.log_mail_error(